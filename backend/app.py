@@ -1,36 +1,145 @@
 import os
-from datetime import datetime, timedelta
-import requests
-from flask import Flask, jsonify, request
+import threading
+import time
+from flask import Flask, Response, g, jsonify, request, stream_with_context
 from flask_cors import CORS
-from pymongo import MongoClient
+from pymongo.errors import BulkWriteError
 from config import Config
-from utils.human_detection import HumanDetector
-from utils.rainfall_predictor import RainfallPredictor
+from utils import db as mongo
+from utils.anomaly import ALERT_TYPES as ANOMALY_TYPES, AnomalyDetector
+from utils.db_schema import ensure_schema
+from utils import ingest
+from utils.device_sync import DeviceSync, SyncBusy
+from utils.event_hub import EventHub
+from utils.lazy import Lazy
+from utils import metrics
+from utils.metrics import timed
+from utils.model_registry import ModelRegistry, ModelReloader
+from utils.prediction_cache import PredictionCache
+from utils.queries import stream_json_array
+from utils.responses import (
+    SNAPSHOT_ALERT_TYPES, dashboard_etag, dashboard_snapshot_body, dashboard_stats_body, device_sync_body, format_doc, human_detection_body,
+    nice_ts, rainfall_inputs, raw_point, reading_error, series_body, valve_control_body, valve_status_body,
+    weather_body
+)
+from utils.rollups import Rollups
+from utils import routes
+from utils.routes import RouteError
+from utils.stats_counters import StatsCounters
+from utils.telemetry import FrameError, decode_frame
+from utils.weather_cache import WeatherCache, fetch_open_meteo
+from utils.write_buffer import BufferFull, WriteBehindBuffer
 
 app = Flask(__name__)
-CORS(app)
+CORS(app, expose_headers=["ETag"])
 
-client = MongoClient(Config.MONGO_URI)
-db = client[Config.DB_NAME]
+# Bound per process by bind_db(); a preloading gunicorn master never opens a MongoClient
+db = readings_col = alerts_col = valve_status_col = valve_control_col = None
+stats_counters = None
+rollups = None
 
-readings_col = db['readings']
-alerts_col = db['alerts']
-valve_status_col = db['valve_status']
-valve_control_col = db['valve_control']
+def bind_db():
+    """Mongo handles for this process; under a preloading master this runs per worker, after fork."""
+    global db, readings_col, alerts_col, valve_status_col, valve_control_col, stats_counters, rollups
+    db = mongo.get_db()
+    readings_col = db['readings']
+    alerts_col = db['alerts']
+    valve_status_col = db['valve_status']
+    valve_control_col = db['valve_control']
+    stats_counters = StatsCounters(db['stats'])
+    rollups = Rollups(db)
 
-human_detector = HumanDetector()
+event_hub = EventHub(queue_size=Config.STREAM_QUEUE_SIZE, max_subscribers=Config.STREAM_MAX_SUBSCRIBERS)
 
-if human_detector.model:
-    human_detector.start_continuous_detection(
+anomaly_detector = AnomalyDetector(
+    z_threshold=Config.ANOMALY_Z_THRESHOLD,
+    rise_per_min=Config.ANOMALY_RISE_PER_MIN,
+    stuck_samples=Config.ANOMALY_STUCK_SAMPLES,
+    vibration_rate=Config.ANOMALY_VIBRATION_RATE
+)
+
+def watch_detection_results(interval):
+    """Forward detector_worker.py results to /api/stream subscribers."""
+    last = None
+    while True:
+        time.sleep(interval)
+        if not event_hub.subscriber_count():
+            continue
+        try:
+            doc = db['human_detection'].find_one({"_id": "current"}, {"timestamp": 1})
+            if doc and doc.get("timestamp") != last:
+                last = doc.get("timestamp")
+                event_hub.publish("human", human_detection_status())
+        except Exception as e:
+            print(f"⚠️ Detection watch failed: {e}")
+
+def load_human_detector():
+    from utils.human_detection import HumanDetector
+    return HumanDetector()
+
+def start_inline_detection():
+    detector = human_detector.get()
+    if not detector.model:
+        print("⚠️ Human detection disabled")
+        return
+    detector.start_continuous_detection(
         db_collection=db['human_detection'],
-        interval=Config.DETECTION_INTERVAL
+        interval=Config.DETECTION_INTERVAL,
+        on_result=on_detection_result
     )
     print(f"✓ Continuous human detection started")
-else:
-    print("⚠️ Human detection disabled")
 
-rainfall_predictor = RainfallPredictor(Config.MODEL_PATH)
+def on_detection_result(detected, confidence, ts):
+    event_hub.publish("human", {
+        "humanDetected": bool(detected),
+        "lastChecked": nice_ts(ts),
+        "confidence": float(confidence),
+        "detectorRunning": True
+    })
+    device_sync.changed()
+
+human_detector = Lazy(load_human_detector, name="Human detector")
+
+model_registry = ModelRegistry(Config.MODEL_REGISTRY)
+
+def load_rainfall_predictor():
+    from utils.rainfall_predictor import RainfallPredictor
+    return RainfallPredictor.from_registry(model_registry, Config.MODEL_PATH, Config.FOREST_PATH)
+
+rainfall_predictor = Lazy(load_rainfall_predictor, name="Rainfall predictor")
+
+# Cached percentages came from the old model
+rainfall_reloader = ModelReloader(model_registry, rainfall_predictor, load_rainfall_predictor,
+                                  warm=lambda p: p.warm_up(), on_swap=lambda p: prediction_cache.clear())
+
+# "worker": detector_worker.py owns the cameras and YOLO, this process only reads results.
+# "inline": run detection on a thread here (single-process development setups).
+def start_background_tasks():
+    """Threads this process needs; under a preloading master this runs per worker, after fork."""
+    try:
+        ensure_schema(db, timeseries=Config.READINGS_TIMESERIES, retention_days=Config.READINGS_RETENTION_DAYS)
+        print("✓ MongoDB indexes ensured")
+    except Exception as e:
+        print(f"⚠️ Could not ensure MongoDB indexes: {e}")
+    
+    stats_counters.start_reconciler(readings_col, alerts_col, interval=Config.STATS_RECONCILE_INTERVAL)
+    threading.Thread(target=device_sync.watch, name="device-sync-watch", daemon=True).start()
+    if Config.MODEL_RELOAD_INTERVAL:
+        threading.Thread(target=rainfall_reloader.watch, args=(Config.MODEL_RELOAD_INTERVAL,), name="model-reload", daemon=True).start()
+    if Config.DETECTION_MODE == "inline":
+        # YOLO takes seconds to load; don't hold up serving the other endpoints
+        threading.Thread(target=start_inline_detection, name="detection-start", daemon=True).start()
+    elif Config.DETECTION_MODE == "worker":
+        threading.Thread(target=watch_detection_results, args=(Config.DETECTION_INTERVAL,), name="detection-watch", daemon=True).start()
+        print("✓ Human detection results read from detector_worker.py")
+    else:
+        print("⚠️ Human detection disabled")
+
+prediction_cache = PredictionCache(
+    maxsize=Config.PREDICTION_CACHE_SIZE,
+    ttl=Config.PREDICTION_CACHE_TTL,
+    quantum=Config.PREDICTION_CACHE_QUANTUM
+)
 
 DAM_LOCATION = {
     "latitude": Config.DAM_LATITUDE,
@@ -38,47 +147,82 @@ DAM_LOCATION = {
     "name": "Smart Dam Location"
 }
 
-def nice_ts(raw):
-    if raw is None:
-        return ""
-    try:
-        if isinstance(raw, (int, float)):
-            dt = datetime.utcfromtimestamp(raw / 1000.0)
-        elif isinstance(raw, str):
-            dt = datetime.fromisoformat(raw.replace("Z", "+00:00"))
-        else:
-            dt = raw
-        ist_dt = dt + timedelta(hours=5, minutes=30)
-        return ist_dt.strftime("%d %b %Y, %I:%M %p IST")
-    except:
-        return str(raw)
+def fetch_dam_weather():
+    with timed("weather.fetch"):
+        return fetch_open_meteo(DAM_LOCATION["latitude"], DAM_LOCATION["longitude"], url=Config.WEATHER_API_URL)
+
+weather_cache = WeatherCache(
+    fetch_dam_weather,
+    ttl=Config.WEATHER_CACHE_TTL,
+    stale_ttl=Config.WEATHER_STALE_TTL,
+    negative_ttl=Config.WEATHER_NEGATIVE_TTL
+)
 
 def fetch_weather():
-    url = "https://api.open-meteo.com/v1/forecast"
-    params = {
-        "latitude": DAM_LOCATION["latitude"],
-        "longitude": DAM_LOCATION["longitude"],
-        "current_weather": True,
-        "hourly": "precipitation_probability,cloudcover,relativehumidity_2m,sunshine_duration,winddirection_10m",
-        "timezone": "auto",
-    }
-    try:
-        r = requests.get(url, params=params, timeout=5)
-        r.raise_for_status()
-        data = r.json()
-        hourly = data.get("hourly", {})
-        return {
-            "temperature": data["current_weather"].get("temperature"),
-            "humidity": hourly.get("relativehumidity_2m", [None])[0],
-            "cloud": hourly.get("cloudcover", [None])[0],
-            "rain_prob": hourly.get("precipitation_probability", [None])[0],
-            "sunshine": hourly.get("sunshine_duration", [None])[0],
-            "wind_direction": hourly.get("winddirection_10m", [None])[0],
-            "windspeed": data["current_weather"].get("windspeed"),
-            "time": data["current_weather"].get("time"),
-        }
-    except:
-        return {"temperature": None, "humidity": None, "cloud": None, "rain_prob": None, "sunshine": None, "wind_direction": None, "windspeed": None, "time": None}
+    return weather_cache.get()
+
+HTTP_SECONDS = metrics.histogram("smartdam_http_request_duration_seconds", "Request latency (to first byte for streamed responses)", ["method", "route", "status"])
+
+@app.before_request
+def start_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request(response):
+    started = g.pop("request_started", None)
+    if started is not None:
+        # url_rule, not path, so /api/alerts/<alert_type>/logs stays one series
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        HTTP_SECONDS.observe(time.perf_counter() - started, method=request.method, route=route, status=response.status_code)
+    return response
+
+@app.errorhandler(RouteError)
+def route_error(e):
+    return jsonify(e.body), e.status, e.headers
+
+def _stats_samples(stats, keys):
+    return {(key,): stats[key] for key in keys}
+
+def cache_samples():
+    weather = weather_cache.stats()
+    prediction = prediction_cache.stats()
+    samples = {("weather", k): weather[k] for k in ("hits", "staleHits", "negativeHits", "misses", "errors")}
+    samples.update({("prediction", k): prediction[k] for k in ("hits", "misses", "evictions")})
+    return samples
+
+metrics.callback("smartdam_cache_events_total", "Weather / prediction cache lookups by outcome", cache_samples,
+                 kind="counter", labelnames=["cache", "outcome"])
+metrics.callback("smartdam_write_buffer_pending", "Readings waiting in the write-behind buffer",
+                 lambda: {(): readings_buffer.stats()["pending"]})
+metrics.callback("smartdam_write_buffer_events_total", "Write-behind buffer activity",
+                 lambda: _stats_samples(readings_buffer.stats(), ("accepted", "rejected", "written", "flushes", "errors", "dropped")),
+                 kind="counter", labelnames=["event"])
+metrics.callback("smartdam_stream_subscribers", "Open /api/stream connections", lambda: {(): event_hub.subscriber_count()})
+metrics.callback("smartdam_stream_events_total", "Server-sent events published / dropped for slow clients",
+                 lambda: {("published",): event_hub.published, ("dropped",): event_hub.dropped},
+                 kind="counter", labelnames=["event"])
+metrics.callback("smartdam_model_loaded", "Lazily loaded models that are in memory",
+                 lambda: {("rainfall",): int(rainfall_predictor.loaded), ("human_detector",): int(human_detector.loaded)},
+                 labelnames=["model"])
+metrics.callback("smartdam_device_sync_waiting", "Parked /api/device/sync requests", lambda: {(): device_sync.waiting})
+metrics.callback("smartdam_device_sync_woken_total", "Parked /api/device/sync requests answered by a change",
+                 lambda: {(): device_sync.woken}, kind="counter")
+metrics.callback("smartdam_device_sync_busy_total", "/api/device/sync requests refused with DEVICE_SYNC_MAX_WAITERS parked",
+                 lambda: {(): device_sync.busy}, kind="counter")
+metrics.callback("smartdam_anomaly_alerts_total", "Alerts derived from the readings stream by utils/anomaly.py",
+                 lambda: _stats_samples(anomaly_detector.stats(), ANOMALY_TYPES), kind="counter", labelnames=["type"])
+metrics.callback("smartdam_anomaly_nodes", "Nodes with rolling anomaly state in this process",
+                 lambda: {(): anomaly_detector.stats()["nodes"]})
+metrics.callback("smartdam_model_reloads_total", "Rainfall model hot reloads",
+                 lambda: {("ok",): rainfall_reloader.reloads, ("failed",): rainfall_reloader.failures},
+                 kind="counter", labelnames=["outcome"])
+metrics.callback("smartdam_model_version", "Rainfall model version serving in this process",
+                 lambda: {(rainfall_reloader.current_version() or "unversioned",): 1} if rainfall_predictor.loaded else {},
+                 labelnames=["version"])
+
+@app.route("/metrics")
+def api_metrics():
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
 
 @app.route("/")
 def health():
@@ -90,176 +234,332 @@ def api_location():
 
 @app.route("/api/weather")
 def api_weather():
-    w = fetch_weather()
-    return jsonify({
-        "locationName": DAM_LOCATION["name"],
-        "temperature": w["temperature"],
-        "humidity": w["humidity"],
-        "cloud": w["cloud"],
-        "rain_prob": w["rain_prob"],
-        "windspeed": w["windspeed"],
-        "wind_direction": w["wind_direction"],
-        "sunshine": w["sunshine"],
-        "time": nice_ts(datetime.utcnow())
-    })
+    return jsonify(weather_body(DAM_LOCATION["name"], fetch_weather()))
 
 @app.route("/api/rainfall")
 def api_rainfall():
     try:
-        latest_reading = readings_col.find_one(sort=[("timestamp", -1)])
-        if not latest_reading:
-            return jsonify({"error": "No sensor data", "percent": 0, "rainLabel": "NO"}), 400
-        
-        sensor_temp = latest_reading.get("temp")
-        sensor_humidity = latest_reading.get("humidity")
-        if sensor_temp is None or sensor_humidity is None:
-            return jsonify({"error": "Invalid sensor data", "percent": 0, "rainLabel": "NO"}), 400
-        
-        weather = fetch_weather()
-        cloud_cover = weather.get("cloud")
-        windspeed = weather.get("windspeed")
-        pressure = 1013.25
-        
-        if cloud_cover is None or windspeed is None:
-            return jsonify({"error": "Weather API incomplete", "percent": 0, "rainLabel": "NO"}), 500
-        
-        model_input = {
-            'Temperature': float(sensor_temp),
-            'Humidity': float(sensor_humidity),
-            'Wind_Speed': float(windspeed),
-            'Cloud_Cover': float(cloud_cover),
-            'Pressure': float(pressure)
-        }
+        with timed("rainfall.find_latest"):
+            latest_reading = readings_col.find_one(sort=[("timestamp", -1)])
+        error = reading_error(latest_reading)
+        if error:
+            return jsonify(error[0]), error[1]
         
-        percent, rain_label = rainfall_predictor.predict(model_input)
-        
-        prediction_doc = {
-            "percent": float(percent),
-            "rainLabel": rain_label,
-            "timestamp": datetime.utcnow(),
-            "input_data": model_input
-        }
-        
-        db['rainfall_predictions'].update_one({"_id": "current"}, {"$set": prediction_doc}, upsert=True)
-        alerts_col.insert_one({"type": "rainfall_prediction", "percent": float(percent), "rainLabel": rain_label, "timestamp": datetime.utcnow()})
-        
-        return jsonify({"percent": float(percent), "rainLabel": rain_label, "timestamp": nice_ts(prediction_doc["timestamp"])})
+        with timed("rainfall.weather"):
+            weather = fetch_weather()
+        body, status = rainfall_prediction(latest_reading, weather)
+        return jsonify(body), status
     except Exception as e:
         return jsonify({"percent": 0, "rainLabel": "NO", "error": str(e)}), 500
 
+def rainfall_prediction(latest_reading, weather):
+    """(body, status) of /api/rainfall for an already fetched reading and weather."""
+    model_input, error, status = rainfall_inputs(latest_reading, weather)
+    if error:
+        return error, status
+    
+    cache_key = routes.prediction_key(prediction_cache, latest_reading, weather)
+    cached = prediction_cache.get(cache_key)
+    if cached is not None:
+        return cached, 200
+    
+    with timed("rainfall.predict"):
+        percent, rain_label = rainfall_predictor.get().predict(model_input)
+    prediction_doc, alert, result = routes.prediction_docs(percent, rain_label, model_input)
+    
+    with timed("rainfall.store"):
+        db['rainfall_predictions'].update_one({"_id": "current"}, {"$set": prediction_doc}, upsert=True)
+        alerts_col.insert_one(alert)
+        stats_counters.record_alert("rainfall_prediction")
+    
+    prediction_cache.put(cache_key, result)
+    event_hub.publish("rainfall", result)
+    return result, 200
+
+def paged_response(col, base=None, default_limit=500):
+    query, limit, projection = routes.page_args(request.args, base, default_limit, Config.QUERY_MAX_LIMIT)
+    cursor = col.find(query, projection, sort=[("timestamp", -1), ("_id", -1)], limit=limit, batch_size=min(limit, 1000))
+    return Response(stream_with_context(stream_json_array(cursor, format_doc)), mimetype="application/json")
+
+def record_anomalies(readings):
+    """Derived alerts (rapid_rise, level_spike, sensor_stuck, vibration_burst) from freshly stored readings."""
+    with timed("readings.anomaly"):
+        alerts = anomaly_detector.observe(readings)
+    if not alerts:
+        return
+    alerts_col.insert_many(alerts)
+    for alert in alerts:
+        stats_counters.record_alert(alert["type"])
+    if event_hub.subscriber_count():
+        for alert in alerts:
+            event_hub.publish("alert", {"alert": format_doc(dict(alert)), "statistics": stats_counters.read()})
+
+def store_readings(docs):
+    if Config.READINGS_TIMESERIES and ingest.retried(docs):
+        # No unique _id on a time-series collection: skip what the failed attempt already stored
+        done = {d["_id"] for d in readings_col.find(ingest.stored_ids_query(docs), {"_id": 1})}
+        docs = [d for d in docs if d["_id"] not in done]
+        if not docs:
+            return 0
+    stored, rejected = docs, []
+    try:
+        with timed("readings.insert"):
+            readings_col.insert_many(docs, ordered=False)
+    except BulkWriteError as e:
+        # insert_many assigns _id in place, so a retried batch only hits duplicate keys
+        stored, rejected = ingest.split_write_errors(docs, e)
+    
+    if rejected:
+        print(f"⚠️ {len(rejected)} readings rejected ({rejected[0]['error']}), kept in {ingest.DEAD_LETTER}")
+        try:
+            db[ingest.DEAD_LETTER].insert_many(rejected, ordered=False)
+        except Exception as e:
+            print(f"⚠️ Could not store rejected readings, dropped: {e}")
+    stats_counters.record_readings(len(stored))
+    if Config.READINGS_ROLLUPS:
+        try:
+            with timed("readings.rollups"):
+                rollups.record(stored)
+        except Exception as e:
+            print(f"⚠️ Rollup update failed (run utils/rollups.py --rebuild): {e}")
+    if Config.ANOMALY_DETECTION:
+        try:
+            record_anomalies(stored)
+        except Exception as e:
+            print(f"⚠️ Anomaly detection failed: {e}")
+    if stored and event_hub.subscriber_count():
+        event_hub.publish("reading", {"reading": format_doc(dict(stored[-1])), "statistics": stats_counters.read()})
+    return len(stored)
+
+readings_buffer = WriteBehindBuffer(
+    store_readings,
+    max_batch=Config.READINGS_FLUSH_BATCH,
+    flush_interval=Config.READINGS_FLUSH_INTERVAL,
+    max_pending=Config.READINGS_BUFFER_SIZE,
+    name="readings",
+    retryable=ingest.is_transient
+)
+
 @app.route("/api/readings", methods=["GET", "POST"])
 def api_readings():
     if request.method == "POST":
-        data = request.get_json()
-        data["timestamp"] = datetime.utcnow()
-        readings_col.insert_one(data)
+        data = routes.stamped(request.get_json())
+        if not Config.READINGS_WRITE_BEHIND:
+            store_readings([data])
+            return jsonify({"success": True}), 201
+        try:
+            readings_buffer.add(data)
+        except BufferFull:
+            raise routes.retry_later("Ingest buffer full, retry later", 429, Config.READINGS_FLUSH_INTERVAL, success=False)
         return jsonify({"success": True}), 201
     
-    readings = list(readings_col.find(sort=[("timestamp", -1)], limit=500))
-    for r in readings:
-        r["_id"] = str(r["_id"])
-        r["timestamp"] = nice_ts(r.get("timestamp"))
-    return jsonify(readings)
+    return paged_response(readings_col, default_limit=500)
+
+@app.route("/api/readings/series")
+def api_readings_series():
+    start, end, resolution, node, fields = routes.series_args(request.args, Config.SERIES_MAX_POINTS)
+    if resolution == "raw":
+        query, projection = routes.raw_series_find(start, end, node, fields)
+        cursor = readings_col.find(query, projection, sort=[("timestamp", 1)], limit=Config.QUERY_MAX_LIMIT)
+        points = (raw_point(doc, fields) for doc in cursor)
+    else:
+        points = rollups.series(resolution, start, end, node=node, fields=fields, limit=Config.QUERY_MAX_LIMIT)
+    
+    return jsonify(series_body(resolution, node, start, end, points))
+
+@app.route("/api/readings/batch", methods=["POST"])
+def api_readings_batch():
+    docs = routes.reading_batch(request.get_json(), Config.READINGS_BATCH_MAX)
+    body, status = routes.inserted_body(store_readings(docs) if docs else 0, len(docs))
+    return jsonify(body), status
+
+@app.route("/api/readings/frame", methods=["POST"])
+def api_readings_frame():
+    """Binary batch from the device (utils/telemetry.py); decoded, validated and stored in one insert."""
+    try:
+        with timed("readings.decode"):
+            docs = decode_frame(request.get_data(), max_records=Config.READINGS_BATCH_MAX)
+    except FrameError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    body, status = routes.inserted_body(store_readings(docs) if docs else 0, len(docs))
+    return jsonify(body), status
 
 @app.route("/api/alerts/<alert_type>", methods=["POST"])
 def api_alert(alert_type):
-    data = request.get_json()
-    data["type"] = alert_type
-    data["timestamp"] = datetime.utcnow()
+    data = routes.stamped(request.get_json(), type=alert_type)
     alerts_col.insert_one(data)
+    stats_counters.record_alert(alert_type)
+    if event_hub.subscriber_count():
+        event_hub.publish("alert", {"alert": format_doc(dict(data)), "statistics": stats_counters.read()})
     return jsonify({"success": True}), 201
 
 @app.route("/api/alerts/<alert_type>/logs")
 def api_alert_logs(alert_type):
-    logs = list(alerts_col.find({"type": alert_type}, sort=[("timestamp", -1)], limit=200))
-    for log in logs:
-        log["_id"] = str(log["_id"])
-        log["timestamp"] = nice_ts(log.get("timestamp"))
-    return jsonify(logs)
+    return paged_response(alerts_col, base={"type": alert_type}, default_limit=200)
+
+def valve_status():
+    status = valve_status_col.find_one({"_id": "current"})
+    control = valve_control_col.find_one({"_id": "current"}) if status else None
+    return valve_status_body(status, control)
 
 @app.route("/api/valve/status", methods=["GET", "PUT"])
 def api_valve_status():
     if request.method == "PUT":
-        data = request.get_json()
-        data["timestamp"] = datetime.utcnow()
+        data = routes.stamped(request.get_json())
         valve_status_col.update_one({"_id": "current"}, {"$set": data}, upsert=True)
+        if event_hub.subscriber_count():
+            event_hub.publish("valve", valve_status())
         return jsonify({"success": True})
     
-    status = valve_status_col.find_one({"_id": "current"})
-    if not status:
-        return jsonify({"state": "CLOSED", "reason": "BOOT", "timestamp": "", "mode": "AUTO"})
-    
-    control = valve_control_col.find_one({"_id": "current"}) or {}
-    return jsonify({
-        "state": status.get("state", "CLOSED"),
-        "reason": status.get("reason", "BOOT"),
-        "timestamp": nice_ts(status.get("timestamp")),
-        "mode": control.get("mode", "AUTO")
-    })
+    return jsonify(valve_status())
 
 @app.route("/api/valve/control", methods=["GET", "POST"])
 def api_valve_control():
     if request.method == "POST":
-        data = request.get_json()
-        user_role = data.get("userRole", "user")
-        if user_role != "admin":
-            return jsonify({"success": False, "error": "Admin only"}), 403
-        
-        control_data = {
-            "mode": data.get("mode", "AUTO"),
-            "manualCommand": data.get("command", "NONE"),
-            "updatedAt": datetime.utcnow(),
-            "updatedBy": data.get("userId", "unknown")
-        }
+        control_data = routes.valve_control_update(request.get_json())
         valve_control_col.update_one({"_id": "current"}, {"$set": control_data}, upsert=True)
+        device_sync.changed()
+        if event_hub.subscriber_count():
+            event_hub.publish("valve", valve_status())
         return jsonify({"success": True})
     
-    control = valve_control_col.find_one({"_id": "current"})
-    if not control:
-        return jsonify({"mode": "AUTO", "manualCommand": "NONE"})
-    return jsonify({"mode": control.get("mode", "AUTO"), "manualCommand": control.get("manualCommand", "NONE")})
+    return jsonify(valve_control_body(valve_control_col.find_one({"_id": "current"})))
+
+def human_detection_status():
+    docs = {doc["_id"]: doc for doc in db['human_detection'].find()}
+    return human_detection_body(docs, Config.DETECTOR_HEARTBEAT, detector=human_detector.peek())
+
+@app.route("/api/admin/models")
+def api_admin_models():
+    # Same role check as the POST routes; a GET has no body, so the role comes in the query string
+    routes.require_admin(request.args.get("userRole"))
+    return jsonify({**model_registry.read(), "loaded": rainfall_reloader.current_version(), "pid": os.getpid()})
+
+@app.route("/api/admin/models/reload", methods=["POST"])
+def api_admin_models_reload():
+    """Optionally activate `version`, then load it here; other workers follow on their next manifest check."""
+    version = routes.model_reload_args(request.get_json(silent=True))
+    try:
+        if version:
+            model_registry.activate(version)
+        reloaded = rainfall_reloader.reload()
+    except Exception as e:
+        raise routes.reload_error(e)
+    return jsonify(routes.reload_body(reloaded, rainfall_reloader))
 
 @app.route("/api/human-detection/status")
 def api_human_detection_status():
-    doc = db['human_detection'].find_one({"_id": "current"})
-    if not doc:
-        return jsonify({"humanDetected": False, "lastChecked": "", "confidence": 0.0, "detectorRunning": human_detector.running})
-    return jsonify({
-        "humanDetected": doc.get("detected", False),
-        "lastChecked": nice_ts(doc.get("timestamp")),
-        "confidence": doc.get("confidence", 0.0),
-        "detectorRunning": human_detector.running
-    })
+    return jsonify(human_detection_status())
+
+# Timed from the last refresh attempt, not the stored doc's timestamp: a prediction cache hit doesn't rewrite the doc
+device_sync_rain_refresh = routes.Every(Config.DEVICE_SYNC_RAIN_INTERVAL)
+
+def device_sync_state():
+    rain = db['rainfall_predictions'].find_one({"_id": "current"}, {"percent": 1, "rainLabel": 1, "timestamp": 1})
+    if device_sync_rain_refresh.due():
+        # Nodes no longer call /api/rainfall themselves, so keep the prediction they act on current here
+        try:
+            latest_reading = readings_col.find_one(sort=[("timestamp", -1)])
+            if not reading_error(latest_reading):
+                body, status = rainfall_prediction(latest_reading, fetch_weather())
+                if status == 200:
+                    rain = body
+        except Exception as e:
+            print(f"⚠️ Device sync rainfall refresh failed: {e}")
+    control = valve_control_col.find_one({"_id": "current"})
+    return device_sync_body(control, rain, human_detection_status())
+
+device_sync = DeviceSync(device_sync_state, interval=Config.DEVICE_SYNC_INTERVAL,
+                          max_waiters=Config.DEVICE_SYNC_MAX_WAITERS)
+
+@app.route("/api/device/sync")
+def api_device_sync():
+    """
+    Control mode, manual command, rain and human status for an ESP32 node.
+    With ?version=<last seen>&wait=<seconds> the request parks until the state changes.
+    """
+    wait = routes.sync_wait(request.args, Config.DEVICE_SYNC_MAX_WAIT)
+    try:
+        state = device_sync.wait(request.args.get("version"), wait)
+    except SyncBusy:
+        # Answered at once instead of parking; the device backs off and polls again
+        raise routes.retry_later("Too many parked requests, retry later", 503, Config.DEVICE_SYNC_INTERVAL)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    resp = jsonify(state)
+    resp.headers["Cache-Control"] = "no-store"
+    return resp
+
+@app.route("/api/stream")
+def api_stream():
+    if event_hub.full():
+        # Each stream holds a worker thread; refuse rather than starve ordinary requests
+        raise routes.retry_later("Too many live connections, retry later", 503, Config.STREAM_RETRY_AFTER)
+    
+    resp = Response(event_hub.stream(heartbeat=Config.STREAM_HEARTBEAT, full_retry=Config.STREAM_RETRY_AFTER),
+                    mimetype="text/event-stream")
+    resp.headers["Cache-Control"] = "no-cache"
+    resp.headers["X-Accel-Buffering"] = "no"
+    return resp
 
 @app.route("/api/dashboard/stats")
 def api_dashboard_stats():
     try:
         latest_reading = readings_col.find_one(sort=[("timestamp", -1)])
-        total_readings = readings_col.count_documents({})
-        total_alerts = alerts_col.count_documents({})
-        vibration_alerts = alerts_col.count_documents({"type": "vibration"})
-        water_alerts = alerts_col.count_documents({"type": "waterlevel"})
-        human_alerts = alerts_col.count_documents({"type": "human"})
+        statistics = stats_counters.read(readings_col, alerts_col)
         valve_status = valve_status_col.find_one({"_id": "current"})
         
-        return jsonify({
-            "currentReading": {
-                "temperature": latest_reading.get("temp") if latest_reading else 0,
-                "humidity": latest_reading.get("humidity") if latest_reading else 0,
-                "waterLevel": latest_reading.get("percent") if latest_reading else 0,
-                "valveState": valve_status.get("state") if valve_status else "CLOSED",
-                "timestamp": nice_ts(latest_reading.get("timestamp")) if latest_reading else ""
-            },
-            "statistics": {
-                "totalReadings": total_readings,
-                "totalAlerts": total_alerts,
-                "vibrationAlerts": vibration_alerts,
-                "waterLevelAlerts": water_alerts,
-                "humanDetectionAlerts": human_alerts
+        return jsonify(dashboard_stats_body(latest_reading, statistics, valve_status))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+def snapshot_response(body):
+    """200 with an ETag, or an empty 304 when the client already has this snapshot."""
+    tag = dashboard_etag(body)
+    if request.if_none_match.contains(tag):
+        resp = Response(status=304)
+    else:
+        resp = jsonify(body)
+    resp.set_etag(tag)
+    resp.headers["Cache-Control"] = "no-cache"
+    return resp
+
+@app.route("/api/dashboard")
+def api_dashboard():
+    """One round trip for the whole dashboard; each document is looked up once and shared between cards."""
+    limit = routes.snapshot_limit(request.args, Config.SNAPSHOT_MAX_READINGS)
+    try:
+        with timed("dashboard.queries"):
+            readings = list(readings_col.find({}, sort=[("timestamp", -1), ("_id", -1)], limit=limit))
+            status = valve_status_col.find_one({"_id": "current"})
+            control = valve_control_col.find_one({"_id": "current"}) if status else None
+            statistics = stats_counters.read(readings_col, alerts_col)
+            last_alerts = {
+                t: alerts_col.find_one({"type": t}, {"timestamp": 1}, sort=[("timestamp", -1), ("_id", -1)])
+                for t in SNAPSHOT_ALERT_TYPES
             }
-        })
+            detection = human_detection_status()
+        
+        latest_reading = readings[0] if readings else None
+        weather = fetch_weather()
+        try:
+            rainfall = (reading_error(latest_reading) or rainfall_prediction(latest_reading, weather))[0]
+        except Exception as e:
+            rainfall = {"percent": 0, "rainLabel": "NO", "error": str(e)}
+        
+        body = dashboard_snapshot_body(readings, weather_body(DAM_LOCATION["name"], weather), rainfall,
+                                       status, control, detection, statistics, last_alerts)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
+    return snapshot_response(body)
+
+if Config.PRELOAD_APP:
+    # Loaded once in the gunicorn master and shared copy-on-write by the forked workers;
+    # gunicorn.conf.py binds MongoDB and starts the background threads in each worker
+    rainfall_predictor.get()
+else:
+    bind_db()
+    start_background_tasks()
 
 if __name__ == "__main__":
     port = int(os.getenv("PORT", 5000))
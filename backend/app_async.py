@@ -0,0 +1,553 @@
+"""
+Asyncio variant of app.py (Quart + motor + httpx)
+Same endpoints and JSON shapes (argument parsing, validation and response bodies
+come from utils/routes.py and utils/responses.py, shared with app.py), but
+handlers await MongoDB and the weather API instead of holding a thread each, so one process keeps hundreds of slow
+clients in flight. Independent queries in /api/rainfall and
+/api/dashboard/stats run concurrently. Model loading and prediction are
+CPU-bound and go to the default thread pool.
+
+    hypercorn app_async:app --bind 0.0.0.0:5000 --workers 2
+
+Human detection results are read from detector_worker.py; DETECTION_MODE=inline
+is not supported here. Readings are inserted directly (awaiting the insert
+doesn't block other requests), so the write-behind buffer isn't used.
+"""
+
+import asyncio
+import os
+import threading
+import time
+import httpx
+from pymongo.errors import BulkWriteError
+from quart import Quart, Response, g, jsonify, request
+from quart_cors import cors
+from config import Config
+from utils import db as mongo
+from utils.anomaly import ALERT_TYPES as ANOMALY_TYPES, AnomalyDetector
+from utils.db_schema import ensure_schema
+from utils import ingest
+from utils.device_sync import AsyncDeviceSync, SyncBusy
+from utils.event_hub import AsyncEventHub
+from utils.lazy import Lazy
+from utils import metrics
+from utils.metrics import timed
+from utils.model_registry import ModelRegistry, ModelReloader
+from utils.prediction_cache import PredictionCache
+from utils.queries import astream_json_array
+from utils.responses import (
+    SNAPSHOT_ALERT_TYPES, dashboard_etag, dashboard_snapshot_body, dashboard_stats_body, device_sync_body, format_doc, human_detection_body,
+    rainfall_inputs, raw_point, reading_error, series_body, valve_control_body, valve_status_body,
+    weather_body
+)
+from utils.rollups import Rollups, bucket_point
+from utils import routes
+from utils.routes import RouteError
+from utils.stats_counters import AsyncStatsCounters
+from utils.telemetry import FrameError, decode_frame
+from utils.weather_cache import AsyncWeatherCache, fetch_open_meteo_async
+
+app = cors(Quart(__name__), allow_origin="*", expose_headers=["ETag"])
+
+# Bound in startup(): motor and httpx clients belong to the serving event loop
+db = None
+readings_col = alerts_col = valve_status_col = valve_control_col = None
+stats_counters = None
+http = None
+background = []
+
+event_hub = AsyncEventHub(queue_size=Config.STREAM_QUEUE_SIZE, max_subscribers=Config.STREAM_MAX_SUBSCRIBERS)
+
+rollups = Rollups(None)
+
+anomaly_detector = AnomalyDetector(
+    z_threshold=Config.ANOMALY_Z_THRESHOLD,
+    rise_per_min=Config.ANOMALY_RISE_PER_MIN,
+    stuck_samples=Config.ANOMALY_STUCK_SAMPLES,
+    vibration_rate=Config.ANOMALY_VIBRATION_RATE
+)
+
+model_registry = ModelRegistry(Config.MODEL_REGISTRY)
+
+def load_rainfall_predictor():
+    from utils.rainfall_predictor import RainfallPredictor
+    return RainfallPredictor.from_registry(model_registry, Config.MODEL_PATH, Config.FOREST_PATH)
+
+rainfall_predictor = Lazy(load_rainfall_predictor, name="Rainfall predictor")
+
+# Loads run on a thread (never on the event loop); cached percentages came from the old model
+rainfall_reloader = ModelReloader(model_registry, rainfall_predictor, load_rainfall_predictor,
+                                  warm=lambda p: p.warm_up(), on_swap=lambda p: prediction_cache.clear())
+
+prediction_cache = PredictionCache(
+    maxsize=Config.PREDICTION_CACHE_SIZE,
+    ttl=Config.PREDICTION_CACHE_TTL,
+    quantum=Config.PREDICTION_CACHE_QUANTUM
+)
+
+DAM_LOCATION = {
+    "latitude": Config.DAM_LATITUDE,
+    "longitude": Config.DAM_LONGITUDE,
+    "name": "Smart Dam Location"
+}
+
+async def fetch_dam_weather():
+    with timed("weather.fetch"):
+        return await fetch_open_meteo_async(http, DAM_LOCATION["latitude"], DAM_LOCATION["longitude"], url=Config.WEATHER_API_URL)
+
+weather_cache = AsyncWeatherCache(
+    fetch_dam_weather,
+    ttl=Config.WEATHER_CACHE_TTL,
+    stale_ttl=Config.WEATHER_STALE_TTL,
+    negative_ttl=Config.WEATHER_NEGATIVE_TTL
+)
+
+async def watch_detection_results(interval):
+    """Forward detector_worker.py results to /api/stream subscribers."""
+    last = None
+    while True:
+        await asyncio.sleep(interval)
+        if not event_hub.subscriber_count():
+            continue
+        try:
+            doc = await db['human_detection'].find_one({"_id": "current"}, {"timestamp": 1})
+            if doc and doc.get("timestamp") != last:
+                last = doc.get("timestamp")
+                event_hub.publish("human", await human_detection_status())
+        except Exception as e:
+            print(f"⚠️ Detection watch failed: {e}")
+
+@app.before_serving
+async def startup():
+    global db, readings_col, alerts_col, valve_status_col, valve_control_col, stats_counters, http
+    db = mongo.get_async_db()
+    readings_col = db['readings']
+    alerts_col = db['alerts']
+    valve_status_col = db['valve_status']
+    valve_control_col = db['valve_control']
+    http = httpx.AsyncClient(limits=httpx.Limits(max_connections=20))
+
+    try:
+        # One-off at boot; the sync client is closed again in shutdown()
+        await asyncio.to_thread(ensure_schema, mongo.get_db(), timeseries=Config.READINGS_TIMESERIES,
+                                retention_days=Config.READINGS_RETENTION_DAYS)
+        print("✓ MongoDB indexes ensured")
+    except Exception as e:
+        print(f"⚠️ Could not ensure MongoDB indexes: {e}")
+
+    stats_counters = AsyncStatsCounters(db['stats'])
+    stats_counters.start_reconciler(readings_col, alerts_col, interval=Config.STATS_RECONCILE_INTERVAL)
+    background.append(asyncio.get_running_loop().create_task(device_sync.watch()))
+    if Config.MODEL_RELOAD_INTERVAL:
+        threading.Thread(target=rainfall_reloader.watch, args=(Config.MODEL_RELOAD_INTERVAL,), name="model-reload", daemon=True).start()
+    if Config.DETECTION_MODE == "off":
+        print("⚠️ Human detection disabled")
+    else:
+        if Config.DETECTION_MODE == "inline":
+            print("⚠️ DETECTION_MODE=inline is not supported by app_async.py; reading detector_worker.py results")
+        background.append(asyncio.get_running_loop().create_task(watch_detection_results(Config.DETECTION_INTERVAL)))
+    if Config.PRELOAD_APP:
+        await asyncio.to_thread(rainfall_predictor.get)
+
+@app.after_serving
+async def shutdown():
+    for task in background:
+        task.cancel()
+    await http.aclose()
+    mongo.close_client()
+
+HTTP_SECONDS = metrics.histogram("smartdam_http_request_duration_seconds", "Request latency (to first byte for streamed responses)", ["method", "route", "status"])
+
+@app.before_request
+async def start_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+async def record_request(response):
+    started = g.pop("request_started", None)
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        HTTP_SECONDS.observe(time.perf_counter() - started, method=request.method, route=route, status=response.status_code)
+    return response
+
+@app.errorhandler(RouteError)
+async def route_error(e):
+    return jsonify(e.body), e.status, e.headers
+
+def cache_samples():
+    weather = weather_cache.stats()
+    prediction = prediction_cache.stats()
+    samples = {("weather", k): weather[k] for k in ("hits", "staleHits", "negativeHits", "misses", "errors")}
+    samples.update({("prediction", k): prediction[k] for k in ("hits", "misses", "evictions")})
+    return samples
+
+metrics.callback("smartdam_cache_events_total", "Weather / prediction cache lookups by outcome", cache_samples,
+                 kind="counter", labelnames=["cache", "outcome"])
+metrics.callback("smartdam_stream_subscribers", "Open /api/stream connections", lambda: {(): event_hub.subscriber_count()})
+metrics.callback("smartdam_stream_events_total", "Server-sent events published / dropped for slow clients",
+                 lambda: {("published",): event_hub.published, ("dropped",): event_hub.dropped},
+                 kind="counter", labelnames=["event"])
+metrics.callback("smartdam_model_loaded", "Lazily loaded models that are in memory",
+                 lambda: {("rainfall",): int(rainfall_predictor.loaded)}, labelnames=["model"])
+metrics.callback("smartdam_device_sync_waiting", "Parked /api/device/sync requests", lambda: {(): device_sync.waiting})
+metrics.callback("smartdam_device_sync_woken_total", "Parked /api/device/sync requests answered by a change",
+                 lambda: {(): device_sync.woken}, kind="counter")
+metrics.callback("smartdam_device_sync_busy_total", "/api/device/sync requests refused with DEVICE_SYNC_MAX_WAITERS parked",
+                 lambda: {(): device_sync.busy}, kind="counter")
+metrics.callback("smartdam_anomaly_alerts_total", "Alerts derived from the readings stream by utils/anomaly.py",
+                 lambda: {(t,): anomaly_detector.stats()[t] for t in ANOMALY_TYPES}, kind="counter", labelnames=["type"])
+metrics.callback("smartdam_anomaly_nodes", "Nodes with rolling anomaly state in this process",
+                 lambda: {(): anomaly_detector.stats()["nodes"]})
+metrics.callback("smartdam_model_reloads_total", "Rainfall model hot reloads",
+                 lambda: {("ok",): rainfall_reloader.reloads, ("failed",): rainfall_reloader.failures},
+                 kind="counter", labelnames=["outcome"])
+metrics.callback("smartdam_model_version", "Rainfall model version serving in this process",
+                 lambda: {(rainfall_reloader.current_version() or "unversioned",): 1} if rainfall_predictor.loaded else {},
+                 labelnames=["version"])
+
+@app.route("/metrics")
+async def api_metrics():
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+@app.route("/")
+async def health():
+    return jsonify({"status": "ok", "service": "Smart Dam System", "version": "2.0"})
+
+@app.route("/api/location")
+async def api_location():
+    return jsonify(DAM_LOCATION)
+
+@app.route("/api/weather")
+async def api_weather():
+    return jsonify(weather_body(DAM_LOCATION["name"], await weather_cache.get()))
+
+async def find_latest_reading():
+    with timed("rainfall.find_latest"):
+        return await readings_col.find_one(sort=[("timestamp", -1)])
+
+async def get_weather():
+    with timed("rainfall.weather"):
+        return await weather_cache.get()
+
+@app.route("/api/rainfall")
+async def api_rainfall():
+    try:
+        # Independent: the weather is usually a cache hit, but a cold fetch overlaps the query
+        latest_reading, weather = await asyncio.gather(find_latest_reading(), get_weather())
+        body, status = await rainfall_prediction(latest_reading, weather)
+        return jsonify(body), status
+    except Exception as e:
+        return jsonify({"percent": 0, "rainLabel": "NO", "error": str(e)}), 500
+
+async def rainfall_prediction(latest_reading, weather):
+    """(body, status) of /api/rainfall for an already fetched reading and weather."""
+    model_input, error, status = rainfall_inputs(latest_reading, weather)
+    if error:
+        return error, status
+
+    cache_key = routes.prediction_key(prediction_cache, latest_reading, weather)
+    cached = prediction_cache.get(cache_key)
+    if cached is not None:
+        return cached, 200
+
+    with timed("rainfall.predict"):
+        percent, rain_label = await asyncio.to_thread(lambda: rainfall_predictor.get().predict(model_input))
+    prediction_doc, alert, result = routes.prediction_docs(percent, rain_label, model_input)
+
+    with timed("rainfall.store"):
+        await asyncio.gather(
+            db['rainfall_predictions'].update_one({"_id": "current"}, {"$set": prediction_doc}, upsert=True),
+            alerts_col.insert_one(alert),
+            stats_counters.record_alert("rainfall_prediction")
+        )
+
+    prediction_cache.put(cache_key, result)
+    event_hub.publish("rainfall", result)
+    return result, 200
+
+def paged_response(col, base=None, default_limit=500):
+    query, limit, projection = routes.page_args(request.args, base, default_limit, Config.QUERY_MAX_LIMIT)
+    cursor = col.find(query, projection, sort=[("timestamp", -1), ("_id", -1)], limit=limit, batch_size=min(limit, 1000))
+    return Response(astream_json_array(cursor, format_doc), mimetype="application/json")
+
+async def write_rollups(docs):
+    try:
+        with timed("readings.rollups"):
+            await asyncio.gather(*(db[name].bulk_write(ops, ordered=False) for name, ops in rollups.operations(docs)))
+    except Exception as e:
+        print(f"⚠️ Rollup update failed (run utils/rollups.py --rebuild): {e}")
+
+async def record_anomalies(readings):
+    """Derived alerts (rapid_rise, level_spike, sensor_stuck, vibration_burst) from freshly stored readings."""
+    try:
+        # A few microseconds per reading (benchmarks/bench_anomaly_replay.py), so it runs on the loop
+        with timed("readings.anomaly"):
+            alerts = anomaly_detector.observe(readings)
+        if not alerts:
+            return
+        await asyncio.gather(alerts_col.insert_many(alerts), *(stats_counters.record_alert(a["type"]) for a in alerts))
+        if event_hub.subscriber_count():
+            statistics = await stats_counters.read()
+            for alert in alerts:
+                event_hub.publish("alert", {"alert": format_doc(dict(alert)), "statistics": statistics})
+    except Exception as e:
+        print(f"⚠️ Anomaly detection failed: {e}")
+
+async def store_readings(docs):
+    if Config.READINGS_TIMESERIES and ingest.retried(docs):
+        # No unique _id on a time-series collection: skip what the failed attempt already stored
+        done = {d["_id"] async for d in readings_col.find(ingest.stored_ids_query(docs), {"_id": 1})}
+        docs = [d for d in docs if d["_id"] not in done]
+        if not docs:
+            return 0
+    stored, rejected = docs, []
+    try:
+        with timed("readings.insert"):
+            await readings_col.insert_many(docs, ordered=False)
+    except BulkWriteError as e:
+        stored, rejected = ingest.split_write_errors(docs, e)
+
+    if rejected:
+        print(f"⚠️ {len(rejected)} readings rejected ({rejected[0]['error']}), kept in {ingest.DEAD_LETTER}")
+        try:
+            await db[ingest.DEAD_LETTER].insert_many(rejected, ordered=False)
+        except Exception as e:
+            print(f"⚠️ Could not store rejected readings, dropped: {e}")
+    pending = [stats_counters.record_readings(len(stored))]
+    if Config.READINGS_ROLLUPS:
+        pending.append(write_rollups(stored))
+    if Config.ANOMALY_DETECTION:
+        pending.append(record_anomalies(stored))
+    await asyncio.gather(*pending)
+    if stored and event_hub.subscriber_count():
+        event_hub.publish("reading", {"reading": format_doc(dict(stored[-1])), "statistics": await stats_counters.read()})
+    return len(stored)
+
+@app.route("/api/readings", methods=["GET", "POST"])
+async def api_readings():
+    if request.method == "POST":
+        data = routes.stamped(await request.get_json())
+        await store_readings([data])
+        return jsonify({"success": True}), 201
+
+    return paged_response(readings_col, default_limit=500)
+
+@app.route("/api/readings/series")
+async def api_readings_series():
+    start, end, resolution, node, fields = routes.series_args(request.args, Config.SERIES_MAX_POINTS)
+    if resolution == "raw":
+        query, projection = routes.raw_series_find(start, end, node, fields)
+        cursor = readings_col.find(query, projection, sort=[("timestamp", 1)], limit=Config.QUERY_MAX_LIMIT)
+        points = [raw_point(doc, fields) async for doc in cursor]
+    else:
+        name, query, projection = rollups.series_query(resolution, start, end, node=node, fields=fields)
+        cursor = db[name].find(query, projection, sort=[("bucket", 1)], limit=Config.QUERY_MAX_LIMIT)
+        points = [bucket_point(doc, fields) async for doc in cursor]
+
+    return jsonify(series_body(resolution, node, start, end, points))
+
+@app.route("/api/readings/batch", methods=["POST"])
+async def api_readings_batch():
+    docs = routes.reading_batch(await request.get_json(), Config.READINGS_BATCH_MAX)
+    body, status = routes.inserted_body(await store_readings(docs) if docs else 0, len(docs))
+    return jsonify(body), status
+
+@app.route("/api/readings/frame", methods=["POST"])
+async def api_readings_frame():
+    """Binary batch from the device (utils/telemetry.py); decoded, validated and stored in one insert."""
+    try:
+        with timed("readings.decode"):
+            docs = decode_frame(await request.get_data(), max_records=Config.READINGS_BATCH_MAX)
+    except FrameError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    body, status = routes.inserted_body(await store_readings(docs) if docs else 0, len(docs))
+    return jsonify(body), status
+
+@app.route("/api/alerts/<alert_type>", methods=["POST"])
+async def api_alert(alert_type):
+    data = routes.stamped(await request.get_json(), type=alert_type)
+    await asyncio.gather(alerts_col.insert_one(data), stats_counters.record_alert(alert_type))
+    if event_hub.subscriber_count():
+        event_hub.publish("alert", {"alert": format_doc(dict(data)), "statistics": await stats_counters.read()})
+    return jsonify({"success": True}), 201
+
+@app.route("/api/alerts/<alert_type>/logs")
+async def api_alert_logs(alert_type):
+    return paged_response(alerts_col, base={"type": alert_type}, default_limit=200)
+
+async def valve_status():
+    status, control = await asyncio.gather(
+        valve_status_col.find_one({"_id": "current"}),
+        valve_control_col.find_one({"_id": "current"})
+    )
+    return valve_status_body(status, control)
+
+@app.route("/api/valve/status", methods=["GET", "PUT"])
+async def api_valve_status():
+    if request.method == "PUT":
+        data = routes.stamped(await request.get_json())
+        await valve_status_col.update_one({"_id": "current"}, {"$set": data}, upsert=True)
+        if event_hub.subscriber_count():
+            event_hub.publish("valve", await valve_status())
+        return jsonify({"success": True})
+
+    return jsonify(await valve_status())
+
+@app.route("/api/valve/control", methods=["GET", "POST"])
+async def api_valve_control():
+    if request.method == "POST":
+        control_data = routes.valve_control_update(await request.get_json())
+        await valve_control_col.update_one({"_id": "current"}, {"$set": control_data}, upsert=True)
+        await device_sync.changed()
+        if event_hub.subscriber_count():
+            event_hub.publish("valve", await valve_status())
+        return jsonify({"success": True})
+
+    return jsonify(valve_control_body(await valve_control_col.find_one({"_id": "current"})))
+
+@app.route("/api/admin/models")
+async def api_admin_models():
+    # Same role check as the POST routes; a GET has no body, so the role comes in the query string
+    routes.require_admin(request.args.get("userRole"))
+    manifest = await asyncio.to_thread(model_registry.read)
+    return jsonify({**manifest, "loaded": rainfall_reloader.current_version(), "pid": os.getpid()})
+
+@app.route("/api/admin/models/reload", methods=["POST"])
+async def api_admin_models_reload():
+    """Optionally activate `version`, then load it here; other workers follow on their next manifest check."""
+    version = routes.model_reload_args(await request.get_json(silent=True))
+
+    def activate_and_reload():
+        if version:
+            model_registry.activate(version)
+        return rainfall_reloader.reload()
+
+    try:
+        reloaded = await asyncio.to_thread(activate_and_reload)
+    except Exception as e:
+        raise routes.reload_error(e)
+    return jsonify(routes.reload_body(reloaded, rainfall_reloader))
+
+async def human_detection_status():
+    docs = {doc["_id"]: doc async for doc in db['human_detection'].find()}
+    return human_detection_body(docs, Config.DETECTOR_HEARTBEAT)
+
+@app.route("/api/human-detection/status")
+async def api_human_detection_status():
+    return jsonify(await human_detection_status())
+
+# Timed from the last refresh attempt, not the stored doc's timestamp: a prediction cache hit doesn't rewrite the doc
+device_sync_rain_refresh = routes.Every(Config.DEVICE_SYNC_RAIN_INTERVAL)
+
+async def device_sync_rainfall():
+    rain = await db['rainfall_predictions'].find_one({"_id": "current"}, {"percent": 1, "rainLabel": 1, "timestamp": 1})
+    if not device_sync_rain_refresh.due():
+        return rain
+    # Nodes no longer call /api/rainfall themselves, so keep the prediction they act on current here
+    try:
+        latest_reading, weather = await asyncio.gather(find_latest_reading(), get_weather())
+        if not reading_error(latest_reading):
+            body, status = await rainfall_prediction(latest_reading, weather)
+            if status == 200:
+                return body
+    except Exception as e:
+        print(f"⚠️ Device sync rainfall refresh failed: {e}")
+    return rain
+
+async def device_sync_state():
+    control, rain, detection = await asyncio.gather(
+        valve_control_col.find_one({"_id": "current"}),
+        device_sync_rainfall(),
+        human_detection_status()
+    )
+    return device_sync_body(control, rain, detection)
+
+device_sync = AsyncDeviceSync(device_sync_state, interval=Config.DEVICE_SYNC_INTERVAL,
+                               max_waiters=Config.DEVICE_SYNC_MAX_WAITERS)
+
+@app.route("/api/device/sync")
+async def api_device_sync():
+    """
+    Control mode, manual command, rain and human status for an ESP32 node.
+    With ?version=<last seen>&wait=<seconds> the request parks (as a task, not a thread) until the state changes.
+    """
+    wait = routes.sync_wait(request.args, Config.DEVICE_SYNC_MAX_WAIT)
+    try:
+        state = await device_sync.wait(request.args.get("version"), wait)
+    except SyncBusy:
+        # Answered at once instead of parking; the device backs off and polls again
+        raise routes.retry_later("Too many parked requests, retry later", 503, Config.DEVICE_SYNC_INTERVAL)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    resp = jsonify(state)
+    resp.headers["Cache-Control"] = "no-store"
+    return resp
+
+@app.route("/api/stream")
+async def api_stream():
+    if event_hub.full():
+        # Same limit as app.py: streams are tasks here, but each still pins a queue and a socket
+        raise routes.retry_later("Too many live connections, retry later", 503, Config.STREAM_RETRY_AFTER)
+
+    resp = Response(event_hub.stream(heartbeat=Config.STREAM_HEARTBEAT, full_retry=Config.STREAM_RETRY_AFTER),
+                    mimetype="text/event-stream")
+    resp.headers["Cache-Control"] = "no-cache"
+    resp.headers["X-Accel-Buffering"] = "no"
+    resp.timeout = None  # Quart would otherwise end the stream after 60s
+    return resp
+
+@app.route("/api/dashboard/stats")
+async def api_dashboard_stats():
+    try:
+        latest_reading, statistics, valve_status = await asyncio.gather(
+            readings_col.find_one(sort=[("timestamp", -1)]),
+            stats_counters.read(readings_col, alerts_col),
+            valve_status_col.find_one({"_id": "current"})
+        )
+        return jsonify(dashboard_stats_body(latest_reading, statistics, valve_status))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+def snapshot_response(body):
+    """200 with an ETag, or an empty 304 when the client already has this snapshot."""
+    tag = dashboard_etag(body)
+    resp = Response("", status=304) if request.if_none_match.contains(tag) else jsonify(body)
+    resp.set_etag(tag)
+    resp.headers["Cache-Control"] = "no-cache"
+    return resp
+
+async def latest_alert(alert_type):
+    return await alerts_col.find_one({"type": alert_type}, {"timestamp": 1}, sort=[("timestamp", -1), ("_id", -1)])
+
+@app.route("/api/dashboard")
+async def api_dashboard():
+    """One round trip for the whole dashboard; independent lookups run concurrently and are shared between cards."""
+    limit = routes.snapshot_limit(request.args, Config.SNAPSHOT_MAX_READINGS)
+    try:
+        with timed("dashboard.queries"):
+            readings, status, control, statistics, detection, weather, *alerts = await asyncio.gather(
+                readings_col.find({}, sort=[("timestamp", -1), ("_id", -1)], limit=limit).to_list(limit),
+                valve_status_col.find_one({"_id": "current"}),
+                valve_control_col.find_one({"_id": "current"}),
+                stats_counters.read(readings_col, alerts_col),
+                human_detection_status(),
+                weather_cache.get(),
+                *(latest_alert(t) for t in SNAPSHOT_ALERT_TYPES)
+            )
+
+        latest_reading = readings[0] if readings else None
+        try:
+            rainfall = (reading_error(latest_reading) or await rainfall_prediction(latest_reading, weather))[0]
+        except Exception as e:
+            rainfall = {"percent": 0, "rainLabel": "NO", "error": str(e)}
+
+        body = dashboard_snapshot_body(readings, weather_body(DAM_LOCATION["name"], weather), rainfall, status, control,
+                                       detection, statistics, dict(zip(SNAPSHOT_ALERT_TYPES, alerts)))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    return snapshot_response(body)
+
+if __name__ == "__main__":
+    port = int(os.getenv("PORT", 5000))
+    print(f"🔥 Async backend starting on :{port}")
+    app.run(host="0.0.0.0", port=port, debug=False)
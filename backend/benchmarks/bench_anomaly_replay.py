@@ -0,0 +1,110 @@
+"""
+Anomaly detector replay
+Generates synthetic water-level / vibration streams for --nodes nodes with a
+known number of injected incidents (rapid rise, spike, stuck sensor, vibration
+burst), replays them through utils/anomaly.py and reports readings/s, alerts
+found per injected incident and the size of the per-node state.
+
+Two paths are measured:
+    arrays  observe_arrays() on per-node batches of --batch readings (replay, backfill)
+    docs    observe() on reading documents in write-behind sized batches, as store_readings() feeds it
+
+    python benchmarks/bench_anomaly_replay.py [--readings 10000000] [--nodes 100] [--batch 4096]
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.anomaly import ALERT_TYPES, AnomalyDetector
+
+INTERVAL = 2.0  # seconds between readings of one node
+
+
+def synthetic_stream(rng, n, incidents):
+    """(t, level, vibration) for one node with `incidents` of each kind spread over the stream."""
+    t = np.arange(n) * INTERVAL
+    level = 40.0 + np.cumsum(rng.normal(0, 0.002, n)) + rng.normal(0, 0.3, n)
+    vibration = np.zeros(n)
+    slots = np.linspace(0, n, 4 * incidents + 1, dtype=np.int64)[:-1] + 500
+    for k, start in enumerate(slots):
+        kind = k % 4
+        if kind == 0:    # 15 points over 150 readings, then drains slowly
+            level[start:start + 150] += np.linspace(0, 15, 150)
+            level[start + 150:start + 1650] += np.linspace(15, 0, 1500)
+        elif kind == 1:  # single bad echo
+            level[start] += 20
+        elif kind == 2:  # sensor frozen for 200 readings
+            level[start:start + 200] = level[start]
+        else:            # 60 readings of continuous vibration
+            vibration[start:start + 60] = 1
+    return t, np.clip(level, 0, 100), vibration
+
+
+def replay_arrays(detector, streams, batch):
+    per_node = len(streams[0][0])
+    alerts = 0
+    started = time.perf_counter()
+    for start in range(0, per_node, batch):
+        for node, (t, level, vibration) in enumerate(streams):
+            alerts += len(detector.observe_arrays(node, t[start:start + batch], level[start:start + batch],
+                                                  vibration[start:start + batch]))
+    return time.perf_counter() - started, alerts
+
+
+def replay_docs(detector, streams, batch, limit):
+    """Interleave nodes reading by reading, like the write-behind buffer sees them."""
+    epoch = datetime(2024, 1, 1)
+    docs = []
+    for i in range(min(limit // len(streams), len(streams[0][0]))):
+        for node, (t, level, vibration) in enumerate(streams):
+            docs.append({"nodeId": f"node-{node}", "timestamp": epoch + timedelta(seconds=float(t[i])),
+                         "percent": float(level[i]), "vibration": bool(vibration[i])})
+    started = time.perf_counter()
+    for start in range(0, len(docs), batch):
+        detector.observe(docs[start:start + batch])
+    return time.perf_counter() - started, len(docs)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--readings", type=int, default=10_000_000)
+    parser.add_argument("--nodes", type=int, default=100)
+    parser.add_argument("--batch", type=int, default=4096, help="readings per node per observe_arrays() call")
+    parser.add_argument("--incidents", type=int, default=5, help="injected incidents of each kind per node")
+    parser.add_argument("--docs", type=int, default=200_000, help="readings for the observe() path")
+    parser.add_argument("--doc-batch", type=int, default=500, help="documents per observe() call (READINGS_FLUSH_BATCH)")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    per_node = args.readings // args.nodes
+    streams = [synthetic_stream(rng, per_node, args.incidents) for _ in range(args.nodes)]
+    total = per_node * args.nodes
+
+    detector = AnomalyDetector()
+    seconds, alerts = replay_arrays(detector, streams, args.batch)
+    stats = detector.stats()
+    injected = args.incidents * args.nodes
+    print(f"arrays  {total} readings, {args.nodes} nodes, batch {args.batch}: {seconds:.2f}s, "
+          f"{total / seconds:,.0f} readings/s")
+    print(f"        alerts per injected incident: " +
+          ", ".join(f"{kind} {stats[kind] / injected:.2f}" for kind in ALERT_TYPES) + f" ({alerts} alerts)")
+    print(f"        state: {stats['state_bytes']} bytes for {stats['nodes']} nodes")
+
+    for batch in (1, 16, 64, 256):
+        sub = [(t[:batch * 50], level[:batch * 50], vibration[:batch * 50]) for t, level, vibration in streams[:10]]
+        seconds, _ = replay_arrays(AnomalyDetector(), sub, batch)
+        n = sum(len(t) for t, _, _ in sub)
+        print(f"arrays  batch {batch:<5}: {n / seconds:,.0f} readings/s")
+
+    seconds, n = replay_docs(AnomalyDetector(), streams, args.doc_batch, args.docs)
+    print(f"docs    {n} readings in batches of {args.doc_batch} across {args.nodes} nodes: {n / seconds:,.0f} readings/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+API latency with and without human detection
+Starts the backend under gunicorn once per detection mode, drives the
+device/dashboard endpoints with concurrent clients and reports p50/p95/p99.
+
+    off     no detection at all (baseline)
+    inline  YOLO on a thread inside the gunicorn worker (old layout)
+    worker  YOLO in detector_worker.py, web worker only reads status
+
+Point CAMERA_SOURCE / CAMERA_SOURCES at a video file to run without a webcam:
+
+    CAMERA_SOURCE=clip.mp4 python benchmarks/bench_api_latency.py --clients 16 --seconds 30
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import threading
+import time
+import numpy as np
+import requests
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ENDPOINTS = [
+    "/api/human-detection/status",
+    "/api/valve/control",
+    "/api/dashboard/stats",
+    "/api/readings?limit=20",
+]
+
+
+def wait_ready(url, timeout=120):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if requests.get(url + "/", timeout=2).ok:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError("backend did not come up")
+
+
+def load(url, clients, seconds):
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    def client(i):
+        session = requests.Session()
+        n = i
+        while not stop.is_set():
+            path = ENDPOINTS[n % len(ENDPOINTS)]
+            n += 1
+            started = time.perf_counter()
+            try:
+                ok = session.get(url + path, timeout=30).ok
+            except requests.RequestException:
+                ok = False
+            elapsed = (time.perf_counter() - started) * 1000.0
+            with lock:
+                latencies.append(elapsed)
+                if not ok:
+                    errors[0] += 1
+
+    threads = [threading.Thread(target=client, args=(i,), daemon=True) for i in range(clients)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    return np.array(latencies), errors[0]
+
+
+def run_mode(mode, args):
+    env = dict(os.environ, DETECTION_MODE=mode, PORT=str(args.port))
+    procs = [subprocess.Popen(
+        ["gunicorn", "app:app", "--worker-class", "gthread", "--threads", str(args.threads), "--bind", f"127.0.0.1:{args.port}"],
+        cwd=BACKEND, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )]
+    if mode == "worker":
+        procs.append(subprocess.Popen([sys.executable, "detector_worker.py"], cwd=BACKEND, env=env,
+                                      stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL))
+    url = f"http://127.0.0.1:{args.port}"
+    try:
+        wait_ready(url)
+        time.sleep(args.warmup)  # let the model load and detection settle
+        return load(url, args.clients, args.seconds)
+    finally:
+        for proc in procs:
+            proc.terminate()
+        for proc in procs:
+            proc.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--modes", default="off,inline,worker")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=30.0)
+    parser.add_argument("--warmup", type=float, default=10.0)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--port", type=int, default=5055)
+    args = parser.parse_args()
+
+    print(f"{'mode':<8} | {'requests':>8} | {'req/s':>7} | {'p50 ms':>7} | {'p95 ms':>7} | {'p99 ms':>7} | errors")
+    print("-" * 70)
+    for mode in args.modes.split(","):
+        latencies, errors = run_mode(mode, args)
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) if len(latencies) else (0, 0, 0)
+        print(f"{mode:<8} | {len(latencies):>8} | {len(latencies) / args.seconds:>7.1f} | "
+              f"{p50:>7.1f} | {p95:>7.1f} | {p99:>7.1f} | {errors}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Dashboard refresh: per-card fan-out vs one /api/dashboard snapshot
+Against a running backend, refreshes the dashboard --refreshes times each way
+and reports per refresh: requests, bytes on the wire (body + headers), client
+wall time, and server time / MongoDB commands taken from the backend's own
+/metrics (so run it with one worker, metrics are per process).
+
+    WEB_CONCURRENCY=1 gunicorn -c gunicorn.conf.py app:app &
+    python benchmarks/bench_dashboard_snapshot.py --refreshes 50
+"""
+
+import argparse
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+
+# What Dashboard.tsx requested per refresh before /api/dashboard
+FAN_OUT = [
+    "/api/readings?limit=20",
+    "/api/weather",
+    "/api/rainfall",
+    "/api/valve/status",
+    "/api/human-detection/status",
+    "/api/dashboard/stats",
+    "/api/alerts/vibration/logs?limit=1",
+    "/api/alerts/human/logs?limit=1",
+]
+SNAPSHOT = "/api/dashboard?readings=20"
+
+SAMPLE = re.compile(r"^(smartdam_http_request_duration_seconds_(?:sum|count)|smartdam_mongo_command_seconds_count)\{([^}]*)\} (\S+)$", re.M)
+
+
+def server_totals(session, url):
+    """(server seconds, requests, mongo commands) so far, excluding /metrics itself."""
+    text = session.get(url + "/metrics", timeout=10).text
+    seconds = requests_seen = commands = 0.0
+    for name, labels, value in SAMPLE.findall(text):
+        if 'route="/metrics"' in labels:
+            continue
+        if name.endswith("_sum"):
+            seconds += float(value)
+        elif name.startswith("smartdam_http"):
+            requests_seen += float(value)
+        else:
+            commands += float(value)
+    return seconds, requests_seen, commands
+
+
+def wire_bytes(resp):
+    headers = sum(len(k) + len(v) + 4 for k, v in resp.headers.items())
+    return len(resp.content) + headers + len(f"HTTP/1.1 {resp.status_code} {resp.reason}\r\n")
+
+
+def fan_out(session, url, pool):
+    responses = list(pool.map(lambda path: session.get(url + path, timeout=30), FAN_OUT))
+    return sum(wire_bytes(r) for r in responses), len(responses)
+
+
+def snapshot(session, url, etag=None):
+    resp = session.get(url + SNAPSHOT, headers={"If-None-Match": etag} if etag else {}, timeout=30)
+    return resp, wire_bytes(resp)
+
+
+def measure(name, session, url, refreshes, refresh):
+    before = server_totals(session, url)
+    total_bytes = total_requests = 0
+    started = time.perf_counter()
+    for _ in range(refreshes):
+        n_bytes, n_requests = refresh()
+        total_bytes += n_bytes
+        total_requests += n_requests
+    wall = time.perf_counter() - started
+    after = server_totals(session, url)
+    server_s, _, commands = (a - b for a, b in zip(after, before))
+    print(f"{name:<18} | {total_requests / refreshes:>8.1f} | {total_bytes / refreshes / 1024:>8.1f} | "
+          f"{wall / refreshes * 1000:>8.1f} | {server_s / refreshes * 1000:>9.1f} | {commands / refreshes:>6.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://localhost:5000")
+    parser.add_argument("--refreshes", type=int, default=50)
+    args = parser.parse_args()
+
+    session = requests.Session()
+    # Warm the model, weather cache and prediction cache so both sides see the steady state
+    session.post(args.url + "/api/readings/batch", json=[{"temp": 28.0, "humidity": 70.0, "percent": 40.0}], timeout=10)
+    for path in FAN_OUT + [SNAPSHOT, SNAPSHOT]:
+        session.get(args.url + path, timeout=60)
+
+    print(f"{'per refresh':<18} | {'requests':>8} | {'KiB':>8} | {'wall ms':>8} | {'server ms':>9} | {'mongo':>6}")
+    with ThreadPoolExecutor(max_workers=len(FAN_OUT)) as pool:
+        measure("fan-out (8 calls)", session, args.url, args.refreshes, lambda: fan_out(session, args.url, pool))
+
+    def full():
+        _, n_bytes = snapshot(session, args.url)
+        return n_bytes, 1
+    measure("snapshot 200", session, args.url, args.refreshes, full)
+
+    etag = snapshot(session, args.url)[0].headers.get("ETag")
+
+    def revalidate():
+        resp, n_bytes = snapshot(session, args.url, etag)
+        return n_bytes, 1
+    measure("snapshot 304", session, args.url, args.refreshes, revalidate)
+
+
+if __name__ == "__main__":
+    main()
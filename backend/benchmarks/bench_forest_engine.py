@@ -0,0 +1,93 @@
+"""
+Flat forest engine vs sklearn
+Startup time and peak RSS are measured in fresh interpreters; parity and
+predict_proba throughput are measured in-process.
+
+    python utils/forest_engine.py            # export first
+    python benchmarks/bench_forest_engine.py
+"""
+
+import os
+import subprocess
+import sys
+import time
+import joblib
+import numpy as np
+import pandas as pd
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+
+from utils.forest_engine import FlatForest, CSV_PATH, MODEL_PATH, FOREST_PATH
+
+BATCH_SIZES = [1, 10, 100, 1_000, 10_000, 100_000]
+
+LOAD_SNIPPETS = {
+    "sklearn (joblib.load)": "import joblib; m = joblib.load({path!r})",
+    "flat (FlatForest.load)": "from utils.forest_engine import FlatForest; m = FlatForest.load({path!r})",
+}
+
+PROBE = """
+import resource, sys, time
+sys.path.insert(0, {backend!r})
+start = time.perf_counter()
+{snippet}
+elapsed = time.perf_counter() - start
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(elapsed, peak)
+"""
+
+
+def measure_load(snippet, path):
+    code = PROBE.format(backend=BACKEND_DIR, snippet=snippet.format(path=path))
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    elapsed, peak = out.stdout.split()
+    return float(elapsed), int(peak) / 1024.0
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    if not os.path.exists(FOREST_PATH):
+        print(f"❌ {FOREST_PATH} not found, run utils/forest_engine.py first")
+        sys.exit(1)
+
+    print(f"{'='*60}\nSTARTUP (fresh interpreter, includes imports)\n{'='*60}")
+    for name, snippet in LOAD_SNIPPETS.items():
+        path = MODEL_PATH if name.startswith("sklearn") else FOREST_PATH
+        elapsed, peak = measure_load(snippet, path)
+        print(f"{name:<24} load {elapsed * 1000:8.1f} ms   peak RSS {peak:7.1f} MB")
+
+    model = joblib.load(MODEL_PATH)
+    forest = FlatForest.load(FOREST_PATH)
+    cols = forest.feature_names
+
+    print(f"\n{'='*60}\nPARITY\n{'='*60}")
+    data = pd.read_csv(CSV_PATH)[cols].to_numpy(dtype=np.float64)
+    rng = np.random.default_rng(0)
+    lo, hi = data.min(axis=0), data.max(axis=0)
+    synthetic = rng.uniform(lo - 0.1 * (hi - lo), hi + 0.1 * (hi - lo), size=(100_000, len(cols)))
+    for name, X in [("training CSV", data), ("100k synthetic", synthetic)]:
+        expected = model.predict_proba(pd.DataFrame(X, columns=cols))
+        identical = np.array_equal(expected, forest.predict_proba(X))
+        print(f"{name:<16} rows={len(X):>7}  bit-identical: {identical}")
+
+    print(f"\n{'='*60}\nTHROUGHPUT (rows/sec, best of 3)\n{'='*60}")
+    print(f"{'batch':>8} | {'sklearn':>12} | {'flat':>12} | speedup")
+    for n in BATCH_SIZES:
+        X = synthetic[:n]
+        df = pd.DataFrame(X, columns=cols)
+        sk = n / best_of(lambda: model.predict_proba(df), 3)
+        flat = n / best_of(lambda: forest.predict_proba(X), 3)
+        print(f"{n:>8} | {sk:>12,.0f} | {flat:>12,.0f} | {flat / sk:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
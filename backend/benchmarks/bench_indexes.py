@@ -0,0 +1,106 @@
+"""
+Index layout benchmark (needs a local mongod)
+Seeds readings/alerts into a scratch database, then times the app's hot
+queries before and after utils/db_schema.ensure_schema().
+
+    python benchmarks/bench_indexes.py --readings 2000000 --alerts 1000000
+    python benchmarks/bench_indexes.py --timeseries     # readings as a time-series collection
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pymongo import MongoClient
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.db_schema import ensure_schema, create_readings_timeseries
+
+ALERT_TYPES = ["waterlevel", "vibration", "human", "rainfall_prediction"]
+BATCH = 10000
+
+
+def seed(db, n_readings, n_alerts, timeseries):
+    db.drop_collection("readings")
+    db.drop_collection("alerts")
+    if timeseries:
+        create_readings_timeseries(db)
+
+    start = datetime.utcnow() - timedelta(seconds=2 * n_readings)
+    t0 = time.perf_counter()
+    for offset in range(0, n_readings, BATCH):
+        db.readings.insert_many([{
+            "nodeId": "main",
+            "temp": 20 + random.random() * 15,
+            "humidity": 40 + random.random() * 50,
+            "distance": random.random() * 40,
+            "percent": random.random() * 100,
+            "vibration": False,
+            "valve_state": "CLOSED",
+            "timestamp": start + timedelta(seconds=2 * i),
+        } for i in range(offset, min(offset + BATCH, n_readings))], ordered=False)
+
+    for offset in range(0, n_alerts, BATCH):
+        db.alerts.insert_many([{
+            "type": random.choice(ALERT_TYPES),
+            "nodeId": "main",
+            "timestamp": start + timedelta(seconds=random.randint(0, 2 * n_readings)),
+        } for _ in range(offset, min(offset + BATCH, n_alerts))], ordered=False)
+    print(f"Seeded {n_readings:,} readings / {n_alerts:,} alerts in {time.perf_counter() - t0:.1f}s")
+
+
+def queries(db):
+    return {
+        "readings latest 500": lambda: list(db.readings.find(sort=[("timestamp", -1)], limit=500)),
+        "readings latest 1": lambda: db.readings.find_one(sort=[("timestamp", -1)]),
+        "alerts vibration 200": lambda: list(db.alerts.find({"type": "vibration"}, sort=[("timestamp", -1)], limit=200)),
+        "alerts human 200": lambda: list(db.alerts.find({"type": "human"}, sort=[("timestamp", -1)], limit=200)),
+        "count alerts by type": lambda: [db.alerts.count_documents({"type": t}) for t in ("vibration", "waterlevel", "human")],
+    }
+
+
+def measure(db, repeat):
+    results = {}
+    for name, fn in queries(db).items():
+        fn()
+        start = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        results[name] = (time.perf_counter() - start) / repeat * 1000.0
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mongo-uri", default="mongodb://localhost:27017/")
+    parser.add_argument("--db", default="smart_dam_bench")
+    parser.add_argument("--readings", type=int, default=1_000_000)
+    parser.add_argument("--alerts", type=int, default=500_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--timeseries", action="store_true")
+    args = parser.parse_args()
+
+    db = MongoClient(args.mongo_uri)[args.db]
+    seed(db, args.readings, args.alerts, args.timeseries)
+
+    before = measure(db, args.repeat)
+    t0 = time.perf_counter()
+    ensure_schema(db, timeseries=args.timeseries)
+    print(f"ensure_schema: {time.perf_counter() - t0:.1f}s")
+    after = measure(db, args.repeat)
+
+    print(f"\n{'query':<24} | {'before ms':>10} | {'after ms':>10} | speedup")
+    print("-" * 62)
+    for name in before:
+        print(f"{name:<24} | {before[name]:>10.2f} | {after[name]:>10.2f} | {before[name] / after[name]:6.1f}x")
+
+    plan = db.alerts.find({"type": "human"}, sort=[("timestamp", -1)], limit=200).explain()
+    stats = plan.get("executionStats", {})
+    print(f"\nalerts plan: docsExamined={stats.get('totalDocsExamined')} keysExamined={stats.get('totalKeysExamined')}")
+
+
+if __name__ == "__main__":
+    main()
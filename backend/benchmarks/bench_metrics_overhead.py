@@ -0,0 +1,72 @@
+"""
+Metrics overhead benchmark
+Measures what instrumentation adds to a hot path: a histogram observation,
+a timed() block, a counter increment, and a full /metrics render, single
+threaded and with several threads contending for the same series.
+
+    python benchmarks/bench_metrics_overhead.py [--n 200000] [--threads 8]
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import metrics
+
+
+def per_call_ns(fn, n):
+    started = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - started) / n * 1e9
+
+
+def contended_ns(fn, n, threads):
+    per_thread = n // threads
+    workers = [threading.Thread(target=lambda: [fn() for _ in range(per_thread)]) for _ in range(threads)]
+    started = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    return (time.perf_counter() - started) / (per_thread * threads) * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=200000)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    hist = metrics.histogram("bench_seconds", "benchmark", ["stage"])
+    count = metrics.counter("bench_total", "benchmark", ["outcome"])
+
+    def timed_block():
+        with metrics.timed("bench.block"):
+            pass
+
+    cases = [
+        ("baseline (empty call)", lambda: None),
+        ("histogram.observe", lambda: hist.observe(0.004, stage="x")),
+        ("timed() block", timed_block),
+        ("counter.inc", lambda: count.inc(outcome="hit")),
+    ]
+    print(f"{'operation':<24} | {'ns/call':>8} | {f'ns/call x{args.threads} threads':>20}")
+    for name, fn in cases:
+        print(f"{name:<24} | {per_call_ns(fn, args.n):>8.0f} | {contended_ns(fn, args.n, args.threads):>20.0f}")
+
+    # Roughly what a scrape of a busy process renders
+    for i in range(40):
+        hist.observe(0.01, stage=f"stage{i}")
+    started = time.perf_counter()
+    for _ in range(100):
+        body = metrics.render()
+    print(f"\nrender(): {(time.perf_counter() - started) * 10:.2f} ms for {body.count(chr(10))} lines")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Rainfall model hot reload under load
+Builds a throwaway registry with two versions of the current model, keeps
+--threads request threads predicting through the same Lazy + ModelReloader the
+app uses, and flips the active version every --every seconds. Reports
+prediction latency inside vs outside reload windows, reload time, and process
+RSS before, at peak and after the reloads.
+
+    python benchmarks/bench_model_reload.py [--engine forest|sklearn] [--reloads 5]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+
+from utils.lazy import Lazy
+from utils.model_registry import ModelRegistry, ModelReloader
+from utils.rainfall_predictor import RainfallPredictor
+
+MODEL_PATH = os.path.join(BACKEND_DIR, 'models', 'rainfall_model.pkl')
+FOREST_PATH = os.path.join(BACKEND_DIR, 'models', 'rainfall_forest.npz')
+INPUT = {'Temperature': 27.5, 'Humidity': 81.0, 'Wind_Speed': 9.4, 'Cloud_Cover': 62.0, 'Pressure': 1013.25}
+
+
+def rss_mb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024.0
+    return float("nan")
+
+
+def build_registry(directory, engine):
+    registry = ModelRegistry(directory)
+    for version in ("v1", "v2"):
+        path = registry.path(version)
+        os.makedirs(path)
+        shutil.copyfile(MODEL_PATH, os.path.join(path, "model.pkl"))
+        if engine == "forest":
+            shutil.copyfile(FOREST_PATH, os.path.join(path, "rainfall_forest.npz"))
+        with open(os.path.join(path, "metadata.json"), "w") as f:
+            json.dump({"created_at": version}, f)
+        registry.register(path, activate=version == "v1")
+    return registry
+
+
+def percentiles(samples):
+    if not samples:
+        return "n/a"
+    ms = np.array(samples) * 1000
+    return f"p50 {np.percentile(ms, 50):6.3f}  p99 {np.percentile(ms, 99):6.3f}  max {ms.max():7.3f} ms  (n={len(ms)})"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--engine", choices=["forest", "sklearn"], default="forest")
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--reloads", type=int, default=5)
+    parser.add_argument("--every", type=float, default=1.0, help="seconds between version flips")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="registry-")
+    try:
+        registry = build_registry(tmp, args.engine)
+        load = lambda: RainfallPredictor.from_registry(registry, MODEL_PATH)
+        predictor = Lazy(load, name="Rainfall predictor")
+        reloader = ModelReloader(registry, predictor, load, warm=lambda p: p.warm_up())
+        predictor.get().warm_up()
+
+        stop = threading.Event()
+        samples = []  # (finished at, seconds)
+
+        def client():
+            local = []
+            while not stop.is_set():
+                started = time.perf_counter()
+                predictor.get().predict(INPUT)
+                finished = time.perf_counter()
+                local.append((finished, finished - started))
+            samples.extend(local)
+
+        peak = [rss_mb()]
+
+        def sample_rss():
+            while not stop.is_set():
+                peak.append(rss_mb())
+                time.sleep(0.005)
+
+        baseline_rss = rss_mb()
+        threads = [threading.Thread(target=client) for _ in range(args.threads)]
+        threads.append(threading.Thread(target=sample_rss))
+        for t in threads:
+            t.start()
+
+        windows, reload_seconds = [], []
+        for i in range(args.reloads):
+            time.sleep(args.every)
+            registry.activate("v2" if i % 2 == 0 else "v1")
+            started = time.perf_counter()
+            reloader.reload()
+            windows.append((started, time.perf_counter()))
+            reload_seconds.append(reloader.last_seconds)
+        time.sleep(args.every)
+        stop.set()
+        for t in threads:
+            t.join()
+
+        during = [s for at, s in samples if any(a <= at <= b for a, b in windows)]
+        outside = [s for at, s in samples if not any(a <= at <= b for a, b in windows)]
+        print(f"engine={args.engine} threads={args.threads} reloads={len(windows)} (serving {reloader.current_version()})")
+        print(f"reload time        mean {np.mean(reload_seconds) * 1000:.1f} ms, max {max(reload_seconds) * 1000:.1f} ms")
+        print(f"latency outside    {percentiles(outside)}")
+        print(f"latency in reload  {percentiles(during)}")
+        print(f"RSS                before {baseline_rss:.1f} MB, peak {max(peak):.1f} MB, after {rss_mb():.1f} MB")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+MongoDB connections under sustained human detections (needs a mongod)
+Inserts one human alert per detection at --rate per second, either the old
+way (a new MongoClient per alert, never closed) or through the shared pooled
+client in utils/db.py, and samples the server's open connection count.
+
+    python benchmarks/bench_mongo_connections.py --rate 5 --seconds 60
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+import numpy as np
+from pymongo import MongoClient
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import db as mongo
+
+ALERT = {"type": "human", "detected": True, "confidence": 0.9, "nodeId": "bench"}
+
+
+def per_alert_insert(uri, db_name, leaked):
+    client = MongoClient(uri)
+    leaked.append(client)  # the old code never closed these either
+    client[db_name]["alerts"].insert_one({**ALERT, "timestamp": datetime.utcnow()})
+
+
+def shared_insert(uri, db_name, leaked):
+    mongo.get_db(db_name)["alerts"].insert_one({**ALERT, "timestamp": datetime.utcnow()})
+
+
+def run(mode, args, monitor):
+    insert = per_alert_insert if mode == "per-alert" else shared_insert
+    leaked = []
+    latencies = []
+    samples = []
+    period = 1.0 / args.rate
+    started = time.perf_counter()
+    next_sample = started
+    while time.perf_counter() - started < args.seconds:
+        t0 = time.perf_counter()
+        insert(args.mongo_uri, args.db, leaked)
+        latencies.append((time.perf_counter() - t0) * 1000.0)
+        if t0 >= next_sample:
+            samples.append(monitor.admin.command("serverStatus")["connections"]["current"])
+            next_sample += 1.0
+        time.sleep(max(0.0, period - (time.perf_counter() - t0)))
+    for client in leaked:
+        client.close()
+    return np.array(latencies), samples
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mongo-uri", default="mongodb://localhost:27017/")
+    parser.add_argument("--db", default="smart_dam_bench")
+    parser.add_argument("--rate", type=float, default=5.0, help="detections per second")
+    parser.add_argument("--seconds", type=float, default=30.0)
+    args = parser.parse_args()
+
+    monitor = MongoClient(args.mongo_uri, maxPoolSize=1)
+    mongo.Config.MONGO_URI = args.mongo_uri
+
+    for mode in ("per-alert", "shared"):
+        latencies, samples = run(mode, args, monitor)
+        time.sleep(2)  # let closed sockets drain before the next run
+        print(f"{mode:<10} inserts={len(latencies)} p50={np.percentile(latencies, 50):.2f}ms "
+              f"p99={np.percentile(latencies, 99):.2f}ms")
+        print(f"           server connections (1/s): {samples[0]} -> {samples[-1]}  max {max(samples)}")
+        print(f"           timeline: {' '.join(map(str, samples))}")
+
+    stats = mongo.metrics.stats()
+    print(f"\nshared client: connections created {stats['connectionsCreated']}, open {stats['connectionsOpen']}, "
+          f"insert avg {stats['commands'].get('insert', {}).get('avgMs', 0)}ms")
+    mongo.close_client()
+
+
+if __name__ == "__main__":
+    main()
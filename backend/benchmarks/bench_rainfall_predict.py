@@ -0,0 +1,77 @@
+"""
+Rainfall predictor throughput
+Compares the old one-row DataFrame predict(), the array-based predict() and
+predict_many() in rows/sec for batch sizes 1 .. 100k.
+
+    python benchmarks/bench_rainfall_predict.py [--model models/rainfall_model.pkl]
+"""
+
+import argparse
+import os
+import sys
+import time
+import warnings
+import joblib
+import numpy as np
+import pandas as pd
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+
+from utils.rainfall_predictor import RainfallPredictor
+
+CSV_PATH = os.path.join(BACKEND_DIR, 'utils', 'weather_forecast_data.csv')
+BATCH_SIZES = [1, 10, 100, 1_000, 10_000, 100_000]
+MAX_PER_ROW_CALLS = 300  # per-row paths are timed on a sample and extrapolated
+
+
+def legacy_predict(model, feature_cols, input_data):
+    X = pd.DataFrame([input_data], columns=feature_cols)
+    proba = model.predict_proba(X)
+    return round(proba[0][1] * 100.0, 2)
+
+
+def rows_per_sec(fn, rows):
+    start = time.perf_counter()
+    for r in rows:
+        fn(r)
+    return len(rows) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default=os.path.join(BACKEND_DIR, 'models', 'rainfall_model.pkl'))
+    args = parser.parse_args()
+
+    legacy_model = joblib.load(args.model)
+    predictor = RainfallPredictor(args.model)
+    cols = predictor.feature_cols
+
+    data = pd.read_csv(CSV_PATH)[cols].to_numpy(dtype=np.float64)
+    rng = np.random.default_rng(42)
+
+    # Parity check on the full CSV
+    legacy = legacy_model.predict_proba(pd.DataFrame(data, columns=cols))[:, 1] * 100.0
+    percent, _ = predictor.predict_many(data)
+    print(f"Parity vs DataFrame path: max |diff| = {np.max(np.abs(np.round(legacy, 2) - percent)):.6f}")
+
+    print(f"\n{'batch':>8} | {'legacy rows/s':>14} | {'predict rows/s':>14} | {'predict_many rows/s':>20} | speedup")
+    print("-" * 80)
+    for n in BATCH_SIZES:
+        X = data[rng.integers(0, len(data), size=n)]
+        sample = [dict(zip(cols, row)) for row in X[:MAX_PER_ROW_CALLS]]
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            legacy_rps = rows_per_sec(lambda r: legacy_predict(legacy_model, cols, r), sample)
+        single_rps = rows_per_sec(predictor.predict, sample)
+
+        start = time.perf_counter()
+        predictor.predict_many(X)
+        batch_rps = n / (time.perf_counter() - start)
+
+        print(f"{n:>8} | {legacy_rps:>14,.0f} | {single_rps:>14,.0f} | {batch_rps:>20,.0f} | {batch_rps / legacy_rps:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
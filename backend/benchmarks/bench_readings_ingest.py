@@ -0,0 +1,126 @@
+"""
+Readings ingest benchmark
+One insert_one per sample (old POST path) vs the write-behind buffer that
+flushes with insert_many(ordered=False).
+
+    python benchmarks/bench_readings_ingest.py                          # mongomock
+    python benchmarks/bench_readings_ingest.py --mongo-uri mongodb://localhost:27017/
+    python benchmarks/bench_readings_ingest.py --rtt-ms 2               # mongomock + simulated round trip
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.write_buffer import BufferFull, WriteBehindBuffer
+
+
+class SlowCollection:
+    """Adds a fixed delay per call to mimic a network round trip to mongod."""
+
+    def __init__(self, col, rtt):
+        self.col = col
+        self.rtt = rtt
+
+    def insert_one(self, doc):
+        time.sleep(self.rtt)
+        return self.col.insert_one(doc)
+
+    def insert_many(self, docs, ordered=True):
+        time.sleep(self.rtt)
+        return self.col.insert_many(docs, ordered=ordered)
+
+
+def sample(i):
+    return {
+        "temp": 27.0 + (i % 10) * 0.1,
+        "humidity": 60.0 + (i % 7),
+        "distance": 15.2,
+        "percent": 62.0,
+        "rain_prediction": 45.5,
+        "vibration": False,
+        "valve_state": "CLOSED",
+        "human_detected": False,
+        "human_confidence": 0.0,
+        "timestamp": datetime.utcnow(),
+    }
+
+
+def run(post, n, threads):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(post, range(n)))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mongo-uri", help="use a real mongod instead of mongomock")
+    parser.add_argument("-n", type=int, default=20000, help="readings per run")
+    parser.add_argument("--threads", type=int, default=8, help="concurrent request handlers")
+    parser.add_argument("--rtt-ms", type=float, default=0.0, help="simulated round trip per Mongo call")
+    args = parser.parse_args()
+
+    if args.mongo_uri:
+        from pymongo import MongoClient
+        db = MongoClient(args.mongo_uri)["smart_dam_bench"]
+    else:
+        import mongomock
+        db = mongomock.MongoClient()["smart_dam_bench"]
+
+    def collection(name):
+        db.drop_collection(name)
+        col = db[name]
+        return SlowCollection(col, args.rtt_ms / 1000.0) if args.rtt_ms else col
+
+    print(f"{args.n} readings, {args.threads} handler threads, backend: {'mongod' if args.mongo_uri else 'mongomock'}"
+          f"{f' + {args.rtt_ms} ms RTT' if args.rtt_ms else ''}")
+    print(f"{'='*60}")
+
+    # Old path: one round trip per reading
+    col = collection("bench_insert_one")
+    elapsed = run(lambda i: col.insert_one(sample(i)), args.n, args.threads)
+    base_rps = args.n / elapsed
+    print(f"insert_one per POST:     {base_rps:>10,.0f} readings/sec")
+
+    # Write-behind: handlers only enqueue, one thread does insert_many
+    col = collection("bench_write_behind")
+    calls = {"n": 0}
+
+    def writer(docs):
+        calls["n"] += 1
+        col.insert_many(docs, ordered=False)
+        return len(docs)
+
+    buf = WriteBehindBuffer(writer, max_batch=500, flush_interval=0.05, max_pending=args.n, name="bench")
+    start = time.perf_counter()
+    run(lambda i: buf.add(sample(i)), args.n, args.threads)
+    enqueue = time.perf_counter() - start
+    buf.stop()
+    total = time.perf_counter() - start
+    print(f"write-behind enqueue:    {args.n / enqueue:>10,.0f} readings/sec  (handler time)")
+    print(f"write-behind persisted:  {args.n / total:>10,.0f} readings/sec  ({args.n / total / base_rps:.1f}x, {calls['n']} insert_many calls)")
+
+    # Backpressure: a small buffer in front of a stalled writer rejects instead of growing
+    stalled = threading.Event()
+    small = WriteBehindBuffer(lambda docs: stalled.wait() or len(docs), max_batch=100, flush_interval=0.01, max_pending=1000, name="bounded")
+    rejected = 0
+    for i in range(5000):
+        try:
+            small.add(sample(i))
+        except BufferFull:
+            rejected += 1
+    stalled.set()
+    small.stop()
+    print(f"backpressure:            {rejected} of 5000 rejected with max_pending=1000 (-> HTTP 429)")
+    print(f"{'='*60}")
+
+
+if __name__ == "__main__":
+    main()
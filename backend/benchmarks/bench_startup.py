@@ -0,0 +1,126 @@
+"""
+Startup time and memory benchmark (needs MongoDB reachable at MONGO_URI)
+Imports app.py in a fresh interpreter per scenario and reports wall time,
+RSS and the slowest imports (python -X importtime); optionally boots gunicorn
+with and without --preload and reports per-worker RSS / PSS / USS.
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --gunicorn 4 --warm
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+import requests
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = {
+    # name: (env, also build the lazily loaded objects)
+    "lazy": ({}, False),
+    "lazy+first-use": ({}, True),
+    "preload": ({"PRELOAD_APP": "true"}, False),
+    "inline-detector": ({"DETECTION_MODE": "inline"}, True),
+}
+
+SNIPPET = """
+import resource, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+if {first_use}:
+    app.rainfall_predictor.get()
+    if app.Config.DETECTION_MODE == "inline":
+        app.human_detector.get()
+ready = time.perf_counter()
+rss = int(open("/proc/self/status").read().split("VmRSS:")[1].split()[0]) / 1024.0
+print("RESULT", imported - started, ready - started, rss)
+"""
+
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def run_import(env, first_use):
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", SNIPPET.format(first_use=first_use)],
+        cwd=BACKEND, env=dict(os.environ, **env), capture_output=True, text=True, check=True
+    )
+    result = next(line for line in proc.stdout.splitlines() if line.startswith("RESULT"))
+    import_s, ready_s, rss_mb = map(float, result.split()[1:])
+    imports = []
+    for line in proc.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            imports.append((int(cumulative_us), int(self_us), len(indent) // 2, name))
+    return import_s, ready_s, rss_mb, imports
+
+
+def memory(pid):
+    rollup = open(f"/proc/{pid}/smaps_rollup").read()
+    fields = {k: int(v.split()[0]) / 1024.0 for k, v in re.findall(r"^(\w+):\s+(\d+ kB)", rollup, re.M)}
+    return fields.get("Rss", 0), fields.get("Pss", 0), fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)
+
+
+def run_gunicorn(workers, preload, warm, port):
+    env = dict(os.environ, PRELOAD_APP="true" if preload else "false", WEB_CONCURRENCY=str(workers), PORT=str(port))
+    started = time.perf_counter()
+    master = subprocess.Popen(["gunicorn", "-c", "gunicorn.conf.py", "app:app"], cwd=BACKEND, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    try:
+        while True:
+            try:
+                if requests.get(url + "/", timeout=1).ok:
+                    break
+            except requests.RequestException:
+                if time.perf_counter() - started > 120:
+                    raise RuntimeError("gunicorn did not come up")
+                time.sleep(0.2)
+        boot_s = time.perf_counter() - started
+        if warm:
+            # Needs a reading before /api/rainfall touches the model; spread calls over the workers
+            requests.post(url + "/api/readings/batch", json=[{"temp": 28.0, "humidity": 70.0, "percent": 40.0}], timeout=10)
+            for _ in range(workers * 8):
+                requests.get(url + "/api/rainfall", timeout=30)
+        time.sleep(1)
+        children = subprocess.run(["pgrep", "-P", str(master.pid)], capture_output=True, text=True).stdout.split()
+        return boot_s, memory(master.pid), [memory(int(pid)) for pid in children]
+    finally:
+        master.terminate()
+        master.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--top", type=int, default=15, help="slowest imports to list per scenario")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--gunicorn", type=int, default=0, help="also boot gunicorn with this many workers")
+    parser.add_argument("--warm", action="store_true", help="hit /api/rainfall so every worker has the model loaded")
+    parser.add_argument("--port", type=int, default=5056)
+    args = parser.parse_args()
+
+    for name in args.scenarios.split(","):
+        env, first_use = SCENARIOS[name]
+        import_s, ready_s, rss_mb, imports = run_import(env, first_use)
+        print(f"\n== {name}: import {import_s:.2f}s, ready {ready_s:.2f}s, RSS {rss_mb:.0f} MB")
+        print(f"   {'cumulative ms':>13} | {'self ms':>8} | module")
+        for cumulative_us, self_us, depth, module in sorted(imports, reverse=True)[:args.top]:
+            print(f"   {cumulative_us / 1000:>13.1f} | {self_us / 1000:>8.1f} | {'  ' * depth}{module}")
+
+    if args.gunicorn:
+        print(f"\n== gunicorn, {args.gunicorn} workers{' (warmed)' if args.warm else ''}")
+        print(f"   {'mode':<10} | {'boot s':>6} | {'master RSS':>10} | {'worker RSS':>10} | {'worker PSS':>10} | {'worker USS':>10} | total PSS")
+        for preload in (False, True):
+            boot_s, master_mem, worker_mem = run_gunicorn(args.gunicorn, preload, args.warm, args.port)
+            avg = [sum(m[i] for m in worker_mem) / max(len(worker_mem), 1) for i in range(3)]
+            total_pss = master_mem[1] + sum(m[1] for m in worker_mem)
+            print(f"   {'preload' if preload else 'no-preload':<10} | {boot_s:>6.2f} | {master_mem[0]:>8.0f}MB | "
+                  f"{avg[0]:>8.0f}MB | {avg[1]:>8.0f}MB | {avg[2]:>8.0f}MB | {total_pss:.0f}MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Weather cache benchmark
+Runs a local stand-in for open-meteo and checks hit/miss/stale/negative behaviour
+and the per-call latency of WeatherCache vs calling the upstream directly.
+
+    python benchmarks/bench_weather_cache.py [--delay 0.2]
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.weather_cache import WeatherCache, fetch_open_meteo
+
+STATE = {"calls": 0, "delay": 0.2, "fail": False}
+
+PAYLOAD = {
+    "current_weather": {"temperature": 27.4, "windspeed": 9.8, "time": "2024-01-01T10:00"},
+    "hourly": {
+        "precipitation_probability": [40],
+        "cloudcover": [62],
+        "relativehumidity_2m": [78],
+        "sunshine_duration": [1200],
+        "winddirection_10m": [210],
+    },
+}
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        STATE["calls"] += 1
+        time.sleep(STATE["delay"])
+        if STATE["fail"]:
+            self.send_response(503)
+            self.end_headers()
+            return
+        body = json.dumps(PAYLOAD).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def timed(fn, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - start) / n * 1000.0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--delay", type=float, default=0.2, help="upstream latency in seconds")
+    args = parser.parse_args()
+    STATE["delay"] = args.delay
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/v1/forecast"
+    fetcher = lambda: fetch_open_meteo(12.96, 79.94, url=url)
+
+    print(f"Stand-in upstream: {url} (delay {args.delay * 1000:.0f} ms)")
+    print(f"\n{'='*60}")
+
+    # Uncached baseline
+    STATE["calls"] = 0
+    direct_ms = timed(fetcher, 5)
+    print(f"Direct fetch:          {direct_ms:8.2f} ms/call  (upstream calls: {STATE['calls']})")
+
+    # Cold miss with 50 concurrent callers -> one upstream call
+    cache = WeatherCache(fetcher, ttl=1.0, stale_ttl=5.0, negative_ttl=1.0)
+    STATE["calls"] = 0
+    with ThreadPoolExecutor(max_workers=50) as pool:
+        results = list(pool.map(lambda _: cache.get(), range(50)))
+    print(f"Cold burst (50):       upstream calls: {STATE['calls']}  all filled: {all(r['cloud'] == 62 for r in results)}")
+
+    # Warm hits
+    hit_ms = timed(cache.get, 10000)
+    print(f"Cache hit:             {hit_ms:8.4f} ms/call  ({direct_ms / hit_ms:,.0f}x faster)")
+
+    # Stale-while-revalidate: served instantly, one background refresh
+    time.sleep(1.1)
+    STATE["calls"] = 0
+    start = time.perf_counter()
+    stale = cache.get()
+    stale_ms = (time.perf_counter() - start) * 1000.0
+    for _ in range(100):
+        cache.get()
+    time.sleep(args.delay + 0.1)
+    print(f"Stale serve:           {stale_ms:8.4f} ms/call  (background refreshes: {STATE['calls']}, value: {stale['cloud']})")
+
+    # Negative cache: failed upstream is not hammered
+    cache = WeatherCache(fetcher, ttl=1.0, stale_ttl=0.0, negative_ttl=2.0)
+    STATE["fail"] = True
+    STATE["calls"] = 0
+    neg_ms = timed(cache.get, 200)
+    print(f"Upstream failing:      {neg_ms:8.4f} ms/call  (upstream calls for 200 gets: {STATE['calls']})")
+    STATE["fail"] = False
+
+    print(f"\nCache stats: {cache.stats()}")
+    print(f"{'='*60}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
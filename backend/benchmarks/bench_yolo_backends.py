@@ -0,0 +1,88 @@
+"""
+YOLO backend benchmark: PyTorch vs ONNX Runtime on CPU
+Startup (fresh interpreter: imports + model load + first frame) and
+per-frame latency at batch 1 and batch N on the parity image set.
+
+    python utils/yolo_onnx.py export --imgsz 416
+    python benchmarks/bench_yolo_backends.py --imgsz 416 --threads 4
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+import numpy as np
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND)
+
+from config import Config
+
+STARTUP_SNIPPET = """
+import time
+started = time.perf_counter()
+import numpy as np
+from config import Config
+Config.DETECTION_BACKEND = {backend!r}
+Config.DETECTION_IMGSZ = {imgsz}
+Config.ONNX_THREADS = {threads}
+from utils.human_detection import load_person_detector
+model, _ = load_person_detector()
+loaded = time.perf_counter()
+model.detect_people([np.zeros((480, 640, 3), dtype=np.uint8)])
+print(loaded - started, time.perf_counter() - started)
+"""
+
+
+def startup(backend, imgsz, threads):
+    code = STARTUP_SNIPPET.format(backend=backend, imgsz=imgsz, threads=threads)
+    out = subprocess.run([sys.executable, "-c", code], cwd=BACKEND, capture_output=True, text=True, check=True)
+    load_s, first_s = map(float, out.stdout.strip().splitlines()[-1].split())
+    return load_s, first_s
+
+
+def latency(model, frames, batch, repeat):
+    batches = [frames[i:i + batch] for i in range(0, len(frames), batch)]
+    model.detect_people(batches[0])
+    timings = []
+    for _ in range(repeat):
+        for chunk in batches:
+            started = time.perf_counter()
+            model.detect_people(chunk)
+            timings.append((time.perf_counter() - started) * 1000.0 / len(chunk))
+    return np.median(timings), np.percentile(timings, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--imgsz", type=int, default=Config.DETECTION_IMGSZ)
+    parser.add_argument("--threads", type=int, default=Config.ONNX_THREADS)
+    parser.add_argument("--batch", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--images", help="directory of .jpg/.png files (default: ultralytics sample images)")
+    parser.add_argument("--backends", default="torch,onnx")
+    args = parser.parse_args()
+
+    from utils.yolo_onnx import load_images
+    frames = [frame for _, frame in load_images(args.images)]
+    # Repeat the set so a batch is always full
+    frames = (frames * args.batch)[:max(len(frames), args.batch)]
+
+    Config.DETECTION_IMGSZ = args.imgsz
+    Config.ONNX_THREADS = args.threads
+    from utils.human_detection import load_person_detector
+
+    print(f"imgsz={args.imgsz} threads={args.threads or 'default'} images={len(frames)}")
+    print(f"{'backend':<8} | {'load s':>7} | {'1st frame s':>11} | {'b1 ms/frame':>11} | {'b1 p99':>7} | {f'b{args.batch} ms/frame':>11} | {f'b{args.batch} p99':>7}")
+    print("-" * 84)
+    for backend in args.backends.split(","):
+        load_s, first_s = startup(backend, args.imgsz, args.threads)
+        model, _ = load_person_detector(backend)
+        b1, b1_p99 = latency(model, frames, 1, args.repeat)
+        bn, bn_p99 = latency(model, frames, args.batch, args.repeat)
+        print(f"{backend:<8} | {load_s:>7.2f} | {first_s:>11.2f} | {b1:>11.1f} | {b1_p99:>7.1f} | {bn:>11.1f} | {bn_p99:>7.1f}")
+
+
+if __name__ == "__main__":
+    main()
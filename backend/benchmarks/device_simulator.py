@@ -0,0 +1,140 @@
+"""
+ESP32 device simulator: JSON vs binary telemetry frames
+Generates a stream of realistic readings and compares, per 1000 readings,
+the request count, payload bytes and server-side parse cost of
+
+    json-single   one JSON POST per reading (current firmware, /api/readings)
+    json-batch    JSON arrays of --batch readings (/api/readings/batch)
+    frame-single  one binary frame per reading (/api/readings/frame)
+    frame-batch   binary frames of --batch readings
+
+Parse cost is measured in-process through werkzeug's request parsing, the
+same path Flask takes. With --url the readings are also posted to a running
+backend and the server time per route is read from its /metrics.
+
+    python benchmarks/device_simulator.py --readings 10000 --batch 30
+    python benchmarks/device_simulator.py --url http://localhost:5000 --readings 2000
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+from datetime import datetime
+import requests
+from werkzeug.test import EnvironBuilder
+from werkzeug.wrappers import Request
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.telemetry import decode_frame, encode_frame
+
+READING_INTERVAL_MS = 2000
+
+
+def simulate(n, seed=1):
+    rng = random.Random(seed)
+    temp, humidity, percent = 27.0, 65.0, 55.0
+    readings = []
+    for _ in range(n):
+        temp = min(45.0, max(10.0, temp + rng.gauss(0, 0.05)))
+        humidity = min(100.0, max(20.0, humidity + rng.gauss(0, 0.2)))
+        percent = min(100.0, max(0.0, percent + rng.gauss(0, 0.1)))
+        readings.append({
+            "temp": round(temp, 2),
+            "humidity": round(humidity, 2),
+            "distance": round(40.0 * (1 - percent / 100.0), 2),
+            "percent": round(percent, 2),
+            "rain_prediction": 45.5,
+            "vibration": rng.random() < 0.01,
+            "valve_state": "OPEN" if percent > 80 else "CLOSED",
+            "human_detected": False,
+            "human_confidence": 0.0,
+        })
+    return readings
+
+
+def chunks(items, size):
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def payloads(readings, batch):
+    now = datetime.utcnow().isoformat() + "Z"
+    # Firmware adds an ISO timestamp to every JSON reading (the server replaces it)
+    single_json = [json.dumps({**r, "timestamp": now}).encode() for r in readings]
+    return {
+        "json-single": ("/api/readings", "application/json", single_json),
+        "json-batch": ("/api/readings/batch", "application/json", [json.dumps(c).encode() for c in chunks(readings, batch)]),
+        "frame-single": ("/api/readings/frame", "application/octet-stream", [encode_frame([r], "main") for r in readings]),
+        "frame-batch": ("/api/readings/frame", "application/octet-stream", [
+            encode_frame(c, "main", ages_ms=[(len(c) - 1 - i) * READING_INTERVAL_MS for i in range(len(c))])
+            for c in chunks(readings, batch)
+        ]),
+    }
+
+
+def parse_cost(path, content_type, bodies):
+    """Seconds to turn every body into reading dicts the way the endpoint does."""
+    environs = [EnvironBuilder(path=path, method="POST", data=b, content_type=content_type).get_environ() for b in bodies]
+    started = time.perf_counter()
+    for environ in environs:
+        request = Request(environ)
+        if content_type == "application/json":
+            data = request.get_json()
+            docs = data if isinstance(data, list) else [data]
+            received = datetime.utcnow()
+            for d in docs:
+                d["timestamp"] = received
+        else:
+            decode_frame(request.get_data())
+    return time.perf_counter() - started
+
+
+SAMPLE = re.compile(r'^smartdam_http_request_duration_seconds_(sum|count)\{[^}]*route="([^"]+)"[^}]*\} (\S+)$', re.M)
+
+
+def server_seconds(session, url, route):
+    text = session.get(url + "/metrics", timeout=10).text
+    return sum(float(v) for kind, r, v in SAMPLE.findall(text) if kind == "sum" and r == route)
+
+
+def post_all(session, url, path, content_type, bodies):
+    before = server_seconds(session, url, path)
+    started = time.perf_counter()
+    for body in bodies:
+        session.post(url + path, data=body, headers={"Content-Type": content_type}, timeout=30).raise_for_status()
+    wall = time.perf_counter() - started
+    return wall, server_seconds(session, url, path) - before
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--readings", type=int, default=10000)
+    parser.add_argument("--batch", type=int, default=30, help="readings per batched request (30 = one a minute at 2s)")
+    parser.add_argument("--url", help="also post to this backend (READINGS_WRITE_BEHIND=false gives comparable server times)")
+    args = parser.parse_args()
+
+    readings = simulate(args.readings)
+    per_k = 1000.0 / args.readings
+    print(f"{args.readings} readings, batches of {args.batch}; figures per 1000 readings")
+    print(f"{'mode':<13} | {'requests':>8} | {'bytes':>9} | {'B/reading':>9} | {'parse ms':>8}")
+    modes = payloads(readings, args.batch)
+    for name, (path, content_type, bodies) in modes.items():
+        size = sum(len(b) for b in bodies)
+        parse_s = parse_cost(path, content_type, bodies)
+        print(f"{name:<13} | {len(bodies) * per_k:>8.0f} | {size * per_k:>9.0f} | {size / args.readings:>9.1f} | {parse_s * per_k * 1000:>8.2f}")
+
+    if args.url:
+        session = requests.Session()
+        print(f"\nposting to {args.url}")
+        print(f"{'mode':<13} | {'wall ms':>8} | {'server ms':>9}")
+        for name, (path, content_type, bodies) in modes.items():
+            wall, server = post_all(session, args.url, path, content_type, bodies)
+            print(f"{name:<13} | {wall * per_k * 1000:>8.0f} | {server * per_k * 1000:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+ESP32 control polling vs /api/device/sync long-polling
+Runs --nodes simulated nodes against a running backend for --duration seconds
+each way while an admin flips the manual valve command every --change-every
+seconds, and reports per node: requests/sec, the backend's MongoDB commands/sec
+(from its /metrics, so run one worker) and how long a node took to see each
+command.
+
+    poll   the current firmware: /api/valve/control every 2 s,
+           /api/human-detection/status every 3 s, /api/rainfall every 15 s
+    sync   /api/device/sync?version=<last>&wait=<--wait>, re-issued on return
+
+Each parked request holds a gunicorn thread, so keep --nodes under GUNICORN_THREADS.
+
+    WEB_CONCURRENCY=1 gunicorn -c gunicorn.conf.py app:app &
+    python benchmarks/device_sync_simulator.py --nodes 20 --duration 60
+"""
+
+import argparse
+import re
+import statistics
+import threading
+import time
+import requests
+
+# (path, seconds between requests) of the firmware's loop
+POLLS = [("/api/valve/control", 2.0), ("/api/human-detection/status", 3.0), ("/api/rainfall", 15.0)]
+LOOP_DELAY = 0.5
+
+SAMPLE = re.compile(r"^smartdam_mongo_command_seconds_count\{[^}]*\} (\S+)$", re.M)
+
+
+def mongo_commands(session, url):
+    return sum(float(v) for v in SAMPLE.findall(session.get(url + "/metrics", timeout=10).text))
+
+
+class Node(threading.Thread):
+    def __init__(self, url, mode, wait, stop, changes):
+        super().__init__(daemon=True)
+        self.url, self.mode, self.wait, self.stop, self.changes = url, mode, wait, stop, changes
+        self.session = requests.Session()
+        self.requests = 0
+        self.command = None
+        self.latencies = []
+
+    def seen(self, command):
+        if command == self.command:
+            return
+        self.command = command
+        posted = self.changes.get(command)
+        if posted is not None:
+            self.latencies.append(time.monotonic() - posted)
+
+    def run(self):
+        if self.mode == "poll":
+            self.poll()
+        else:
+            self.sync()
+
+    def poll(self):
+        last = {path: 0.0 for path, _ in POLLS}
+        while not self.stop.is_set():
+            for path, every in POLLS:
+                if time.monotonic() - last[path] < every:
+                    continue
+                last[path] = time.monotonic()
+                resp = self.session.get(self.url + path, timeout=30)
+                self.requests += 1
+                if path == "/api/valve/control" and resp.ok:
+                    self.seen(resp.json().get("manualCommand"))
+            time.sleep(LOOP_DELAY)
+
+    def sync(self):
+        version = ""
+        while not self.stop.is_set():
+            resp = self.session.get(self.url + "/api/device/sync", params={"version": version, "wait": self.wait},
+                                    timeout=self.wait + 30)
+            self.requests += 1
+            if resp.ok:
+                state = resp.json()
+                version = state["version"]
+                self.seen(state.get("manualCommand"))
+
+
+def set_control(session, url, mode, command):
+    session.post(url + "/api/valve/control", json={"mode": mode, "command": command, "userRole": "admin",
+                                                   "userId": "device-sync-simulator"}, timeout=10).raise_for_status()
+
+
+def run(mode, args):
+    session = requests.Session()
+    stop = threading.Event()
+    changes = {}
+    set_control(session, args.url, "MANUAL", "NONE")
+    nodes = [Node(args.url, mode, args.wait, stop, changes) for _ in range(args.nodes)]
+    before = mongo_commands(session, args.url)
+    started = time.monotonic()
+    for node in nodes:
+        node.start()
+
+    commands = ["OPEN", "CLOSE"]
+    flips = 0
+    while time.monotonic() - started < args.duration:
+        time.sleep(min(args.change_every, max(0.0, args.duration - (time.monotonic() - started))))
+        if time.monotonic() - started >= args.duration:
+            break
+        command = commands[flips % 2]
+        flips += 1
+        changes[command] = time.monotonic()
+        set_control(session, args.url, "MANUAL", command)
+
+    stop.set()
+    elapsed = time.monotonic() - started
+    commands_used = mongo_commands(session, args.url) - before
+    # Parked requests still return within --wait seconds; don't hang on them
+    for node in nodes:
+        node.join(timeout=args.wait + 5)
+    set_control(session, args.url, "AUTO", "NONE")
+
+    latencies = [lat for node in nodes for lat in node.latencies]
+    req_rate = sum(node.requests for node in nodes) / elapsed / args.nodes
+    p50 = statistics.median(latencies) * 1000 if latencies else float("nan")
+    worst = max(latencies) * 1000 if latencies else float("nan")
+    print(f"{mode:<5} | {req_rate:>14.3f} | {commands_used / elapsed / args.nodes:>16.2f} | {p50:>10.0f} | {worst:>10.0f}")
+    return req_rate
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://localhost:5000")
+    parser.add_argument("--nodes", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=60, help="seconds per mode")
+    parser.add_argument("--change-every", type=float, default=10, help="seconds between manual commands")
+    parser.add_argument("--wait", type=float, default=25, help="long-poll timeout (capped by DEVICE_SYNC_MAX_WAIT)")
+    args = parser.parse_args()
+
+    print(f"{args.nodes} nodes, {args.duration:.0f}s per mode, command change every {args.change_every:.0f}s")
+    print(f"{'mode':<5} | {'req/s per node':>14} | {'mongo/s per node':>16} | {'see p50 ms':>10} | {'see max ms':>10}")
+    poll = run("poll", args)
+    sync = run("sync", args)
+    print(f"\nsaved {poll - sync:.3f} req/s per node ({(1 - sync / poll) * 100:.0f}%), "
+          f"{(poll - sync) * 86400:.0f} requests per node per day")
+
+
+if __name__ == "__main__":
+    main()
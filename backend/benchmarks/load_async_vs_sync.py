@@ -0,0 +1,159 @@
+"""
+Sync (gunicorn + Flask) vs async (hypercorn + Quart) load test
+Boots each backend against a local mongod and a stub open-meteo server that
+answers after --weather-delay seconds, then holds --clients concurrent
+connections cycling through the dashboard endpoints. Reports req/s,
+p50/p95/p99 and errors per backend.
+
+The weather cache TTL is cut to --weather-ttl so upstream refreshes happen
+during the run; mongomock can't be shared between processes, so a real
+mongod (MONGO_URI, default localhost) is needed.
+
+    python benchmarks/load_async_vs_sync.py --clients 500 --seconds 30
+    python benchmarks/load_async_vs_sync.py --only async --workers 2
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import httpx
+import numpy as np
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ENDPOINTS = [
+    "/api/dashboard/stats",
+    "/api/rainfall",
+    "/api/weather",
+    "/api/valve/status",
+    "/api/human-detection/status",
+    "/api/readings?limit=20",
+]
+
+WEATHER = {
+    "current_weather": {"temperature": 27.4, "windspeed": 9.8, "time": "2024-01-01T10:00"},
+    "hourly": {
+        "precipitation_probability": [40],
+        "cloudcover": [62],
+        "relativehumidity_2m": [78],
+        "sunshine_duration": [1200],
+        "winddirection_10m": [180],
+    },
+}
+
+
+def stub_weather(port, delay):
+    body = json.dumps(WEATHER).encode()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(delay)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def start_backend(kind, port, workers, env):
+    if kind == "sync":
+        cmd = ["gunicorn", "-c", "gunicorn.conf.py", "app:app"]
+    else:
+        cmd = ["hypercorn", "app_async:app", "--bind", f"127.0.0.1:{port}", "--workers", str(workers)]
+    env = dict(env, PORT=str(port), WEB_CONCURRENCY=str(workers))
+    return subprocess.Popen(cmd, cwd=BACKEND, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+async def wait_ready(client, url, timeout=120):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if (await client.get(url + "/", timeout=2)).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(0.5)
+    raise RuntimeError(f"{url} did not come up")
+
+
+async def run_load(url, clients, seconds):
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(limits=limits, timeout=30) as client:
+        await wait_ready(client, url)
+        await client.post(url + "/api/readings/batch", json=[{"temp": 28.0, "humidity": 70.0, "percent": 40.0}])
+
+        latencies = []
+        errors = 0
+        deadline = time.perf_counter() + seconds
+
+        async def worker(i):
+            nonlocal errors
+            n = i
+            while time.perf_counter() < deadline:
+                path = ENDPOINTS[n % len(ENDPOINTS)]
+                n += 1
+                started = time.perf_counter()
+                try:
+                    resp = await client.get(url + path)
+                    ok = resp.status_code < 500
+                except httpx.HTTPError:
+                    ok = False
+                latencies.append(time.perf_counter() - started)
+                errors += not ok
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(i) for i in range(clients)))
+        elapsed = time.perf_counter() - started
+    return np.array(latencies) * 1000.0, errors, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--seconds", type=float, default=30.0)
+    parser.add_argument("--workers", type=int, default=1, help="processes per backend")
+    parser.add_argument("--weather-delay", type=float, default=0.3)
+    parser.add_argument("--weather-ttl", type=int, default=2)
+    parser.add_argument("--only", choices=["sync", "async"])
+    parser.add_argument("--port", type=int, default=5070)
+    args = parser.parse_args()
+
+    weather_port = args.port + 10
+    stub_weather(weather_port, args.weather_delay)
+    env = dict(
+        os.environ,
+        WEATHER_API_URL=f"http://127.0.0.1:{weather_port}/v1/forecast",
+        WEATHER_CACHE_TTL=str(args.weather_ttl),
+        DETECTION_MODE="off",
+        PRELOAD_APP="true",
+    )
+
+    print(f"{args.clients} clients, {args.seconds:.0f}s, {args.workers} worker(s), weather upstream {args.weather_delay * 1000:.0f} ms")
+    print(f"{'backend':<8} | {'req/s':>8} | {'p50 ms':>8} | {'p95 ms':>8} | {'p99 ms':>8} | errors")
+    for kind in ([args.only] if args.only else ["sync", "async"]):
+        proc = start_backend(kind, args.port, args.workers, env)
+        try:
+            latencies, errors, elapsed = asyncio.run(run_load(f"http://127.0.0.1:{args.port}", args.clients, args.seconds))
+        finally:
+            proc.terminate()
+            proc.wait(timeout=30)
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) if len(latencies) else (0, 0, 0)
+        print(f"{kind:<8} | {len(latencies) / elapsed:>8.0f} | {p50:>8.1f} | {p95:>8.1f} | {p99:>8.1f} | {errors}")
+        time.sleep(1)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+"""
+Dashboard load test against a running backend
+Simulates N open dashboards either polling the 8 dashboard endpoints every 5s
+(old behaviour) or holding one /api/stream connection each, while a fake
+device posts a reading every 2s. Reports HTTP req/s seen by the server and,
+with --mongo-uri, the MongoDB operations issued during the run.
+
+    gunicorn app:app --worker-class gthread --threads 128 &
+    python benchmarks/load_dashboards.py --mode poll --clients 100
+    python benchmarks/load_dashboards.py --mode stream --clients 100 --mongo-uri mongodb://localhost:27017/
+"""
+
+import argparse
+import threading
+import time
+import requests
+
+POLL_ENDPOINTS = [
+    "/api/readings?limit=20",
+    "/api/weather",
+    "/api/rainfall",
+    "/api/valve/status",
+    "/api/human-detection/status",
+    "/api/dashboard/stats",
+    "/api/alerts/vibration/logs?limit=1",
+    "/api/alerts/human/logs?limit=1",
+]
+OPCOUNTERS = ("insert", "query", "update", "delete", "getmore", "command")
+
+
+class Counters:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.events = 0
+
+    def add(self, requests=0, errors=0, events=0):
+        with self.lock:
+            self.requests += requests
+            self.errors += errors
+            self.events += events
+
+
+def poll_client(url, interval, stop, counters):
+    session = requests.Session()
+    while not stop.is_set():
+        started = time.perf_counter()
+        for path in POLL_ENDPOINTS:
+            try:
+                ok = session.get(url + path, timeout=10).ok
+                counters.add(requests=1, errors=0 if ok else 1)
+            except requests.RequestException:
+                counters.add(requests=1, errors=1)
+        stop.wait(max(0.0, interval - (time.perf_counter() - started)))
+
+
+def stream_client(url, stop, counters):
+    while not stop.is_set():
+        try:
+            with requests.get(url + "/api/stream", stream=True, timeout=(5, 30)) as resp:
+                counters.add(requests=1)
+                for line in resp.iter_lines(decode_unicode=True):
+                    if stop.is_set():
+                        return
+                    if line and line.startswith("event:"):
+                        counters.add(events=1)
+        except requests.RequestException:
+            counters.add(errors=1)
+            stop.wait(1)
+
+
+def device(url, interval, stop, counters):
+    session = requests.Session()
+    i = 0
+    while not stop.is_set():
+        payload = {
+            "temp": 27.0 + (i % 10) * 0.1,
+            "humidity": 60.0,
+            "distance": 15.2,
+            "percent": 62.0,
+            "rain_prediction": 45.5,
+            "vibration": False,
+            "valve_state": "CLOSED",
+            "human_detected": False,
+            "human_confidence": 0.0,
+        }
+        try:
+            session.post(url + "/api/readings", json=payload, timeout=10)
+            counters.add(requests=1)
+        except requests.RequestException:
+            counters.add(requests=1, errors=1)
+        i += 1
+        stop.wait(interval)
+
+
+def mongo_ops(client):
+    counters = client.admin.command("serverStatus")["opcounters"]
+    return {name: counters.get(name, 0) for name in OPCOUNTERS}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://localhost:5000")
+    parser.add_argument("--mode", choices=["poll", "stream"], default="stream")
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=60.0)
+    parser.add_argument("--poll-interval", type=float, default=5.0)
+    parser.add_argument("--device-interval", type=float, default=2.0)
+    parser.add_argument("--mongo-uri", help="report serverStatus opcounters for the run")
+    args = parser.parse_args()
+
+    mongo = None
+    if args.mongo_uri:
+        from pymongo import MongoClient
+        mongo = MongoClient(args.mongo_uri)
+        ops_before = mongo_ops(mongo)
+
+    stop = threading.Event()
+    counters = Counters()
+    device_counters = Counters()
+    threads = [threading.Thread(target=device, args=(args.url, args.device_interval, stop, device_counters), daemon=True)]
+    for _ in range(args.clients):
+        if args.mode == "poll":
+            target, target_args = poll_client, (args.url, args.poll_interval, stop, counters)
+        else:
+            target, target_args = stream_client, (args.url, stop, counters)
+        threads.append(threading.Thread(target=target, args=target_args, daemon=True))
+
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    time.sleep(args.duration)
+    stop.set()
+    elapsed = time.perf_counter() - start
+
+    total = counters.requests + device_counters.requests
+    print(f"mode={args.mode} clients={args.clients} duration={elapsed:.0f}s")
+    print(f"  dashboard requests: {counters.requests:,} ({counters.requests / elapsed:.1f} req/s), errors {counters.errors}")
+    print(f"  device posts:       {device_counters.requests:,}")
+    print(f"  server total:       {total / elapsed:.1f} req/s")
+    if args.mode == "stream":
+        print(f"  events received:    {counters.events:,} ({counters.events / max(args.clients, 1):.0f} per client)")
+
+    if mongo is not None:
+        ops_after = mongo_ops(mongo)
+        diff = {name: ops_after[name] - ops_before[name] for name in OPCOUNTERS}
+        print(f"  mongo ops:          {sum(diff.values()):,} ({sum(diff.values()) / elapsed:.1f} ops/s)")
+        print("                      " + ", ".join(f"{k}={v:,}" for k, v in diff.items()))
+
+
+if __name__ == "__main__":
+    main()
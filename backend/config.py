@@ -8,15 +8,93 @@ class Config:
     MONGO_URI = os.getenv('MONGO_URI', 'mongodb://localhost:27017/')
     DB_NAME = os.getenv('DB_NAME', 'smart_dam_db')
     
+    # Set by gunicorn.conf.py when the master imports the app before forking workers
+    PRELOAD_APP = os.getenv('PRELOAD_APP', 'false').lower() == 'true'
+    
+    # Shared MongoDB client (utils/db.py), one pool per process
+    MONGO_MAX_POOL_SIZE = int(os.getenv('MONGO_MAX_POOL_SIZE', 50))
+    MONGO_MIN_POOL_SIZE = int(os.getenv('MONGO_MIN_POOL_SIZE', 0))
+    MONGO_MAX_IDLE_MS = int(os.getenv('MONGO_MAX_IDLE_MS', 300000))
+    MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv('MONGO_SERVER_SELECTION_TIMEOUT_MS', 5000))
+    MONGO_CONNECT_TIMEOUT_MS = int(os.getenv('MONGO_CONNECT_TIMEOUT_MS', 5000))
+    MONGO_SOCKET_TIMEOUT_MS = int(os.getenv('MONGO_SOCKET_TIMEOUT_MS', 20000))
+    MONGO_WRITE_CONCERN = os.getenv('MONGO_WRITE_CONCERN', '1')  # 0, 1, majority
+    MONGO_APP_NAME = os.getenv('MONGO_APP_NAME', 'smart-dam')
+    
     # Model paths
     MODEL_PATH = os.getenv('MODEL_PATH', 'models/rainfall_model.pkl')
+    FOREST_PATH = os.getenv('FOREST_PATH', 'models/rainfall_forest.npz')  # optional flat export, see utils/forest_engine.py
+    MODEL_REGISTRY = os.getenv('MODEL_REGISTRY', 'models/registry')  # versioned artifacts; the active one wins over the paths above
+    MODEL_RELOAD_INTERVAL = int(os.getenv('MODEL_RELOAD_INTERVAL', 10))  # seconds between manifest checks, 0 = no hot reload
+    
+    # Rainfall prediction cache
+    PREDICTION_CACHE_SIZE = int(os.getenv('PREDICTION_CACHE_SIZE', 256))
+    PREDICTION_CACHE_TTL = int(os.getenv('PREDICTION_CACHE_TTL', 300))  # seconds
+    PREDICTION_CACHE_QUANTUM = float(os.getenv('PREDICTION_CACHE_QUANTUM', 0.5))  # weather input rounding step
     
     # YOLOv8 Model
     YOLO_MODEL = os.getenv('YOLO_MODEL', 'yolov8n.pt')  # nano model for speed
+    DETECTION_BACKEND = os.getenv('DETECTION_BACKEND', 'torch').lower()  # torch | onnx (see utils/yolo_onnx.py)
+    ONNX_MODEL = os.getenv('ONNX_MODEL', 'models/yolov8n.onnx')
+    ONNX_THREADS = int(os.getenv('ONNX_THREADS', 0))  # intra-op threads, 0 = onnxruntime default
+    DETECTION_IMGSZ = int(os.getenv('DETECTION_IMGSZ', 640))  # model input size; 320/416 trade accuracy for speed
     
     # Human detection settings
     DETECTION_CONFIDENCE = float(os.getenv('DETECTION_CONFIDENCE', 0.5))
     DETECTION_INTERVAL = int(os.getenv('DETECTION_INTERVAL', 3))  # seconds
+    DETECTION_MODE = os.getenv('DETECTION_MODE', 'worker').lower()  # worker (detector_worker.py) | inline | off
+    DETECTOR_HEARTBEAT = int(os.getenv('DETECTOR_HEARTBEAT', 5))  # seconds between worker status writes
+    DETECTOR_METRICS_PORT = int(os.getenv('DETECTOR_METRICS_PORT', 9108))  # Prometheus /metrics for detector_worker.py, 0 = off
+    CAMERA_SOURCE = os.getenv('CAMERA_SOURCE', '0')  # webcam index, video file or stream URL
+    CAMERA_SOURCES = os.getenv('CAMERA_SOURCES', '')  # "spillway=rtsp://...,gate=1"; overrides CAMERA_SOURCE
+    DETECTION_MAX_BATCH = int(os.getenv('DETECTION_MAX_BATCH', 8))  # frames per YOLO call
+    MOTION_GATE = os.getenv('MOTION_GATE', 'true').lower() == 'true'  # skip YOLO on static frames
+    MOTION_THRESHOLD = int(os.getenv('MOTION_THRESHOLD', 25))  # per-pixel grey level change
+    MOTION_MIN_CHANGED = float(os.getenv('MOTION_MIN_CHANGED', 0.01))  # fraction of pixels that must change
+    MOTION_CHECK_INTERVAL = float(os.getenv('MOTION_CHECK_INTERVAL', 0.5))  # seconds between gate checks
+    DETECTION_MAX_SKIP = float(os.getenv('DETECTION_MAX_SKIP', 30))  # force inference at least this often
+    CAMERA_STALE_AFTER = float(os.getenv('CAMERA_STALE_AFTER', 15))  # seconds without frames before a camera stops counting
+    
+    # Storage layout (see utils/db_schema.py)
+    READINGS_TIMESERIES = os.getenv('READINGS_TIMESERIES', 'false').lower() == 'true'  # needs MongoDB 5.0+
+    READINGS_RETENTION_DAYS = float(os.getenv('READINGS_RETENTION_DAYS', 0))  # 0 = keep forever
+    
+    # Readings ingest (write-behind buffer)
+    READINGS_WRITE_BEHIND = os.getenv('READINGS_WRITE_BEHIND', 'true').lower() == 'true'
+    READINGS_FLUSH_BATCH = int(os.getenv('READINGS_FLUSH_BATCH', 500))
+    READINGS_FLUSH_INTERVAL = float(os.getenv('READINGS_FLUSH_INTERVAL', 1.0))  # seconds
+    READINGS_BUFFER_SIZE = int(os.getenv('READINGS_BUFFER_SIZE', 10000))  # 429 once this many are pending
+    READINGS_BATCH_MAX = int(os.getenv('READINGS_BATCH_MAX', 1000))  # per /api/readings/batch request
+    
+    # History queries (/api/readings, /api/alerts/<type>/logs)
+    QUERY_MAX_LIMIT = int(os.getenv('QUERY_MAX_LIMIT', 5000))
+    
+    # Rollups (1m/1h/1d buckets) and /api/readings/series
+    READINGS_ROLLUPS = os.getenv('READINGS_ROLLUPS', 'true').lower() == 'true'
+    SERIES_MAX_POINTS = int(os.getenv('SERIES_MAX_POINTS', 1000))  # auto resolution stays under this
+    SNAPSHOT_MAX_READINGS = int(os.getenv('SNAPSHOT_MAX_READINGS', 200))  # readings in one /api/dashboard snapshot
+    
+    # Streaming anomaly detection on ingested readings (utils/anomaly.py)
+    ANOMALY_DETECTION = os.getenv('ANOMALY_DETECTION', 'true').lower() == 'true'
+    ANOMALY_RISE_PER_MIN = float(os.getenv('ANOMALY_RISE_PER_MIN', 2.0))  # smoothed rise, percent of capacity per minute
+    ANOMALY_Z_THRESHOLD = float(os.getenv('ANOMALY_Z_THRESHOLD', 4.0))  # level jump vs the node's rolling mean / std
+    ANOMALY_STUCK_SAMPLES = int(os.getenv('ANOMALY_STUCK_SAMPLES', 150))  # identical readings in a row (~5 min at 2s)
+    ANOMALY_VIBRATION_RATE = float(os.getenv('ANOMALY_VIBRATION_RATE', 0.3))  # smoothed share of readings with vibration
+    
+    # Server-Sent Events (/api/stream)
+    STREAM_HEARTBEAT = int(os.getenv('STREAM_HEARTBEAT', 15))  # seconds between keepalive comments
+    STREAM_QUEUE_SIZE = int(os.getenv('STREAM_QUEUE_SIZE', 100))  # per-subscriber backlog
+    STREAM_MAX_SUBSCRIBERS = int(os.getenv('STREAM_MAX_SUBSCRIBERS', 48))  # per process; each holds a gunicorn thread, 0 = no limit
+    STREAM_RETRY_AFTER = int(os.getenv('STREAM_RETRY_AFTER', 30))  # seconds a refused client waits before reconnecting
+    
+    # ESP32 device sync (/api/device/sync long-poll)
+    DEVICE_SYNC_MAX_WAIT = float(os.getenv('DEVICE_SYNC_MAX_WAIT', 25))  # seconds; each parked request holds a gunicorn thread
+    DEVICE_SYNC_MAX_WAITERS = int(os.getenv('DEVICE_SYNC_MAX_WAITERS', 16))  # parked requests per process, 0 = no limit
+    DEVICE_SYNC_INTERVAL = float(os.getenv('DEVICE_SYNC_INTERVAL', 1.0))  # reload for writes made by other processes
+    DEVICE_SYNC_RAIN_INTERVAL = int(os.getenv('DEVICE_SYNC_RAIN_INTERVAL', 15))  # seconds before the prediction is recomputed
+    
+    # Dashboard counters: exact recount interval (seconds)
+    STATS_RECONCILE_INTERVAL = int(os.getenv('STATS_RECONCILE_INTERVAL', 300))
     
     # Security
     SECRET_KEY = os.getenv('SECRET_KEY', 'your-secret-key-change-in-production')
@@ -26,4 +104,10 @@ class Config:
     
     # Location
     DAM_LATITUDE = float(os.getenv('DAM_LATITUDE', 12.96312116701951))
-    DAM_LONGITUDE = float(os.getenv('DAM_LONGITUDE', 79.94246446052891))
\ No newline at end of file
+    DAM_LONGITUDE = float(os.getenv('DAM_LONGITUDE', 79.94246446052891))
+    
+    # Weather API cache (seconds)
+    WEATHER_API_URL = os.getenv('WEATHER_API_URL', 'https://api.open-meteo.com/v1/forecast')
+    WEATHER_CACHE_TTL = int(os.getenv('WEATHER_CACHE_TTL', 300))
+    WEATHER_STALE_TTL = int(os.getenv('WEATHER_STALE_TTL', 1800))  # served while refreshing in background
+    WEATHER_NEGATIVE_TTL = int(os.getenv('WEATHER_NEGATIVE_TTL', 30))  # back-off after upstream failure
@@ -0,0 +1,73 @@
+"""
+Standalone human detection worker
+Owns the cameras and the YOLO model so web workers never load either. Results
+go to the human_detection collection ("current" + one doc per camera); a
+"worker" doc carries a heartbeat and frame counters for the status endpoint.
+
+    python detector_worker.py
+"""
+
+import os
+import signal
+import socket
+import threading
+from datetime import datetime
+from config import Config
+from utils import db as mongo
+from utils import metrics
+from utils.human_detection import HumanDetector
+
+WORKER_ID = "worker"
+
+
+def publish_heartbeat(col, detector, started_at):
+    col.update_one(
+        {"_id": WORKER_ID},
+        {"$set": {
+            "pid": os.getpid(),
+            "host": socket.gethostname(),
+            "running": detector.running,
+            "startedAt": started_at,
+            "heartbeatAt": datetime.utcnow(),
+            "stats": detector.get_stats(),
+            "db": mongo.metrics.stats()
+        }},
+        upsert=True
+    )
+
+
+def main():
+    col = mongo.get_collection('human_detection')
+
+    detector = HumanDetector()
+    if not detector.model:
+        raise SystemExit("⚠️ YOLO model could not be loaded")
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+
+    if Config.DETECTOR_METRICS_PORT:
+        metrics.serve(Config.DETECTOR_METRICS_PORT)
+        print(f"✓ Detector metrics on :{Config.DETECTOR_METRICS_PORT}/metrics")
+
+    started_at = datetime.utcnow()
+    detector.start_continuous_detection(db_collection=col, interval=Config.DETECTION_INTERVAL)
+    print(f"✓ Detector worker running (pid {os.getpid()})")
+
+    try:
+        while not stop.is_set() and detector.running:
+            try:
+                publish_heartbeat(col, detector, started_at)
+            except Exception as e:
+                print(f"⚠️ Heartbeat failed: {e}")
+            stop.wait(Config.DETECTOR_HEARTBEAT)
+    finally:
+        detector.stop_continuous_detection()
+        publish_heartbeat(col, detector, started_at)
+        mongo.close_client()
+        print("🛑 Detector worker stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Gunicorn settings (`gunicorn -c gunicorn.conf.py app:app`)
+With PRELOAD_APP=true (default) the master imports the app and loads the
+rainfall model once; workers fork from it and share those pages
+copy-on-write. The master never touches MongoDB: pymongo clients and
+background threads don't survive fork, so each worker opens its own client
+and starts its own threads in post_fork.
+"""
+
+import gc
+import os
+import sys
+
+preload_app = os.getenv('PRELOAD_APP', 'true').lower() == 'true'
+# Config reads this when the master imports the app
+os.environ['PRELOAD_APP'] = 'true' if preload_app else 'false'
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from config import Config
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+workers = int(os.getenv('WEB_CONCURRENCY', 1))
+worker_class = "gthread"
+# Every open /api/stream and parked /api/device/sync holds a thread. Both are
+# capped (STREAM_MAX_SUBSCRIBERS, DEVICE_SYNC_MAX_WAITERS; 503 + Retry-After
+# beyond), so sizing threads above the sum keeps GUNICORN_REQUEST_THREADS free
+# for ordinary requests.
+request_threads = int(os.getenv('GUNICORN_REQUEST_THREADS', 16))
+held = Config.STREAM_MAX_SUBSCRIBERS + Config.DEVICE_SYNC_MAX_WAITERS
+threads = int(os.getenv('GUNICORN_THREADS', held + request_threads))
+if not Config.STREAM_MAX_SUBSCRIBERS or not Config.DEVICE_SYNC_MAX_WAITERS or threads <= held:
+    print(f"⚠️ GUNICORN_THREADS={threads} leaves no thread for requests once streams and parked device syncs fill it")
+timeout = 120
+
+
+def pre_fork(server, worker):
+    # Move everything loaded so far out of the collector's reach, so GC passes
+    # in the workers don't write to (and un-share) the preloaded model pages
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    if not preload_app:
+        return
+    import app
+    app.bind_db()
+    app.start_background_tasks()
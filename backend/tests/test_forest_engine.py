@@ -0,0 +1,74 @@
+import os
+import numpy as np
+import pytest
+from utils.forest_engine import FOREST_PATH, MODEL_PATH, FlatForest, export_forest
+
+sklearn_ensemble = pytest.importorskip("sklearn.ensemble")
+
+
+def rainfall_like(rng, n):
+    """Temperature, humidity, wind, cloud, pressure in the ranges the model sees."""
+    return np.column_stack([
+        rng.uniform(10, 40, n),
+        rng.uniform(20, 100, n),
+        rng.uniform(0, 20, n),
+        rng.uniform(0, 100, n),
+        rng.uniform(980, 1040, n),
+    ])
+
+
+@pytest.fixture(scope="module")
+def trained(tmp_path_factory):
+    rng = np.random.default_rng(0)
+    X = rainfall_like(rng, 2000)
+    y = ((X[:, 1] * 0.6 + X[:, 3] * 0.4 + rng.normal(0, 10, len(X))) > 60).astype(int)
+    model = sklearn_ensemble.RandomForestClassifier(n_estimators=25, max_depth=12, random_state=0).fit(X, y)
+    path = str(tmp_path_factory.mktemp("forest") / "forest.npz")
+    export_forest(model, path, feature_names=["Temperature", "Humidity", "Wind_Speed", "Cloud_Cover", "Pressure"])
+    return model, FlatForest.load(path)
+
+
+def test_predict_proba_is_bit_identical(trained):
+    model, forest = trained
+    X = rainfall_like(np.random.default_rng(1), 5000)
+    assert np.array_equal(forest.predict_proba(X), model.predict_proba(X))
+    assert np.array_equal(forest.predict(X), model.predict(X))
+
+
+def test_thresholds_are_compared_in_float32(trained):
+    model, forest = trained
+    # Each split's own feature exactly on, and one float32 step either side of, its threshold
+    split = np.isfinite(forest.threshold)
+    t = forest.threshold[split].astype(np.float32)
+    values = np.concatenate([t, np.nextafter(t, np.float32(np.inf)), np.nextafter(t, np.float32(-np.inf))])
+    features = np.tile(forest.feature[split], 3)
+    X = rainfall_like(np.random.default_rng(2), len(values)).astype(np.float32)
+    X[np.arange(len(values)), features] = values
+    assert np.array_equal(forest.predict_proba(X), model.predict_proba(X))
+
+
+def test_metadata(trained):
+    model, forest = trained
+    assert forest.n_trees == len(model.estimators_)
+    assert forest.max_depth == max(est.tree_.max_depth for est in model.estimators_)
+    assert forest.feature_names == ["Temperature", "Humidity", "Wind_Speed", "Cloud_Cover", "Pressure"]
+    assert list(forest.classes_) == list(model.classes_)
+
+
+def test_rejects_bad_input(trained):
+    _, forest = trained
+    with pytest.raises(ValueError):
+        forest.predict_proba(np.zeros((3, 4)))
+    with pytest.raises(ValueError):
+        forest.predict_proba(np.full((1, 5), np.nan))
+
+
+@pytest.mark.filterwarnings("ignore:X does not have valid feature names")
+def test_shipped_forest_matches_shipped_model():
+    if not (os.path.exists(MODEL_PATH) and os.path.exists(FOREST_PATH)):
+        pytest.skip("models/ not present")
+    joblib = pytest.importorskip("joblib")
+    model = joblib.load(MODEL_PATH)
+    forest = FlatForest.load(FOREST_PATH)
+    X = rainfall_like(np.random.default_rng(3), 2000)
+    assert np.array_equal(forest.predict_proba(X), model.predict_proba(X))
@@ -0,0 +1,84 @@
+from datetime import datetime
+import pytest
+from utils import routes
+from utils.routes import RouteError
+
+
+def test_series_args_defaults_to_last_day():
+    start, end, resolution, node, fields = routes.series_args({}, max_points=500)
+    assert (end - start).days == 1
+    assert resolution == "1h"
+    assert node == "main"
+    assert fields
+
+
+@pytest.mark.parametrize("args, error", [
+    ({"from": "bad"}, "Invalid isoformat"),
+    ({"from": "2026-01-02T00:00:00", "to": "2026-01-01T00:00:00"}, "from must be before to"),
+    ({"resolution": "5m"}, "resolution must be"),
+])
+def test_series_args_rejects(args, error):
+    with pytest.raises(RouteError) as e:
+        routes.series_args(args, max_points=500)
+    assert e.value.status == 400
+    assert error in e.value.body["error"]
+
+
+def test_reading_batch_stamps_one_time():
+    docs = routes.reading_batch({"readings": [{"waterLevel": 1}, {"waterLevel": 2}]}, max_readings=10)
+    assert len({d["timestamp"] for d in docs}) == 1
+    assert isinstance(docs[0]["timestamp"], datetime)
+
+
+@pytest.mark.parametrize("data, status", [({"x": 1}, 400), ([1, 2], 400), ([{}] * 3, 413)])
+def test_reading_batch_rejects(data, status):
+    with pytest.raises(RouteError) as e:
+        routes.reading_batch(data, max_readings=2)
+    assert e.value.status == status
+    assert e.value.body["success"] is False
+
+
+def test_inserted_body():
+    assert routes.inserted_body(3, 3) == ({"success": True, "inserted": 3}, 201)
+    body, status = routes.inserted_body(1, 3)
+    assert status == 422
+    assert body["error"] == "2 readings rejected"
+
+
+def test_admin_only():
+    with pytest.raises(RouteError) as e:
+        routes.valve_control_update({"userRole": "user"})
+    assert e.value.status == 403
+    with pytest.raises(RouteError):
+        routes.model_reload_args(None)
+    assert routes.model_reload_args({"userRole": "admin", "version": "v2"}) == "v2"
+
+
+def test_reload_error_status():
+    assert routes.reload_error(KeyError("unknown model version v9")).status == 404
+    assert routes.reload_error(RuntimeError("boom")).status == 500
+
+
+def test_retry_later_header():
+    e = routes.retry_later("Ingest buffer full, retry later", 429, 0.5, success=False)
+    assert e.status == 429
+    assert e.headers == {"Retry-After": "1"}
+    assert e.body == {"success": False, "error": "Ingest buffer full, retry later"}
+
+
+def test_query_limits():
+    assert routes.sync_wait({"wait": "99"}, max_wait=25) == 25
+    assert routes.sync_wait({"wait": "-1"}, max_wait=25) == 0
+    assert routes.snapshot_limit({}, max_readings=100) == 20
+    with pytest.raises(RouteError):
+        routes.snapshot_limit({"readings": "x"}, max_readings=100)
+
+
+def test_every(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(routes.time, "monotonic", lambda: now[0])
+    every = routes.Every(60)
+    assert every.due()
+    assert not every.due()
+    now[0] += 60
+    assert every.due()
@@ -0,0 +1,161 @@
+import asyncio
+import threading
+import pytest
+from utils.weather_cache import EMPTY_WEATHER, AsyncWeatherCache, WeatherCache
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+class FakeFetcher:
+    """Returns {"n": call number}; raises while `fail` is set, blocks while `gate` is unset."""
+
+    def __init__(self):
+        self.calls = 0
+        self.fail = False
+        self.gate = threading.Event()
+        self.gate.set()
+        self.started = threading.Event()
+
+    def __call__(self):
+        self.calls += 1
+        self.started.set()
+        self.gate.wait(5)
+        if self.fail:
+            raise RuntimeError("upstream down")
+        return {"n": self.calls}
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def fetcher():
+    return FakeFetcher()
+
+
+def make_cache(fetcher, clock, **kwargs):
+    return WeatherCache(fetcher, ttl=300, stale_ttl=1800, negative_ttl=30, wait_timeout=5, clock=clock, **kwargs)
+
+
+def wait_for_refresh(cache):
+    event = cache._inflight
+    if event is not None:
+        assert event.wait(5)
+
+
+def test_miss_fetches_then_hits(fetcher, clock):
+    cache = make_cache(fetcher, clock)
+    assert cache.get() == {"n": 1}
+    clock.advance(299)
+    assert cache.get() == {"n": 1}
+    assert fetcher.calls == 1
+    stats = cache.stats()
+    assert (stats["misses"], stats["hits"], stats["refreshes"]) == (1, 1, 1)
+    assert stats["age"] == 299
+
+
+def test_stale_is_served_while_one_refresh_runs(fetcher, clock):
+    cache = make_cache(fetcher, clock)
+    cache.get()
+    clock.advance(301)
+    fetcher.gate.clear()
+    assert cache.get() == {"n": 1}  # stale value, refresh started in the background
+    assert fetcher.started.wait(5)
+    assert cache.get() == {"n": 1}  # still stale, no second refresh
+    fetcher.gate.set()
+    wait_for_refresh(cache)
+    assert fetcher.calls == 2
+    assert cache.get() == {"n": 2}
+    assert cache.stats()["staleHits"] == 2
+
+
+def test_expired_value_is_not_served(fetcher, clock):
+    cache = make_cache(fetcher, clock)
+    cache.get()
+    clock.advance(300 + 1800)
+    assert cache.get() == {"n": 2}
+    assert cache.stats()["misses"] == 2
+
+
+def test_concurrent_misses_share_one_fetch(fetcher, clock):
+    cache = make_cache(fetcher, clock)
+    fetcher.gate.clear()
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get())) for _ in range(8)]
+    threads[0].start()
+    assert fetcher.started.wait(5)
+    for t in threads[1:]:
+        t.start()
+    fetcher.gate.set()
+    for t in threads:
+        t.join(5)
+    assert fetcher.calls == 1
+    assert results == [{"n": 1}] * 8
+
+
+def test_failure_is_cached_for_negative_ttl(fetcher, clock):
+    cache = make_cache(fetcher, clock)
+    fetcher.fail = True
+    assert cache.get() is EMPTY_WEATHER
+    clock.advance(29)
+    assert cache.get() is EMPTY_WEATHER
+    assert fetcher.calls == 1
+    assert cache.stats()["negativeHits"] == 1
+
+    fetcher.fail = False
+    clock.advance(2)
+    assert cache.get() == {"n": 2}
+
+
+def test_failed_refresh_keeps_serving_the_stale_value(fetcher, clock):
+    cache = make_cache(fetcher, clock)
+    cache.get()
+    clock.advance(301)
+    fetcher.fail = True
+    assert cache.get() == {"n": 1}
+    wait_for_refresh(cache)
+    assert cache.get() == {"n": 1}  # negative hit, still inside the stale window
+    assert fetcher.calls == 2
+    assert cache.stats()["errors"] == 1
+
+
+def test_invalidate_forces_a_fetch(fetcher, clock):
+    cache = make_cache(fetcher, clock)
+    cache.get()
+    cache.invalidate()
+    assert cache.get() == {"n": 2}
+
+
+def test_async_misses_share_one_fetch(clock):
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"n": len(calls)}
+
+    async def run():
+        cache = AsyncWeatherCache(fetch, ttl=300, stale_ttl=1800, negative_ttl=30, wait_timeout=5, clock=clock)
+        results = await asyncio.gather(*(cache.get() for _ in range(8)))
+        clock.advance(301)
+        stale = await cache.get()
+        if cache._inflight is not None:
+            await cache._inflight
+        return results, stale, await cache.get()
+
+    results, stale, refreshed = asyncio.run(run())
+    assert results == [{"n": 1}] * 8
+    assert stale == {"n": 1}
+    assert refreshed == {"n": 2}
+    assert len(calls) == 2
@@ -0,0 +1,35 @@
+import os
+import numpy as np
+import pytest
+from config import Config
+from utils.yolo_onnx import PAD_VALUE, PARITY_TOLERANCE, letterbox, person_confidences
+
+
+def test_letterbox_keeps_aspect_and_pads():
+    frame = np.zeros((240, 320, 3), dtype=np.uint8)
+    out = letterbox(frame, 416)
+    assert out.shape == (416, 416, 3)
+    # 320x240 -> 416x312, padded top and bottom
+    assert (out[:52] == PAD_VALUE).all() and (out[-52:] == PAD_VALUE).all()
+    assert (out[52:-52] == 0).all()
+
+
+def test_person_confidence_counts_only_anchors_where_person_wins():
+    # (batch, 4 box + 3 classes, 3 anchors)
+    output = np.zeros((2, 7, 3), dtype=np.float32)
+    output[0, 4, 0] = 0.9   # person, top class
+    output[0, 4, 1] = 0.95  # person score, but another class scores higher on this anchor
+    output[0, 5, 1] = 0.97
+    output[1, 6, 2] = 0.8   # no person at all
+    assert person_confidences(output).tolist() == pytest.approx([0.9, 0.0])
+
+
+def test_onnx_matches_torch():
+    pytest.importorskip("onnxruntime")
+    pytest.importorskip("ultralytics")
+    if not os.path.exists(Config.ONNX_MODEL):
+        pytest.skip(f"{Config.ONNX_MODEL} not exported (python utils/yolo_onnx.py export)")
+    from utils.yolo_onnx import parity
+
+    assert parity(Config.YOLO_MODEL, Config.ONNX_MODEL, Config.DETECTION_IMGSZ,
+                  min_confidence=Config.DETECTION_CONFIDENCE, tolerance=PARITY_TOLERANCE)
@@ -0,0 +1,230 @@
+"""
+Streaming anomaly detection on ingested readings
+Per node, a fixed row of a float64 array holds everything the detectors need,
+so memory is O(nodes) however long the stream runs:
+
+    level EWMA / EWMA of level^2   rolling mean and variance -> z-score of each reading
+    EWMA of d(level EWMA)/dt       smoothed rate of rise, percent per minute
+    unchanged-reading run          a sensor reporting the same value for too long
+    EWMA of the vibration flag     sustained vibration rather than a single knock
+
+A batch of one node's readings is processed with NumPy in one pass (the EWMA
+recurrences are evaluated in closed form over short blocks). Alerts fire on
+the rising edge of a condition, so a long rise is one "rapid_rise" alert, not
+one per reading.
+"""
+
+import threading
+from collections import defaultdict
+from datetime import datetime
+import numpy as np
+from utils.rollups import DEFAULT_NODE
+
+COUNT, LAST_T, LAST_LEVEL, MEAN, MEAN_SQ, RATE, VIBRATION, RUN, FLAGS = range(9)
+N_FIELDS = 9
+
+RAPID_RISE, LEVEL_SPIKE, SENSOR_STUCK, VIBRATION_BURST = "rapid_rise", "level_spike", "sensor_stuck", "vibration_burst"
+ALERT_TYPES = (RAPID_RISE, LEVEL_SPIKE, SENSOR_STUCK, VIBRATION_BURST)  # bit i of FLAGS = ALERT_TYPES[i] active
+
+EPOCH = datetime(1970, 1, 1)
+SCALAR_MAX = 32  # shorter batches are faster one reading at a time than through NumPy
+
+
+def ewma(x, alpha, initial):
+    """y[i] = y[i-1] + alpha * (x[i] - y[i-1]) with y[-1] = initial, without a Python loop."""
+    decay = 1.0 - alpha
+    # decay ** -block must stay far from float64 overflow
+    block = max(1, min(4096, int(600.0 / -np.log(decay))))
+    out = np.empty(len(x), dtype=np.float64)
+    y = initial
+    for start in range(0, len(x), block):
+        xb = x[start:start + block]
+        powers = decay ** np.arange(1, len(xb) + 1)
+        yb = powers * (y + alpha * np.cumsum(xb / powers))
+        out[start:start + len(xb)] = yb
+        y = yb[-1]
+    return out
+
+
+def run_lengths(same, carry):
+    """Length of the run of True ending at each position; a run open at the start continues `carry`."""
+    idx = np.arange(len(same))
+    last_break = np.maximum.accumulate(np.where(same, -1, idx))
+    return np.where(last_break < 0, idx + 1 + carry, idx - last_break)
+
+
+def latch(on, off, initial):
+    """Per position: True after the latest `on`, False after the latest `off`, `initial` before either."""
+    idx = np.arange(len(on))
+    last_on = np.maximum.accumulate(np.where(on, idx, -1))
+    last_off = np.maximum.accumulate(np.where(off, idx, -1))
+    return np.where(last_on == last_off, initial, last_on > last_off)
+
+
+class AnomalyDetector:
+    def __init__(self, alpha=0.05, rate_alpha=0.2, vibration_alpha=0.1, z_threshold=4.0, min_std=0.5,
+                 rise_per_min=2.0, stuck_samples=150, stuck_epsilon=0.01, vibration_rate=0.3, warmup=30, capacity=16):
+        self.alpha = alpha
+        self.rate_alpha = rate_alpha
+        self.vibration_alpha = vibration_alpha
+        self.z_threshold = z_threshold
+        self.min_std = min_std
+        self.rise_per_min = rise_per_min
+        self.stuck_samples = stuck_samples
+        self.stuck_epsilon = stuck_epsilon
+        self.vibration_rate = vibration_rate
+        self.warmup = warmup
+
+        self._lock = threading.Lock()
+        self.state = np.zeros((capacity, N_FIELDS), dtype=np.float64)
+        self.slots = {}
+
+        self.readings = 0
+        self.alerts = dict.fromkeys(ALERT_TYPES, 0)
+
+    def _slot(self, node):
+        slot = self.slots.get(node)
+        if slot is None:
+            slot = len(self.slots)
+            if slot == len(self.state):
+                self.state = np.concatenate([self.state, np.zeros_like(self.state)])
+            self.slots[node] = slot
+        return slot
+
+    def _triggers(self, rate, z, run, vib):
+        """(on, off) per ALERT_TYPES entry; rise and vibration clear at half their threshold so a value hovering at it alerts once."""
+        return (
+            (rate > self.rise_per_min, rate < self.rise_per_min / 2),
+            (abs(z) > self.z_threshold, abs(z) <= self.z_threshold),
+            (run >= self.stuck_samples, run < self.stuck_samples),
+            (vib > self.vibration_rate, vib < self.vibration_rate / 2),
+        )
+
+    def _observe_one(self, s, t, x, v):
+        """One reading in plain floats: per node, a buffer flush usually holds only a few."""
+        count, last_t, last_x, mean0, mean_sq0, rate, vib, run, flags = s.tolist()
+        if count == 0:
+            last_t, last_x, mean0, mean_sq0 = t, x, x, x * x
+        mean = mean0 + self.alpha * (x - mean0)
+        mean_sq = mean_sq0 + self.alpha * (x * x - mean_sq0)
+        z = (x - mean0) / max(max(mean_sq0 - mean0 * mean0, 0.0) ** 0.5, self.min_std) if count >= self.warmup else 0.0
+        dt = t - last_t
+        slope = (mean - mean0) / dt * 60.0 if dt > 0 and abs(z) <= self.z_threshold else 0.0
+        rate += self.rate_alpha * (slope - rate)
+        run = run + 1 if count and abs(x - last_x) <= self.stuck_epsilon else 0
+        vib += self.vibration_alpha * (v - vib)
+
+        found = []
+        new_flags = 0
+        values = (rate, z, run, vib)
+        for bit, (kind, (on, off), value) in enumerate(zip(ALERT_TYPES, self._triggers(rate, z, run, vib), values)):
+            was = bool(int(flags) >> bit & 1)
+            active = True if on else False if off else was
+            if active and not was:
+                found.append((0, kind, float(value)))
+                self.alerts[kind] += 1
+            if active:
+                new_flags |= 1 << bit
+        s[:] = (count + 1, t, x, mean, mean_sq, rate, vib, run, new_flags)
+        self.readings += 1
+        return found
+
+    def observe_arrays(self, node, t, level, vibration):
+        """
+        Feed one node's readings in time order: t in epoch seconds, level in
+        percent, vibration as 0/1. Returns [(index in batch, alert type, value)].
+        """
+        t = np.asarray(t, dtype=np.float64)
+        x = np.asarray(level, dtype=np.float64)
+        v = np.asarray(vibration, dtype=np.float64)
+        n = len(x)
+        if n == 0:
+            return []
+        with self._lock:
+            slot = self._slot(node)  # may grow self.state
+            s = self.state[slot]
+            if n <= SCALAR_MAX:
+                return [(i, kind, value)
+                        for i, (ti, xi, vi) in enumerate(zip(t.tolist(), x.tolist(), v.tolist()))
+                        for _, kind, value in self._observe_one(s, ti, xi, vi)]
+            fresh = s[COUNT] == 0
+            last_t = t[0] if fresh else s[LAST_T]
+            last_x = x[0] if fresh else s[LAST_LEVEL]
+
+            # z-score of each reading against the mean / variance before it
+            mean0 = x[0] if fresh else s[MEAN]
+            mean_sq0 = x[0] * x[0] if fresh else s[MEAN_SQ]
+            mean = ewma(x, self.alpha, mean0)
+            mean_sq = ewma(x * x, self.alpha, mean_sq0)
+            prev_mean = np.concatenate(([mean0], mean[:-1]))
+            prev_var = np.maximum(np.concatenate(([mean_sq0], mean_sq[:-1])) - prev_mean * prev_mean, 0.0)
+            z = (x - prev_mean) / np.maximum(np.sqrt(prev_var), self.min_std)
+            z[s[COUNT] + np.arange(n) < self.warmup] = 0.0
+
+            # Rate of rise: trend of the smoothed level, so sensor noise doesn't read as a rise.
+            # Spikes and out-of-order or duplicate timestamps contribute no slope.
+            dt = np.diff(t, prepend=last_t)
+            counted = (dt > 0) & (np.abs(z) <= self.z_threshold)
+            slope = np.where(counted, (mean - prev_mean) / np.where(dt > 0, dt, 1.0) * 60.0, 0.0)
+            rate = ewma(slope, self.rate_alpha, s[RATE])
+
+            dx = np.diff(x, prepend=last_x)
+            same = np.abs(dx) <= self.stuck_epsilon
+            same[0] &= not fresh  # a node's first reading has nothing to repeat
+            run = run_lengths(same, s[RUN])
+            vib = ewma(v, self.vibration_alpha, s[VIBRATION])
+
+            values = (rate, z, run, vib)
+            flags = int(s[FLAGS])
+            found = []
+            new_flags = 0
+            for bit, (kind, (on, off), value) in enumerate(zip(ALERT_TYPES, self._triggers(rate, z, run, vib), values)):
+                initial = bool(flags >> bit & 1)
+                active = latch(on, off, initial)
+                was = np.concatenate(([initial], active[:-1]))
+                for i in np.flatnonzero(active & ~was):
+                    found.append((int(i), kind, float(value[i])))
+                    self.alerts[kind] += 1
+                if active[-1]:
+                    new_flags |= 1 << bit
+
+            s[COUNT] += n
+            s[LAST_T] = t[-1]
+            s[LAST_LEVEL] = x[-1]
+            s[MEAN] = mean[-1]
+            s[MEAN_SQ] = mean_sq[-1]
+            s[RATE] = rate[-1]
+            s[VIBRATION] = vib[-1]
+            s[RUN] = run[-1]
+            s[FLAGS] = new_flags
+            self.readings += n
+        found.sort()
+        return found
+
+    def observe(self, docs):
+        """Reading documents (any order of nodes, time order within a node) -> alert documents for the alerts collection."""
+        by_node = defaultdict(list)
+        for doc in docs:
+            if doc.get("percent") is not None and doc.get("timestamp") is not None:
+                # Same key as rollups, so the single-node setup's alerts join with its buckets
+                by_node[doc.get("nodeId") or DEFAULT_NODE].append(doc)
+
+        alerts = []
+        for node, node_docs in by_node.items():
+            t = [(d["timestamp"] - EPOCH).total_seconds() for d in node_docs]
+            level = [d["percent"] for d in node_docs]
+            vibration = [1.0 if d.get("vibration") else 0.0 for d in node_docs]
+            for i, kind, value in self.observe_arrays(node, t, level, vibration):
+                alerts.append({
+                    "type": kind,
+                    "nodeId": node,
+                    "timestamp": node_docs[i]["timestamp"],
+                    "value": round(value, 3),
+                    "percent": node_docs[i]["percent"],
+                    "source": "analytics",
+                })
+        return alerts
+
+    def stats(self):
+        with self._lock:
+            return {"nodes": len(self.slots), "readings": self.readings, "state_bytes": self.state.nbytes, **self.alerts}
@@ -0,0 +1,245 @@
+"""
+Backfill rainfall predictions over historical readings
+Streams readings in (timestamp, _id) order, joins each one with the archived
+weather for its hour (utils/weather_history.py), scores chunks with
+RainfallPredictor.predict_many() on a process pool and bulk-writes
+rainfall_history (one document per reading, keyed by the reading's _id).
+
+After every written chunk the position is saved in backfill_checkpoints, so an
+interrupted run resumes where it stopped; re-scoring a chunk just overwrites
+the same documents. A reading whose hour has no archived weather ends the run
+just before it (the checkpoint never passes it), so nothing is skipped for
+good when the archive lags or a fetch fails.
+
+Usage (from backend/):
+    python utils/backfill_rainfall.py                          # resume, all cores
+    python utils/backfill_rainfall.py --since 2024-06-01 --restart
+    python utils/backfill_rainfall.py --workers 0              # score in-process
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime, timedelta
+import numpy as np
+from pymongo import UpdateOne
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from utils.model_registry import ModelRegistry
+from utils.responses import PRESSURE
+from utils.weather_history import ensure_history, floor_hour, load_hours
+
+CHECKPOINT_ID = "rainfall_history"
+PROJECTION = {"timestamp": 1, "temp": 1, "humidity": 1, "nodeId": 1}
+
+_predictor = None
+
+
+def _init_worker(model_path, forest_path, version):
+    global _predictor
+    from utils.rainfall_predictor import RainfallPredictor
+    _predictor = RainfallPredictor(model_path, forest_path, version=version)
+
+
+def _score(X):
+    return _predictor.predict_many(X)
+
+
+def resolve_model():
+    """(version, model path, forest path) every worker loads, fixed for the whole run."""
+    active = ModelRegistry(Config.MODEL_REGISTRY).active()
+    if active is None:
+        return "unversioned", Config.MODEL_PATH, Config.FOREST_PATH
+    version, path = active
+    return version, os.path.join(path, "model.pkl"), os.path.join(path, "rainfall_forest.npz")
+
+
+def read_checkpoint(db):
+    return db['backfill_checkpoints'].find_one({"_id": CHECKPOINT_ID})
+
+
+def save_checkpoint(db, last, rows, version):
+    db['backfill_checkpoints'].update_one({"_id": CHECKPOINT_ID}, {"$set": {
+        "timestamp": last["timestamp"],
+        "readingId": last["_id"],
+        "rows": rows,
+        "model": version,
+        "updatedAt": datetime.utcnow(),
+    }}, upsert=True)
+
+
+def readings_after(col, checkpoint, since, until, batch_size):
+    """Cursor over readings in [since, until) after the checkpoint position, oldest first."""
+    query = {"timestamp": {"$lt": until}}
+    if checkpoint:
+        ts, oid = checkpoint["timestamp"], checkpoint["readingId"]
+        query["$or"] = [{"timestamp": {"$gt": ts}}, {"timestamp": ts, "_id": {"$gt": oid}}]
+    if since:
+        query["timestamp"]["$gte"] = since
+    return col.find(query, PROJECTION, sort=[("timestamp", 1), ("_id", 1)], batch_size=batch_size)
+
+
+def chunks(cursor, size):
+    chunk = []
+    for doc in cursor:
+        chunk.append(doc)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def features(chunk, weather_col):
+    """
+    (docs that can be scored, X in model column order, readings covered). Readings
+    without sensor values are dropped; the chunk is cut at the first reading with
+    no weather for its hour, so `covered` < len(chunk) means stop there.
+    """
+    weather = load_hours(weather_col, chunk[0]["timestamp"], chunk[-1]["timestamp"] + timedelta(hours=1))
+    docs, rows = [], []
+    for i, doc in enumerate(chunk):
+        w = weather.get(floor_hour(doc["timestamp"]))
+        if w is None:
+            return docs, np.array(rows, dtype=np.float64).reshape(-1, 5), i
+        temp, humidity = doc.get("temp"), doc.get("humidity")
+        if temp is None or humidity is None:
+            continue
+        docs.append(doc)
+        rows.append((temp, humidity, w["windspeed"], w["cloud"], PRESSURE))
+    return docs, np.array(rows, dtype=np.float64).reshape(-1, 5), len(chunk)
+
+
+def history_ops(docs, percent, labels, version):
+    return [
+        UpdateOne({"_id": doc["_id"]}, {"$set": {
+            "timestamp": doc["timestamp"],
+            "nodeId": doc.get("nodeId"),
+            "percent": float(p),
+            "rainLabel": str(label),
+            "model": version,
+        }}, upsert=True)
+        for doc, p, label in zip(docs, percent, labels)
+    ]
+
+
+def submit(pool, X):
+    """Future of (percent, labels); in-process and empty chunks are scored right away."""
+    if pool is None or not len(X):
+        future = Future()
+        future.set_result(_score(X) if len(X) else (np.empty(0), np.empty(0)))
+        return future
+    return pool.submit(_score, X)
+
+
+def backfill(db, since=None, until=None, chunk_size=5000, workers=None, in_flight=None, restart=False,
+             fetch_weather=True, report_every=5.0):
+    version, model_path, forest_path = resolve_model()
+    until = until or datetime.utcnow()
+    workers = os.cpu_count() if workers is None else workers
+    in_flight = in_flight or max(2, 2 * workers)
+
+    checkpoint = None if restart else read_checkpoint(db)
+    if checkpoint:
+        print(f"✓ Resuming after {checkpoint['timestamp']} ({checkpoint['rows']} rows, model {checkpoint.get('model')})")
+        if checkpoint.get("model") != version:
+            print(f"⚠️ Checkpoint was scored with {checkpoint.get('model')}, continuing with {version} (--restart to rescore)")
+
+    if fetch_weather:
+        first = since or (checkpoint or {}).get("timestamp")
+        if first is None:
+            oldest = db['readings'].find_one({}, {"timestamp": 1}, sort=[("timestamp", 1)])
+            first = oldest["timestamp"] if oldest else until
+        try:
+            fetched = ensure_history(db['weather_history'], Config.DAM_LATITUDE, Config.DAM_LONGITUDE, first, until)
+            print(f"✓ weather_history: {fetched} hours fetched")
+        except Exception as e:
+            print(f"⚠️ Could not fill weather_history: {e}")
+
+    pool = None
+    if workers:
+        # spawn: the parent's MongoClient must not be inherited across fork
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                   initializer=_init_worker, initargs=(model_path, forest_path, version))
+    else:
+        _init_worker(model_path, forest_path, version)
+
+    history = db['rainfall_history']
+    rows = (checkpoint or {}).get("rows", 0)
+    read = scored = skipped = 0
+    stopped_at = None  # first reading without archived weather
+    pending = deque()  # (future, scorable docs, last reading of the chunk), in read order
+    started = last_report = time.perf_counter()
+
+    def drain(block_until):
+        nonlocal rows, scored
+        while len(pending) > block_until:
+            future, docs, last = pending.popleft()
+            percent, labels = future.result()
+            if docs:
+                history.bulk_write(history_ops(docs, percent, labels, version), ordered=False)
+            # Chunks are written in read order, so the checkpoint never skips ahead of unwritten rows
+            rows += len(docs)
+            scored += len(docs)
+            save_checkpoint(db, last, rows, version)
+
+    try:
+        cursor = readings_after(db['readings'], checkpoint, since, until, chunk_size)
+        for chunk in chunks(cursor, chunk_size):
+            docs, X, covered = features(chunk, db['weather_history'])
+            read += covered
+            skipped += covered - len(docs)
+            if covered:
+                pending.append((submit(pool, X), docs, chunk[covered - 1]))
+            if covered < len(chunk):
+                stopped_at = chunk[covered]["timestamp"]
+                break
+            drain(in_flight)
+
+            now = time.perf_counter()
+            if now - last_report >= report_every:
+                last_report = now
+                print(f"  {read} read, {scored} written, {skipped} skipped, {scored / (now - started):.0f} rows/s")
+        drain(0)
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    elapsed = time.perf_counter() - started
+    if stopped_at is not None:
+        print(f"⚠️ No weather_history for {floor_hour(stopped_at)}: stopped before the reading at {stopped_at}. "
+              f"Re-run once the archive has that hour (resumes from the checkpoint), or pass --since past the gap")
+    print(f"✓ Backfilled {scored} readings ({skipped} without sensor values) in {elapsed:.1f}s: "
+          f"{scored / elapsed if elapsed else 0:.0f} rows/s written, {read / elapsed if elapsed else 0:.0f} rows/s read "
+          f"(model {version}, {workers or 'no'} worker processes)")
+    return {"read": read, "written": scored, "skipped": skipped, "stopped_at": stopped_at, "seconds": elapsed,
+            "rows_per_sec": scored / elapsed if elapsed else 0.0}
+
+
+def main():
+    from utils.db import get_db
+
+    parser = argparse.ArgumentParser(description="Score historical readings into rainfall_history")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="first reading (default: oldest, or the checkpoint)")
+    parser.add_argument("--until", type=datetime.fromisoformat, help="end of the window (default: now)")
+    parser.add_argument("--chunk", type=int, default=5000, help="readings per scoring / write batch")
+    parser.add_argument("--workers", type=int, default=None, help="scoring processes (default: all cores, 0 = in-process)")
+    parser.add_argument("--in-flight", type=int, default=None, help="chunks queued ahead of the writer (default: 2 x workers)")
+    parser.add_argument("--restart", action="store_true", help="ignore the checkpoint")
+    parser.add_argument("--no-fetch-weather", action="store_true", help="don't fill weather_history from the Open-Meteo archive")
+    args = parser.parse_args()
+
+    result = backfill(get_db(), since=args.since, until=args.until, chunk_size=args.chunk, workers=args.workers,
+                      in_flight=args.in_flight, restart=args.restart, fetch_weather=not args.no_fetch_weather)
+    # Non-zero so a scheduled run shows the weather gap instead of looking finished
+    sys.exit(1 if result["stopped_at"] is not None else 0)
+
+
+if __name__ == "__main__":
+    main()
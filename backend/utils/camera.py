@@ -0,0 +1,198 @@
+import os
+import threading
+import time
+import cv2
+import numpy as np
+
+
+def parse_source(raw):
+    """CAMERA_SOURCE value -> cv2.VideoCapture argument ("0" is the first webcam)."""
+    if isinstance(raw, str) and raw.strip().isdigit():
+        return int(raw.strip())
+    return raw
+
+
+def parse_sources(raw, default="0"):
+    """
+    CAMERA_SOURCES -> [(name, source)]. Entries are comma separated, optionally
+    named: "spillway=rtsp://10.0.0.5/stream,gate=1,clip.mp4". Unnamed entries
+    become cam0, cam1, ...; with no entries the single `default` is "webcam".
+    """
+    entries = [e.strip() for e in (raw or "").split(",") if e.strip()]
+    if not entries:
+        return [("webcam", parse_source(default))]
+
+    sources = []
+    for i, entry in enumerate(entries):
+        name, sep, value = entry.partition("=")
+        # Only a plain label counts as a name; URLs may contain '=' in their query string
+        if sep and name and not any(c in name for c in ":/?&"):
+            sources.append((name.strip(), parse_source(value.strip())))
+        else:
+            sources.append((f"cam{i}", parse_source(entry)))
+    return sources
+
+
+class LatestFrameGrabber:
+    """
+    Reads a camera on its own thread and keeps only the newest frame, so the
+    detector never works through OpenCV's backlog of stale frames.
+
+    `source` is anything cv2.VideoCapture accepts (webcam index, file, RTSP URL)
+    or an iterable of frames (synthetic input). Video files and iterables are
+    paced at `fps` (file FPS by default) to behave like a live camera.
+
+    Only a file or iterable ends: when a webcam or stream stops delivering
+    frames it is reopened, waiting `reconnect_min` doubling to `reconnect_max`
+    seconds between attempts.
+    """
+
+    def __init__(self, source=0, fps=None, loop=False, reconnect_min=1.0, reconnect_max=30.0):
+        self.source = source
+        self.fps = fps
+        self.loop = loop
+        self.reconnect_min = reconnect_min
+        self.reconnect_max = reconnect_max
+
+        self._cond = threading.Condition()
+        self._frame = None
+        self._seq = 0
+        self._consumed = 0
+        self._frame_at = None
+        self.frame_at = None  # monotonic capture time of the frame last returned by read()
+        self._thread = None
+        self._running = False
+        self.finished = False
+
+        self.captured = 0
+        self.dropped = 0
+        self.reconnects = 0
+
+    def start(self):
+        if isinstance(self.source, (int, str)):
+            cap = cv2.VideoCapture(self.source)
+            if not cap.isOpened():
+                return False
+            is_file = isinstance(self.source, str) and os.path.isfile(self.source)
+            fps = self.fps or (cap.get(cv2.CAP_PROP_FPS) if is_file else None)
+            reader = self._capture_frames(cap, is_file)
+        else:
+            fps = self.fps
+            reader = iter(self.source)
+
+        self._running = True
+        self._thread = threading.Thread(target=self._run, args=(reader, fps), name="camera-capture", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        self._running = False
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def read(self, timeout=None):
+        """Newest frame not yet returned, waiting up to `timeout`; None on timeout or end of input."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._seq > self._consumed or self.finished, timeout):
+                return None
+            if self._seq == self._consumed:
+                return None
+            self._consumed = self._seq
+            self.frame_at = self._frame_at
+            return self._frame
+
+    def _capture_frames(self, cap, is_file):
+        try:
+            while self._running:
+                ret, frame = cap.read()
+                if ret:
+                    yield frame
+                    continue
+                if is_file:
+                    if self.loop and cap.set(cv2.CAP_PROP_POS_FRAMES, 0):
+                        continue
+                    return
+                cap.release()
+                cap = self._reopen()
+                if cap is None:
+                    return
+        finally:
+            if cap is not None:
+                cap.release()
+
+    def _reopen(self):
+        """Reopen a live source with backoff; None once stop() is called."""
+        delay = self.reconnect_min
+        while True:
+            print(f"⚠️ Camera {self.source} stopped delivering frames, reconnecting in {delay:.0f}s")
+            with self._cond:
+                if self._cond.wait_for(lambda: not self._running, delay):
+                    return None
+            cap = cv2.VideoCapture(self.source)
+            if cap.isOpened():
+                self.reconnects += 1
+                print(f"✓ Camera {self.source} reconnected")
+                return cap
+            cap.release()
+            delay = min(delay * 2, self.reconnect_max)
+
+    def _run(self, reader, fps):
+        period = 1.0 / fps if fps else 0.0
+        next_at = time.monotonic()
+        try:
+            for frame in reader:
+                if not self._running:
+                    break
+                with self._cond:
+                    if self._seq > self._consumed:
+                        self.dropped += 1
+                    self._frame = frame
+                    self._frame_at = time.monotonic()
+                    self._seq += 1
+                    self.captured += 1
+                    self._cond.notify_all()
+                if period:
+                    next_at += period
+                    time.sleep(max(0.0, next_at - time.monotonic()))
+        except Exception as e:
+            print(f"⚠️ Camera capture stopped: {e}")
+        finally:
+            with self._cond:
+                self.finished = True
+                self._cond.notify_all()
+
+
+class MotionGate:
+    """
+    Cheap frame differencing on a small blurred grayscale copy. A frame counts
+    as motion when more than `min_changed` of its pixels differ from the
+    reference (the last frame that was sent to the model) by `pixel_threshold`.
+    """
+
+    def __init__(self, pixel_threshold=25, min_changed=0.01, size=(160, 120)):
+        self.pixel_threshold = pixel_threshold
+        self.min_changed = min_changed
+        self.size = size
+        self._reference = None
+
+    def _prepare(self, frame):
+        small = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return cv2.GaussianBlur(small, (5, 5), 0)
+
+    def changed(self, frame):
+        """True if `frame` differs enough from the reference (always True before the first accept)."""
+        if self._reference is None:
+            return True
+        diff = cv2.absdiff(self._prepare(frame), self._reference)
+        return np.count_nonzero(diff > self.pixel_threshold) >= self.min_changed * diff.size
+
+    def accept(self, frame):
+        """Make `frame` the new reference; call after running inference on it."""
+        self._reference = self._prepare(frame)
+
+    def reset(self):
+        self._reference = None
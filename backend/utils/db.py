@@ -0,0 +1,223 @@
+"""
+Shared MongoDB access
+One pooled MongoClient per process, created on first use (and again after a
+fork, since pymongo clients must not cross fork boundaries). Every module gets
+its handles from here instead of constructing its own client.
+"""
+
+import os
+import threading
+import time
+from pymongo import MongoClient, monitoring
+from pymongo.write_concern import WriteConcern
+from utils import metrics as prom
+
+try:
+    from config import Config
+except ImportError:
+    Config = None
+
+
+class DbMetrics(monitoring.ConnectionPoolListener, monitoring.CommandListener):
+    """Connection pool and command latency counters fed by pymongo's event API."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.connections_created = 0
+            self.connections_closed = 0
+            self.checked_out = 0
+            self.checkout_failures = 0
+            self.pool_clears = 0
+            self.commands = {}  # name -> [count, failures, total_ms, max_ms]
+
+    # Connection pool events
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pool_clears += 1
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        with self._lock:
+            self.connections_created += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.connections_closed += 1
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.checkout_failures += 1
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            self.checked_out += 1
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out -= 1
+
+    # Command events
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self._record(event.command_name, event.duration_micros, failed=False)
+
+    def failed(self, event):
+        self._record(event.command_name, event.duration_micros, failed=True)
+
+    def _record(self, name, micros, failed):
+        ms = micros / 1000.0
+        COMMAND_SECONDS.observe(micros / 1e6, command=name, outcome="failed" if failed else "ok")
+        with self._lock:
+            entry = self.commands.get(name)
+            if entry is None:
+                entry = self.commands[name] = [0, 0, 0.0, 0.0]
+            entry[0] += 1
+            entry[1] += failed
+            entry[2] += ms
+            entry[3] = max(entry[3], ms)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "connectionsOpen": self.connections_created - self.connections_closed,
+                "connectionsCreated": self.connections_created,
+                "connectionsClosed": self.connections_closed,
+                "checkedOut": self.checked_out,
+                "checkoutFailures": self.checkout_failures,
+                "poolClears": self.pool_clears,
+                "commands": {
+                    name: {
+                        "count": count,
+                        "failures": failures,
+                        "avgMs": round(total / count, 3) if count else 0.0,
+                        "maxMs": round(peak, 3)
+                    }
+                    for name, (count, failures, total, peak) in self.commands.items()
+                }
+            }
+
+
+COMMAND_SECONDS = prom.histogram("smartdam_mongo_command_seconds", "MongoDB command round trips", ["command", "outcome"])
+
+metrics = DbMetrics()
+
+prom.callback("smartdam_mongo_connections", "Pooled MongoDB connections",
+              lambda: {(k,): v for k, v in metrics.stats().items() if k in ("connectionsOpen", "checkedOut")},
+              labelnames=["state"])
+prom.callback("smartdam_mongo_pool_events_total", "Connections created / closed, checkout failures, pool clears",
+              lambda: {(k,): v for k, v in metrics.stats().items()
+                       if k in ("connectionsCreated", "connectionsClosed", "checkoutFailures", "poolClears")},
+              kind="counter", labelnames=["event"])
+
+_lock = threading.Lock()
+_client = None
+_client_pid = None
+_async_client = None
+_async_client_pid = None
+
+
+def _setting(name, default):
+    return getattr(Config, name, default) if Config else default
+
+
+def client_options(**overrides):
+    w = _setting('MONGO_WRITE_CONCERN', 1)
+    options = {
+        "maxPoolSize": _setting('MONGO_MAX_POOL_SIZE', 50),
+        "minPoolSize": _setting('MONGO_MIN_POOL_SIZE', 0),
+        "maxIdleTimeMS": _setting('MONGO_MAX_IDLE_MS', 300000),
+        "serverSelectionTimeoutMS": _setting('MONGO_SERVER_SELECTION_TIMEOUT_MS', 5000),
+        "connectTimeoutMS": _setting('MONGO_CONNECT_TIMEOUT_MS', 5000),
+        "socketTimeoutMS": _setting('MONGO_SOCKET_TIMEOUT_MS', 20000),
+        "w": int(w) if isinstance(w, str) and w.isdigit() else w,
+        "retryWrites": True,
+        "appname": _setting('MONGO_APP_NAME', 'smart-dam'),
+        "event_listeners": [metrics],
+    }
+    options.update(overrides)
+    return options
+
+
+def create_client(uri=None, **overrides):
+    """New pooled client with the configured limits/timeouts and metrics attached."""
+    return MongoClient(uri or _setting('MONGO_URI', 'mongodb://localhost:27017/'), **client_options(**overrides))
+
+
+def get_client():
+    global _client, _client_pid
+    pid = os.getpid()
+    if _client is None or _client_pid != pid:
+        with _lock:
+            if _client is None or _client_pid != pid:
+                if _client_pid != pid:
+                    # Inherited across fork: counters belong to the parent
+                    metrics.reset()
+                _client = create_client()
+                _client_pid = pid
+    return _client
+
+
+def get_db(name=None):
+    return get_client()[name or _setting('DB_NAME', 'smart_dam_db')]
+
+
+def get_collection(name, w=None):
+    """Collection handle, optionally with its own write concern (e.g. w=0 for fire-and-forget)."""
+    col = get_db()[name]
+    if w is not None:
+        col = col.with_options(write_concern=WriteConcern(w=w))
+    return col
+
+
+def get_async_db(name=None):
+    """
+    Motor database for app_async.py, same pool settings and listeners. Create it
+    from inside the running event loop (motor binds to the loop on first use).
+    """
+    global _async_client, _async_client_pid
+    pid = os.getpid()
+    if _async_client is None or _async_client_pid != pid:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        _async_client = AsyncIOMotorClient(_setting('MONGO_URI', 'mongodb://localhost:27017/'), **client_options())
+        _async_client_pid = pid
+    return _async_client[name or _setting('DB_NAME', 'smart_dam_db')]
+
+
+def close_client():
+    global _client, _client_pid, _async_client, _async_client_pid
+    with _lock:
+        if _client is not None and _client_pid == os.getpid():
+            _client.close()
+        _client = None
+        _client_pid = None
+        if _async_client is not None and _async_client_pid == os.getpid():
+            _async_client.close()
+        _async_client = None
+        _async_client_pid = None
+
+
+def ping():
+    """Round trip to the server in ms."""
+    started = time.perf_counter()
+    get_client().admin.command("ping")
+    return (time.perf_counter() - started) * 1000.0
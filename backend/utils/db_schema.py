@@ -0,0 +1,146 @@
+"""
+MongoDB schema / index setup
+Run at app startup (idempotent) or by hand:
+
+    python utils/db_schema.py                       # create indexes
+    python utils/db_schema.py --migrate-timeseries  # copy an existing readings collection into a time-series one
+"""
+
+import argparse
+import os
+import sys
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    from config import Config
+except ImportError:
+    Config = None
+
+# Paged reads sort on (timestamp, _id) so keyset cursors are stable when
+# several documents share a timestamp
+INDEXES = {
+    "readings": [
+        ([("timestamp", DESCENDING), ("_id", DESCENDING)], {"name": "timestamp_id_desc"}),
+    ],
+    "alerts": [
+        ([("type", ASCENDING), ("timestamp", DESCENDING), ("_id", DESCENDING)], {"name": "type_timestamp_id"}),
+        ([("timestamp", DESCENDING), ("_id", DESCENDING)], {"name": "timestamp_id_desc"}),
+    ],
+    # utils/backfill_rainfall.py, one document per scored reading
+    "rainfall_history": [
+        ([("timestamp", DESCENDING), ("_id", DESCENDING)], {"name": "timestamp_id_desc"}),
+    ],
+    # Rollup tiers (utils/rollups.py) upsert and range-scan on (nodeId, bucket)
+    **{
+        f"readings_{tier}": [([("nodeId", ASCENDING), ("bucket", ASCENDING)], {"name": "node_bucket", "unique": True})]
+        for tier in ("1m", "1h", "1d")
+    },
+}
+
+# Time-series collections only index the time and meta fields
+TIMESERIES_INDEXES = {
+    "readings": [
+        ([("timestamp", DESCENDING)], {"name": "timestamp_desc"}),
+    ],
+}
+
+INDEX_OPTIONS_CONFLICT = (85, 86)
+
+
+def is_timeseries(db, name):
+    info = next(db.list_collections(filter={"name": name}), None)
+    return bool(info and info.get("type") == "timeseries")
+
+
+def create_readings_timeseries(db, name="readings", retention_days=0):
+    options = {"timeseries": {"timeField": "timestamp", "metaField": "nodeId", "granularity": "seconds"}}
+    if retention_days:
+        options["expireAfterSeconds"] = int(retention_days * 86400)
+    db.create_collection(name, **options)
+
+
+def ensure_retention(db, name, retention_days, timeseries=False):
+    seconds = int(retention_days * 86400)
+    if timeseries:
+        db.command("collMod", name, expireAfterSeconds=seconds if seconds else "off")
+        return
+
+    col = db[name]
+    if not seconds:
+        if "timestamp_ttl" in col.index_information():
+            col.drop_index("timestamp_ttl")
+        return
+    try:
+        col.create_index([("timestamp", ASCENDING)], name="timestamp_ttl", expireAfterSeconds=seconds)
+    except OperationFailure as e:
+        if e.code not in INDEX_OPTIONS_CONFLICT:
+            raise
+        db.command("collMod", name, index={"name": "timestamp_ttl", "expireAfterSeconds": seconds})
+
+
+def ensure_schema(db, timeseries=False, retention_days=0):
+    if timeseries:
+        if "readings" not in db.list_collection_names():
+            create_readings_timeseries(db, retention_days=retention_days)
+            print(f"✓ Created time-series collection: readings")
+        elif not is_timeseries(db, "readings"):
+            print("⚠️ readings already exists as a regular collection, run utils/db_schema.py --migrate-timeseries")
+            timeseries = False
+
+    for name, indexes in INDEXES.items():
+        if timeseries and name in TIMESERIES_INDEXES:
+            indexes = TIMESERIES_INDEXES[name]
+        for keys, options in indexes:
+            db[name].create_index(keys, **options)
+
+    ensure_retention(db, "readings", retention_days, timeseries)
+
+
+def migrate_readings_to_timeseries(db, retention_days=0, batch_size=10000):
+    if is_timeseries(db, "readings"):
+        print("✓ readings is already a time-series collection")
+        return
+
+    legacy = "readings_legacy"
+    db["readings"].rename(legacy)
+    create_readings_timeseries(db, retention_days=retention_days)
+
+    copied = 0
+    batch = []
+    for doc in db[legacy].find(sort=[("timestamp", ASCENDING)], batch_size=batch_size):
+        if doc.get("timestamp") is None:
+            continue
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            db["readings"].insert_many(batch, ordered=False)
+            copied += len(batch)
+            batch = []
+            print(f"  copied {copied} readings...")
+    if batch:
+        db["readings"].insert_many(batch, ordered=False)
+        copied += len(batch)
+
+    print(f"✓ Migrated {copied} readings into time-series collection (old data kept in {legacy})")
+
+
+def main():
+    from utils.db import get_db
+
+    parser = argparse.ArgumentParser(description="Create Smart Dam indexes / time-series collections")
+    parser.add_argument("--migrate-timeseries", action="store_true")
+    args = parser.parse_args()
+
+    db = get_db()
+    if args.migrate_timeseries:
+        migrate_readings_to_timeseries(db, Config.READINGS_RETENTION_DAYS)
+    ensure_schema(db, Config.READINGS_TIMESERIES, Config.READINGS_RETENTION_DAYS)
+    for name in INDEXES:
+        print(f"  {name}: {sorted(db[name].index_information())}")
+    print("✓ Schema up to date")
+
+
+if __name__ == "__main__":
+    main()
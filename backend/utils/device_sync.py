@@ -0,0 +1,173 @@
+"""
+Device sync (GET /api/device/sync)
+Everything an ESP32 node acts on - control mode, manual command, rain
+prediction and human status - in one body with a version. A node sends back
+the version it holds and the request parks until the state differs or `wait`
+seconds pass, so an idle node costs one request per timeout instead of three
+polls every few seconds.
+
+The state is loaded once per process and shared by every parked request.
+Writes handled by this process call changed() and wake them straight away;
+writes from elsewhere (detector_worker.py, other gunicorn workers) are picked
+up by watch(), which reloads every `interval` seconds while anyone is waiting.
+Each parked request holds a gunicorn thread, so at most `max_waiters` (0 = no
+limit) park at once; wait() raises SyncBusy for the rest.
+"""
+
+import asyncio
+import threading
+import time
+from utils.responses import snapshot_etag
+
+
+class SyncBusy(Exception):
+    pass
+
+
+def versioned(body):
+    """`body` plus a short content hash; equal state gives the same version in every process."""
+    return {**body, "version": snapshot_etag(body)[:16]}
+
+
+class DeviceSync:
+    def __init__(self, load, interval=1.0, max_waiters=0):
+        self._load = load
+        self.interval = interval
+        self.max_waiters = max_waiters
+        self._cond = threading.Condition()
+        self._refresh_lock = threading.Lock()
+        self._state = None
+        self._loaded_at = 0.0
+
+        self.waiting = 0
+        self.woken = 0  # parked requests answered by a change rather than the timeout
+        self.busy = 0  # requests refused because max_waiters were parked
+
+    def _swap(self, state):
+        """Install a freshly loaded state; True if it differs from the previous one. Caller holds the lock."""
+        changed = self._state is None or self._state["version"] != state["version"]
+        self._state = state
+        self._loaded_at = time.monotonic()
+        return changed
+
+    def _fresh(self):
+        return self._state is not None and time.monotonic() - self._loaded_at < self.interval
+
+    def refresh(self):
+        """Reload the state and wake parked requests if it changed."""
+        # One load at a time, so a slow load can't install its older state over a newer one
+        with self._refresh_lock:
+            state = versioned(self._load())
+            with self._cond:
+                if self._swap(state):
+                    self._cond.notify_all()
+        return state
+
+    def changed(self):
+        """Call after a write that may affect the state."""
+        if self.waiting:
+            self.refresh()
+        else:
+            with self._cond:
+                self._loaded_at = 0.0
+
+    def current(self):
+        with self._cond:
+            if self._fresh():
+                return self._state
+        return self.refresh()
+
+    def wait(self, version, timeout):
+        """The current state once it no longer matches `version`, or after `timeout` seconds."""
+        state = self.current()
+        if not version or state["version"] != version or timeout <= 0:
+            return state
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            if self.max_waiters and self.waiting >= self.max_waiters:
+                self.busy += 1
+                raise SyncBusy(f"{self.waiting} requests parked")
+            self.waiting += 1
+            try:
+                while self._state["version"] == version:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return self._state
+                    self._cond.wait(remaining)
+                self.woken += 1
+                return self._state
+            finally:
+                self.waiting -= 1
+
+    def watch(self):
+        """Thread target: pick up writes made by other processes while requests are parked."""
+        while True:
+            time.sleep(self.interval)
+            if not self.waiting:
+                continue
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"⚠️ Device sync watch failed: {e}")
+
+
+class AsyncDeviceSync(DeviceSync):
+    """DeviceSync for an asyncio app: `load` is a coroutine function and parked requests are tasks, not threads."""
+
+    def __init__(self, load, interval=1.0, max_waiters=0):
+        super().__init__(load, interval, max_waiters)
+        self._cond = asyncio.Condition()
+        self._refresh_lock = asyncio.Lock()
+
+    async def refresh(self):
+        async with self._refresh_lock:
+            state = versioned(await self._load())
+            async with self._cond:
+                if self._swap(state):
+                    self._cond.notify_all()
+        return state
+
+    async def changed(self):
+        if self.waiting:
+            await self.refresh()
+        else:
+            self._loaded_at = 0.0
+
+    async def current(self):
+        if self._fresh():
+            return self._state
+        return await self.refresh()
+
+    async def wait(self, version, timeout):
+        state = await self.current()
+        if not version or state["version"] != version or timeout <= 0:
+            return state
+        deadline = time.monotonic() + timeout
+        async with self._cond:
+            if self.max_waiters and self.waiting >= self.max_waiters:
+                self.busy += 1
+                raise SyncBusy(f"{self.waiting} requests parked")
+            self.waiting += 1
+            try:
+                while self._state["version"] == version:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return self._state
+                    try:
+                        await asyncio.wait_for(self._cond.wait(), remaining)
+                    except asyncio.TimeoutError:
+                        return self._state
+                self.woken += 1
+                return self._state
+            finally:
+                self.waiting -= 1
+
+    async def watch(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            if not self.waiting:
+                continue
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"⚠️ Device sync watch failed: {e}")
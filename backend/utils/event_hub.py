@@ -0,0 +1,133 @@
+import asyncio
+import json
+import queue
+import threading
+
+
+class HubFull(Exception):
+    pass
+
+
+def format_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+class EventHub:
+    """
+    In-process pub/sub for Server-Sent Events.
+    Each publish is serialised once and handed to every subscriber queue; a slow
+    subscriber loses its oldest events instead of blocking the writer.
+    At most `max_subscribers` (0 = no limit) are open at once; subscribe()
+    raises HubFull beyond that.
+    """
+
+    def __init__(self, queue_size=100, max_subscribers=0):
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self._lock = threading.Lock()
+        self._subscribers = set()
+
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self):
+        return self._add(queue.Queue(maxsize=self.queue_size))
+
+    def _add(self, q):
+        with self._lock:
+            if self.max_subscribers and len(self._subscribers) >= self.max_subscribers:
+                raise HubFull(f"{len(self._subscribers)} subscribers")
+            self._subscribers.add(q)
+        return q
+
+    def unsubscribe(self, q):
+        with self._lock:
+            self._subscribers.discard(q)
+
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+    def full(self):
+        with self._lock:
+            return bool(self.max_subscribers) and len(self._subscribers) >= self.max_subscribers
+
+    def publish(self, event, data):
+        message = format_event(event, data)
+        with self._lock:
+            subscribers = list(self._subscribers)
+            self.published += 1
+        for q in subscribers:
+            try:
+                q.put_nowait(message)
+            except queue.Full:
+                try:
+                    q.get_nowait()
+                except queue.Empty:
+                    pass
+                try:
+                    q.put_nowait(message)
+                except queue.Full:
+                    pass
+                with self._lock:
+                    self.dropped += 1
+
+    def stream(self, heartbeat=15, initial=None, full_retry=30):
+        """
+        Generator for a text/event-stream response; `initial` is a list of (event, data) sent first.
+        Routes answer 503 while full(); one that loses the race for the last slot ends here, asking the
+        client to come back in `full_retry` seconds.
+        """
+        try:
+            q = self.subscribe()
+        except HubFull:
+            yield f"retry: {full_retry * 1000}\n\n"
+            return
+        try:
+            yield "retry: 3000\n\n"
+            for event, data in initial or []:
+                yield format_event(event, data)
+            while True:
+                try:
+                    yield q.get(timeout=heartbeat)
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+        finally:
+            self.unsubscribe(q)
+
+
+class AsyncEventHub(EventHub):
+    """EventHub for an asyncio app: subscribers are asyncio queues, publish() runs on the loop."""
+
+    def subscribe(self):
+        return self._add(asyncio.Queue(maxsize=self.queue_size))
+
+    def publish(self, event, data):
+        message = format_event(event, data)
+        with self._lock:
+            subscribers = list(self._subscribers)
+            self.published += 1
+        for q in subscribers:
+            if q.full():
+                q.get_nowait()
+                with self._lock:
+                    self.dropped += 1
+            q.put_nowait(message)
+
+    async def stream(self, heartbeat=15, initial=None, full_retry=30):
+        try:
+            q = self.subscribe()
+        except HubFull:
+            yield f"retry: {full_retry * 1000}\n\n"
+            return
+        try:
+            yield "retry: 3000\n\n"
+            for event, data in initial or []:
+                yield format_event(event, data)
+            while True:
+                try:
+                    yield await asyncio.wait_for(q.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+        finally:
+            self.unsubscribe(q)
@@ -0,0 +1,162 @@
+"""
+Flattened RandomForest inference engine
+Exports a fitted RandomForestClassifier into contiguous NumPy node arrays and
+scores batches with a pure-NumPy traversal, so serving does not need sklearn.
+
+Usage (from backend/):
+    python utils/forest_engine.py [--model models/rainfall_model.pkl] [--out models/rainfall_forest.npz]
+"""
+
+import argparse
+import os
+import sys
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+CSV_PATH = os.path.join(BASE_DIR, 'weather_forecast_data.csv')
+MODEL_PATH = os.path.join(BASE_DIR, '..', 'models', 'rainfall_model.pkl')
+FOREST_PATH = os.path.join(BASE_DIR, '..', 'models', 'rainfall_forest.npz')
+
+ROW_CHUNK = 1024  # keeps the (trees x rows) node matrix in cache
+
+
+def export_forest(model, out_path, feature_names=None):
+    """Flatten every tree of a fitted forest into one set of node arrays."""
+    n_classes = len(model.classes_)
+    feature, threshold, left, right, value, roots = [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+
+    for est in model.estimators_:
+        tree = est.tree_
+        n = tree.node_count
+        is_leaf = tree.children_left == -1
+        idx = np.arange(n)
+
+        # Leaves point at themselves so a fixed number of steps is enough
+        feature.append(np.where(is_leaf, 0, tree.feature).astype(np.int32))
+        threshold.append(np.where(is_leaf, np.inf, tree.threshold).astype(np.float64))
+        left.append((np.where(is_leaf, idx, tree.children_left) + offset).astype(np.int32))
+        right.append((np.where(is_leaf, idx, tree.children_right) + offset).astype(np.int32))
+
+        # sklearn >= 1.4 stores class fractions in tree_.value and returns them
+        # as-is; older pickles store counts that predict_proba normalises
+        v = np.array(tree.value[:, 0, :n_classes], dtype=np.float64)
+        normalizer = v.sum(axis=1)[:, np.newaxis]
+        if not np.allclose(normalizer, 1.0):
+            normalizer[normalizer == 0.0] = 1.0
+            v = v / normalizer
+        value.append(v)
+
+        roots.append(offset)
+        offset += n
+        max_depth = max(max_depth, tree.max_depth)
+
+    if feature_names is None:
+        feature_names = getattr(model, "feature_names_in_", [f"f{i}" for i in range(model.n_features_in_)])
+
+    np.savez(
+        out_path,
+        feature=np.concatenate(feature),
+        threshold=np.concatenate(threshold),
+        left=np.concatenate(left),
+        right=np.concatenate(right),
+        value=np.concatenate(value),
+        roots=np.array(roots, dtype=np.int32),
+        classes=np.asarray(model.classes_),
+        feature_names=np.array(list(feature_names), dtype=str),
+        max_depth=np.int32(max_depth),
+    )
+
+
+class FlatForest:
+    def __init__(self, feature, threshold, left, right, value, roots, classes, feature_names, max_depth):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.classes_ = classes
+        self.feature_names = [str(c) for c in feature_names]
+        self.max_depth = int(max_depth)
+        self.n_trees = len(roots)
+        self.n_features_in_ = len(self.feature_names)
+
+        # Inputs are float32 (as in sklearn), so "x <= t" is the same test as
+        # "x <= t32" with t rounded down to float32; halves the traversal bandwidth.
+        self._threshold32 = threshold.astype(np.float32)
+        rounded_up = self._threshold32 > threshold
+        self._threshold32[rounded_up] = np.nextafter(self._threshold32[rounded_up], np.float32(-np.inf))
+
+        # children[2 * node + went_left]
+        self._children = np.empty(2 * len(left), dtype=np.int32)
+        self._children[0::2] = right
+        self._children[1::2] = left
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            return cls(**{k: data[k] for k in data.files})
+
+    def predict_proba(self, X):
+        # sklearn scores trees on float32 inputs; match it bit for bit
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"Expected shape (n, {self.n_features_in_}), got {X.shape}")
+        if not np.isfinite(X).all():
+            raise ValueError("Input contains NaN or infinity")
+
+        out = np.empty((X.shape[0], len(self.classes_)), dtype=np.float64)
+        for start in range(0, X.shape[0], ROW_CHUNK):
+            out[start:start + ROW_CHUNK] = self._predict_chunk(X[start:start + ROW_CHUNK])
+        return out
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+    def _predict_chunk(self, X):
+        n = X.shape[0]
+        columns = np.ascontiguousarray(X.T).ravel()
+        rows = np.arange(n, dtype=np.int32)[np.newaxis, :]
+        feature_offset = self.feature * n
+        node = np.repeat(self.roots[:, np.newaxis], n, axis=1)
+        for _ in range(self.max_depth):
+            x = np.take(columns, np.take(feature_offset, node) + rows)
+            went_left = x <= np.take(self._threshold32, node)
+            node = np.take(self._children, 2 * node + went_left)
+
+        # Trees are summed in order, then averaged, exactly like the forest does
+        return np.add.reduce(np.take(self.value, node, axis=0), axis=0) / self.n_trees
+
+
+def main():
+    import joblib
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description="Export the rainfall RandomForest to flat NumPy arrays")
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--out", default=FOREST_PATH)
+    parser.add_argument("--csv", default=CSV_PATH, help="rows used for the parity check")
+    args = parser.parse_args()
+
+    model = joblib.load(args.model)
+    export_forest(model, args.out)
+    forest = FlatForest.load(args.out)
+    print(f"✓ Forest exported: {args.out}")
+    print(f"  Trees: {forest.n_trees}  Nodes: {len(forest.feature)}  Max depth: {forest.max_depth}")
+    print(f"  Size: {os.path.getsize(args.out) / 1024:.1f} KB")
+
+    X = pd.read_csv(args.csv)[forest.feature_names]
+    expected = model.predict_proba(X)
+    actual = forest.predict_proba(X.to_numpy(dtype=np.float64))
+    if not np.array_equal(expected, actual):
+        print(f"❌ Parity check failed: max |diff| = {np.max(np.abs(expected - actual))}")
+        os.remove(args.out)
+        sys.exit(1)
+    print(f"✓ Parity check passed on {len(X)} rows (bit-identical predict_proba)")
+
+
+if __name__ == "__main__":
+    main()
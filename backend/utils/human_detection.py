@@ -4,11 +4,9 @@ import os
 import sys
 import threading
 import time
+from collections import deque
 from datetime import datetime
-import torch
-
-# Add this line to allow YOLO models to load in PyTorch 2.6+
-torch.serialization.add_safe_globals(['ultralytics.nn.tasks.DetectionModel', 'ultralytics.nn.modules.block.C2f'])
+from pymongo import UpdateOne
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
@@ -17,7 +15,80 @@ try:
 except ImportError:
     Config = None
 
-from ultralytics import YOLO
+from utils.camera import LatestFrameGrabber, MotionGate, parse_sources
+from utils.db import get_db
+from utils import metrics
+from utils.metrics import timed
+from utils.stats_counters import StatsCounters
+
+class TorchPersonDetector:
+    """YOLOv8 through ultralytics/PyTorch (the reference backend)."""
+    
+    def __init__(self, weights, imgsz=640):
+        import torch
+        
+        # Add this line to allow YOLO models to load in PyTorch 2.6+
+        torch.serialization.add_safe_globals(['ultralytics.nn.tasks.DetectionModel', 'ultralytics.nn.modules.block.C2f'])
+        from ultralytics import YOLO
+        
+        self.model = YOLO(weights)
+        self.imgsz = imgsz
+    
+    def detect_people(self, frames, min_confidence=0.5):
+        """One model call for all frames -> [(human_detected, max_confidence)] in input order."""
+        results = self.model(frames, imgsz=self.imgsz, verbose=False)
+        detections = []
+        
+        for result in results:
+            max_confidence = 0.0
+            human_detected = False
+            for box in result.boxes:
+                class_id = int(box.cls[0])
+                confidence = float(box.conf[0])
+                if class_id == 0 and confidence >= min_confidence:
+                    human_detected = True
+                    max_confidence = max(max_confidence, confidence)
+            detections.append((human_detected, max_confidence))
+        
+        return detections
+
+def load_person_detector(backend=None):
+    """Model named by Config: DETECTION_BACKEND "torch" (YOLO_MODEL) or "onnx" (ONNX_MODEL)."""
+    backend = backend or (getattr(Config, 'DETECTION_BACKEND', 'torch') if Config else 'torch')
+    imgsz = getattr(Config, 'DETECTION_IMGSZ', 640) if Config else 640
+    if backend == 'onnx':
+        from utils.yolo_onnx import OnnxPersonDetector
+        path = Config.ONNX_MODEL if Config else 'models/yolov8n.onnx'
+        return OnnxPersonDetector(path, imgsz=imgsz, threads=getattr(Config, 'ONNX_THREADS', 0) if Config else 0), path
+    model_name = Config.YOLO_MODEL if Config else 'yolov8n.pt'
+    return TorchPersonDetector(model_name, imgsz=imgsz), model_name
+
+class CameraState:
+    """Per-source capture, motion gate, counters and latest result."""
+    
+    def __init__(self, name, grabber, gate=None):
+        self.name = name
+        self.grabber = grabber
+        self.gate = gate
+        self.last_inference = float('-inf')
+        self.frames_gated = 0
+        self.frames_inferred = 0
+        self.detected = False
+        self.confidence = 0.0
+        self.timestamp = None
+        self.last_frame = time.monotonic()
+        self.stale = False  # finished, or no frame for CAMERA_STALE_AFTER; left out of "current"
+    
+    def stats(self):
+        return {
+            "framesCaptured": self.grabber.captured,
+            "framesDropped": self.grabber.dropped,
+            "framesGated": self.frames_gated,
+            "framesInferred": self.frames_inferred,
+            "detected": self.detected,
+            "confidence": self.confidence,
+            "stale": self.stale
+        }
 
 class HumanDetector:
     def __init__(self):
@@ -28,14 +99,27 @@ class HumanDetector:
         self.last_detected = False
         self.last_confidence = 0.0
         
+        self.cameras = []
+        self.batches = 0
+        self.last_inference_ms = 0.0
+        self._recent = deque()  # (monotonic time, frames) per batch, for fps()
+        self._recent_lock = threading.Lock()  # appended by the detection thread, read by scrapes / heartbeats
+        self._register_metrics()
+        
         try:
-            model_name = Config.YOLO_MODEL if Config else 'yolov8n.pt'
-            self.model = YOLO(model_name)
+            self.model, model_name = load_person_detector()
             print(f"✓ YOLOv8 model loaded: {model_name}")
         except Exception as e:
             print(f"⚠️ Error loading YOLO model: {e}")
             self.model = None
     
+    def _infer_batch(self, frames):
+        min_confidence = Config.DETECTION_CONFIDENCE if Config else 0.5
+        return self.model.detect_people(frames, min_confidence)
+    
+    def _infer(self, frame):
+        return self._infer_batch([frame])[0]
+    
     def detect_from_webcam(self, timeout=2):
         if not self.model:
             return False, 0.0
@@ -51,112 +135,200 @@ class HumanDetector:
             if not ret:
                 return False, 0.0
             
-            results = self.model(frame, verbose=False)
-            max_confidence = 0.0
-            human_detected = False
-            
-            for result in results:
-                boxes = result.boxes
-                for box in boxes:
-                    class_id = int(box.cls[0])
-                    confidence = float(box.conf[0])
-                    min_confidence = Config.DETECTION_CONFIDENCE if Config else 0.5
-                    if class_id == 0 and confidence >= min_confidence:
-                        human_detected = True
-                        max_confidence = max(max_confidence, confidence)
-            
-            return human_detected, max_confidence
+            return self._infer(frame)
         except Exception as e:
             return False, 0.0
     
-    def _continuous_detection_loop(self, db_collection=None, interval=3):
-        cap = cv2.VideoCapture(0)
-        if not cap.isOpened():
-            print("⚠️ Cannot open webcam")
-            return
+    def _open_cameras(self, sources):
+        """`sources` is [(name, source)], where source is a cv2 source, frame iterable or LatestFrameGrabber."""
+        if sources is None:
+            sources = parse_sources(
+                getattr(Config, 'CAMERA_SOURCES', '') if Config else '',
+                getattr(Config, 'CAMERA_SOURCE', '0') if Config else '0'
+            )
+        use_gate = getattr(Config, 'MOTION_GATE', True) if Config else True
         
+        cameras = []
+        for name, source in sources:
+            grabber = source if isinstance(source, LatestFrameGrabber) else LatestFrameGrabber(source)
+            if not grabber.start():
+                print(f"⚠️ Cannot open camera {name}: {source}")
+                continue
+            gate = None
+            if use_gate:
+                gate = MotionGate(
+                    pixel_threshold=getattr(Config, 'MOTION_THRESHOLD', 25) if Config else 25,
+                    min_changed=getattr(Config, 'MOTION_MIN_CHANGED', 0.01) if Config else 0.01
+                )
+            cameras.append(CameraState(name, grabber, gate))
+        return cameras
+    
+    def _continuous_detection_loop(self, db_collection=None, interval=3, on_result=None, sources=None):
         if not self.model:
             print("⚠️ Model not loaded")
+            self.running = False
+            return
+        
+        cameras = self._open_cameras(sources)
+        if not cameras:
+            print("⚠️ No camera could be opened")
+            self.running = False
             return
+        self.cameras = cameras
+        
+        check_interval = max(min(interval, getattr(Config, 'MOTION_CHECK_INTERVAL', 0.5) if Config else 0.5), 0.005)
+        max_skip = getattr(Config, 'DETECTION_MAX_SKIP', 30) if Config else 30
+        # A frame is only read when a camera is due, so allow a couple of intervals
+        stale_after = max(getattr(Config, 'CAMERA_STALE_AFTER', 15) if Config else 15, 2 * interval)
         
-        print(f"🎥 Continuous detection active (interval: {interval}s)")
+        names = ", ".join(cam.name for cam in cameras)
+        print(f"🎥 Continuous detection active on {len(cameras)} camera(s): {names} (interval: {interval}s)")
         
         try:
+            next_tick = time.monotonic()
             while self.running:
-                ret, frame = cap.read()
-                if not ret:
-                    time.sleep(interval)
-                    continue
-                
-                results = self.model(frame, verbose=False)
-                max_confidence = 0.0
-                human_detected = False
+                now = time.monotonic()
+                due = []
+                for cam in cameras:
+                    if now - cam.last_inference < interval:
+                        continue
+                    frame = cam.grabber.read(timeout=0)
+                    if frame is None:
+                        continue
+                    cam.last_frame = now
+                    cam.stale = False
+                    # Static scene: keep the previous result, but re-check every max_skip seconds
+                    if cam.grabber.frame_at is not None:
+                        metrics.STAGE_SECONDS.observe(now - cam.grabber.frame_at, stage="detector.frame_age")
+                    with timed("detector.motion_gate"):
+                        static = cam.gate is not None and not cam.gate.changed(frame)
+                    if static and now - cam.last_inference < max_skip:
+                        cam.frames_gated += 1
+                        continue
+                    due.append((cam, frame))
                 
-                for result in results:
-                    boxes = result.boxes
-                    for box in boxes:
-                        class_id = int(box.cls[0])
-                        confidence = float(box.conf[0])
-                        min_confidence = Config.DETECTION_CONFIDENCE if Config else 0.5
-                        if class_id == 0 and confidence >= min_confidence:
-                            human_detected = True
-                            max_confidence = max(max_confidence, confidence)
+                expired = self._expire(cameras, now, stale_after)
+                if due or expired:
+                    self._run_batch(due, db_collection, on_result, expired)
+                elif all(cam.grabber.finished for cam in cameras):
+                    break
                 
-                self.last_detected = human_detected
-                self.last_confidence = max_confidence
-                self.last_detection_time = datetime.utcnow()
-                
-                timestamp = self.last_detection_time.strftime("%H:%M:%S")
-                if human_detected:
-                    print(f"[{timestamp}] 🚨 HUMAN DETECTED (conf: {max_confidence:.2f})")
-                else:
-                    print(f"[{timestamp}] ✓ No human detected")
-                
-                if db_collection is not None:
-                    detection_doc = {
-                        "detected": human_detected,
-                        "confidence": float(max_confidence),
-                        "timestamp": self.last_detection_time
-                    }
-                    db_collection.update_one(
-                        {"_id": "current"},
-                        {"$set": detection_doc},
-                        upsert=True
-                    )
-                    
-                    if human_detected and Config:
-                        try:
-                            from pymongo import MongoClient
-                            client = MongoClient(Config.MONGO_URI)
-                            db = client[Config.DB_NAME]
-                            db['alerts'].insert_one({
-                                "type": "human",
-                                "detected": True,
-                                "confidence": float(max_confidence),
-                                "timestamp": self.last_detection_time,
-                                "nodeId": "webcam"
-                            })
-                        except:
-                            pass
-                
-                time.sleep(interval)
+                next_tick = max(next_tick + check_interval, time.monotonic() - check_interval)
+                time.sleep(max(0.0, next_tick - time.monotonic()))
         except KeyboardInterrupt:
             print("\n🛑 Stopping")
         finally:
-            cap.release()
+            for cam in cameras:
+                cam.grabber.stop()
             self.running = False
     
-    def start_continuous_detection(self, db_collection=None, interval=None):
+    def _expire(self, cameras, now, stale_after):
+        """Mark cameras that finished or stopped delivering frames stale; returns the ones that just went stale."""
+        expired = []
+        for cam in cameras:
+            if not cam.stale and (cam.grabber.finished or now - cam.last_frame > stale_after):
+                cam.stale = True
+                cam.detected = False
+                cam.confidence = 0.0
+                expired.append(cam)
+                print(f"⚠️ Camera {cam.name} has no recent frames; dropped from the detection result")
+        return expired
+    
+    def _run_batch(self, due, db_collection=None, on_result=None, expired=()):
+        max_batch = getattr(Config, 'DETECTION_MAX_BATCH', 8) if Config else 8
+        frames = [frame for _, frame in due]
+        
+        detections = []
+        if frames:
+            started = time.perf_counter()
+            for i in range(0, len(frames), max_batch):
+                detections.extend(self._infer_batch(frames[i:i + max_batch]))
+            elapsed = time.perf_counter() - started
+            metrics.STAGE_SECONDS.observe(elapsed, stage="detector.inference")
+            self.last_inference_ms = elapsed * 1000.0
+            finished = time.monotonic()
+            with self._recent_lock:
+                self._recent.append((finished, len(frames)))
+                while self._recent[0][0] < finished - 60.0:  # longest fps() window
+                    self._recent.popleft()
+            self.batches += 1
+        
+        now = datetime.utcnow()
+        for (cam, frame), (human_detected, confidence) in zip(due, detections):
+            cam.last_inference = time.monotonic()
+            cam.frames_inferred += 1
+            cam.detected = human_detected
+            cam.confidence = confidence
+            cam.timestamp = now
+            if cam.gate is not None:
+                cam.gate.accept(frame)
+        for cam in expired:
+            cam.timestamp = now
+        
+        # "current" stays the site-wide answer: any camera with recent frames that currently sees someone
+        live = [cam for cam in self.cameras if not cam.stale]
+        self.last_detected = any(cam.detected for cam in live)
+        self.last_confidence = max((cam.confidence for cam in live), default=0.0)
+        self.last_detection_time = now
+        
+        timestamp = now.strftime("%H:%M:%S")
+        for cam, _ in due:
+            if cam.detected:
+                print(f"[{timestamp}] 🚨 HUMAN DETECTED on {cam.name} (conf: {cam.confidence:.2f})")
+        if not self.last_detected:
+            print(f"[{timestamp}] ✓ No human detected")
+        
+        if db_collection is not None:
+            ops = [
+                UpdateOne(
+                    {"_id": f"camera:{cam.name}"},
+                    {"$set": {"camera": cam.name, "detected": cam.detected, "confidence": float(cam.confidence),
+                              "stale": cam.stale, "timestamp": now}},
+                    upsert=True
+                )
+                for cam in [cam for cam, _ in due] + list(expired)
+            ]
+            ops.append(UpdateOne(
+                {"_id": "current"},
+                {"$set": {"detected": self.last_detected, "confidence": float(self.last_confidence), "timestamp": now}},
+                upsert=True
+            ))
+            with timed("detector.db_write"):
+                db_collection.bulk_write(ops, ordered=False)
+            
+            alerts = [{
+                "type": "human",
+                "detected": True,
+                "confidence": float(cam.confidence),
+                "timestamp": now,
+                "nodeId": cam.name
+            } for cam, _ in due if cam.detected]
+            if alerts:
+                try:
+                    db = get_db()
+                    with timed("detector.alert_write"):
+                        db['alerts'].insert_many(alerts)
+                        StatsCounters(db['stats']).record_alert("human", len(alerts))
+                except Exception as e:
+                    print(f"⚠️ Could not store human alert: {e}")
+        
+        if on_result is not None:
+            try:
+                on_result(self.last_detected, self.last_confidence, now)
+            except Exception as e:
+                print(f"⚠️ Detection callback failed: {e}")
+    
+    def start_continuous_detection(self, db_collection=None, interval=None, on_result=None, sources=None):
         if self.running:
             return False
         if not self.model:
             return False
         
-        interval = interval or (getattr(Config, 'DETECTION_INTERVAL', 3) if Config else 3)
+        interval = interval if interval is not None else (getattr(Config, 'DETECTION_INTERVAL', 3) if Config else 3)
         self.running = True
         self.detection_thread = threading.Thread(
             target=self._continuous_detection_loop,
-            args=(db_collection, interval),
+            args=(db_collection, interval, on_result, sources),
             daemon=True
         )
         self.detection_thread.start()
@@ -176,4 +348,41 @@ class HumanDetector:
             "confidence": self.last_confidence,
             "timestamp": self.last_detection_time,
             "running": self.running
+        }
+    
+    def fps(self, window=10.0):
+        """Frames inferred per second over the last `window` seconds, all cameras."""
+        cutoff = time.monotonic() - window
+        with self._recent_lock:
+            recent = list(self._recent)
+        return sum(n for at, n in recent if at >= cutoff) / window
+    
+    def _register_metrics(self):
+        # The registry keeps the first registration, i.e. the process's detector
+        def frame_samples():
+            samples = {}
+            for cam in self.cameras:
+                stats = cam.stats()
+                for outcome in ("Captured", "Dropped", "Gated", "Inferred"):
+                    samples[(cam.name, outcome.lower())] = stats[f"frames{outcome}"]
+            return samples
+        
+        metrics.callback("smartdam_detector_frames_total", "Camera frames by outcome", frame_samples,
+                         kind="counter", labelnames=["camera", "outcome"])
+        metrics.callback("smartdam_detector_fps", "Frames inferred per second (10s window)", lambda: {(): round(self.fps(), 3)})
+        metrics.callback("smartdam_detector_inference_ms", "Duration of the last YOLO batch", lambda: {(): round(self.last_inference_ms, 3)})
+        metrics.callback("smartdam_detector_running", "1 while the detection loop runs", lambda: {(): int(self.running)})
+    
+    def get_stats(self):
+        cameras = {cam.name: cam.stats() for cam in self.cameras}
+        totals = {
+            key: sum(cam[key] for cam in cameras.values())
+            for key in ("framesCaptured", "framesDropped", "framesGated", "framesInferred")
+        }
+        return {
+            **totals,
+            "batches": self.batches,
+            "fps": round(self.fps(), 2),
+            "lastInferenceMs": round(self.last_inference_ms, 1),
+            "cameras": cameras
         }
\ No newline at end of file
@@ -0,0 +1,52 @@
+"""
+Readings insert outcomes, shared by app.py and app_async.py
+insert_many(ordered=False) either raises a connection / timeout error (the
+whole batch is in doubt; retry it) or a BulkWriteError naming the documents
+that failed. Duplicate keys are documents a previous attempt already stored;
+any other write error fails the same way on every retry, so those documents
+go to readings_dead_letter instead of back to the buffer.
+"""
+
+from datetime import datetime
+from pymongo.errors import ConnectionFailure, ExecutionTimeout, PyMongoError, WTimeoutError
+
+DEAD_LETTER = "readings_dead_letter"
+DUPLICATE_KEY = 11000
+
+
+def is_transient(exc):
+    """True for failures worth retrying the same batch after: lost connections, timeouts."""
+    if isinstance(exc, (ConnectionFailure, ExecutionTimeout, WTimeoutError)):
+        return True
+    return isinstance(exc, PyMongoError) and exc.has_error_label("RetryableWriteError")
+
+
+def split_write_errors(docs, exc):
+    """BulkWriteError from insert_many(docs) -> (stored docs, dead-letter documents for the rejected ones)."""
+    errors = {err.get("index"): err for err in exc.details.get("writeErrors", [])}
+    stored = [d for i, d in enumerate(docs) if i not in errors]
+    now = datetime.utcnow()
+    rejected = [
+        {"reading": docs[i], "code": err.get("code"), "error": err.get("errmsg"), "failedAt": now}
+        for i, err in sorted(errors.items())
+        if err.get("code") != DUPLICATE_KEY and i is not None and i < len(docs)
+    ]
+    return stored, rejected
+
+
+def retried(docs):
+    """insert_many assigns _id in place, so a batch coming back from a failed attempt already has ids."""
+    return bool(docs) and all("_id" in d for d in docs)
+
+
+def stored_ids_query(docs):
+    """
+    Which of `docs` an earlier, failed attempt already stored. Time-series
+    collections have no unique _id index, so a retried batch would be stored
+    twice; the timestamp bound lets the server skip unrelated buckets.
+    """
+    times = [d["timestamp"] for d in docs if isinstance(d.get("timestamp"), datetime)]
+    query = {"_id": {"$in": [d["_id"] for d in docs]}}
+    if times:
+        query["timestamp"] = {"$gte": min(times), "$lte": max(times)}
+    return query
@@ -0,0 +1,44 @@
+import threading
+import time
+
+
+class Lazy:
+    """
+    Builds an expensive object (ML model, detector) on first get(), once, even
+    with several request threads arriving together.
+    """
+
+    def __init__(self, factory, name=None):
+        self.factory = factory
+        self.name = name or getattr(factory, "__name__", "lazy")
+        self._lock = threading.Lock()
+        self._value = None
+        self._loaded = False
+        self.load_seconds = None
+
+    @property
+    def loaded(self):
+        return self._loaded
+
+    def get(self):
+        if self._loaded:
+            return self._value
+        with self._lock:
+            if not self._loaded:
+                started = time.perf_counter()
+                self._value = self.factory()
+                self.load_seconds = time.perf_counter() - started
+                self._loaded = True
+                print(f"✓ {self.name} ready in {self.load_seconds:.2f}s")
+        return self._value
+
+    def peek(self):
+        """The value if already built, else None (never triggers a load)."""
+        return self._value if self._loaded else None
+
+    def swap(self, value):
+        """Replace a built value (hot reload); returns the old one. Readers see either, never a mix."""
+        with self._lock:
+            old, self._value = self._value, value
+            self._loaded = True
+        return old
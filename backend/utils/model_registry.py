@@ -0,0 +1,184 @@
+"""
+Versioned model registry and hot reload
+models/registry/<version>/ holds the artifacts written by
+utils/train_rainfall_model.py; manifest.json next to them names the active
+version. Serving processes watch the manifest and swap the new model in
+without a restart.
+
+Usage (from backend/):
+    python utils/model_registry.py list
+    python utils/model_registry.py activate 20240601-120000
+    python utils/model_registry.py rollback
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+REGISTRY_DIR = os.path.join(BASE_DIR, '..', 'models', 'registry')
+
+MANIFEST = "manifest.json"
+
+
+class ModelRegistry:
+    def __init__(self, directory=REGISTRY_DIR):
+        self.directory = directory
+        self.manifest_path = os.path.join(directory, MANIFEST)
+
+    def read(self):
+        try:
+            with open(self.manifest_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"active": None, "previous": None, "versions": {}}
+
+    def write(self, manifest):
+        # Readers in other processes only ever see the old or the new file
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = f"{self.manifest_path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(manifest, f, indent=2, default=str)
+        os.replace(tmp, self.manifest_path)
+
+    def mtime(self):
+        try:
+            return os.stat(self.manifest_path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def path(self, version):
+        return os.path.join(self.directory, version)
+
+    def register(self, artifact, activate=False):
+        """Add an artifact directory (inside the registry) to the manifest; returns its version."""
+        version = os.path.basename(os.path.normpath(artifact))
+        with open(os.path.join(artifact, "metadata.json")) as f:
+            metadata = json.load(f)
+        manifest = self.read()
+        manifest["versions"][version] = {
+            "created_at": metadata.get("created_at"),
+            "registered_at": datetime.utcnow().isoformat() + "Z",
+            "rows": metadata.get("data", {}).get("rows"),
+            "holdout": {k: metadata.get("holdout", {}).get(k) for k in ("accuracy", "f1", "roc_auc")},
+        }
+        if activate:
+            manifest["previous"], manifest["active"] = manifest.get("active"), version
+        self.write(manifest)
+        return version
+
+    def activate(self, version):
+        manifest = self.read()
+        if version not in manifest["versions"] or not os.path.isdir(self.path(version)):
+            raise KeyError(f"unknown model version {version}")
+        if manifest.get("active") != version:
+            manifest["previous"], manifest["active"] = manifest.get("active"), version
+            self.write(manifest)
+        return version
+
+    def rollback(self):
+        previous = self.read().get("previous")
+        if not previous:
+            raise KeyError("no previous version to roll back to")
+        return self.activate(previous)
+
+    def active(self):
+        """(version, artifact directory) of the active model, or None."""
+        version = self.read().get("active")
+        if version and os.path.isdir(self.path(version)):
+            return version, self.path(version)
+        return None
+
+
+class ModelReloader:
+    """
+    Keeps a Lazy-held model on the registry's active version. The new version
+    is loaded and warmed on the calling thread while the old one keeps serving,
+    then the reference is swapped; requests already holding the old model
+    finish with it and it is freed. One transition at a time, so at most two
+    models are alive.
+    """
+
+    def __init__(self, registry, lazy, load, warm=None, on_swap=None):
+        self.registry = registry
+        self.lazy = lazy
+        self.load = load
+        self.warm = warm
+        self.on_swap = on_swap
+        self._lock = threading.Lock()
+
+        self.reloads = 0
+        self.failures = 0
+        self.last_seconds = None
+
+    def current_version(self):
+        return getattr(self.lazy.peek(), "version", None)
+
+    def reload(self):
+        """Load the active version if it isn't the one serving; True if a swap happened."""
+        with self._lock:
+            if not self.lazy.loaded:
+                return False  # the first get() loads whatever is active then
+            active = self.registry.active()
+            if (active[0] if active else None) == self.current_version():
+                return False
+            started = time.perf_counter()
+            try:
+                model = self.load()
+                if self.warm:
+                    self.warm(model)
+            except Exception:
+                self.failures += 1
+                raise
+            old = self.lazy.swap(model)
+            del old
+            self.last_seconds = time.perf_counter() - started
+            self.reloads += 1
+        if self.on_swap:
+            self.on_swap(model)
+        print(f"✓ {self.lazy.name} reloaded: {getattr(model, 'version', None)} in {self.last_seconds:.2f}s")
+        return True
+
+    def watch(self, interval):
+        """Thread target: reload when the manifest changes (training, the admin endpoint, another worker)."""
+        last = self.registry.mtime()
+        while True:
+            time.sleep(interval)
+            mtime = self.registry.mtime()
+            if mtime == last:
+                continue
+            try:
+                self.reload()
+            except Exception as e:
+                # `last` stays put, so a half-written artifact is retried on the next tick
+                print(f"⚠️ Model reload failed, still serving {self.current_version()}: {e}")
+                continue
+            last = mtime
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or switch the active rainfall model")
+    parser.add_argument("--registry", default=REGISTRY_DIR)
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list")
+    sub.add_parser("rollback")
+    activate = sub.add_parser("activate")
+    activate.add_argument("version")
+    args = parser.parse_args()
+
+    registry = ModelRegistry(args.registry)
+    if args.command == "list":
+        manifest = registry.read()
+        for version, info in sorted(manifest["versions"].items()):
+            marker = "*" if version == manifest.get("active") else " "
+            print(f"{marker} {version}  rows={info.get('rows')}  {info.get('holdout')}")
+        return
+    version = registry.rollback() if args.command == "rollback" else registry.activate(args.version)
+    print(f"✓ Active model: {version} (serving processes pick it up on their next manifest check)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class PredictionCache:
+    """
+    LRU + TTL memo for rainfall predictions.
+    Keys are the latest reading's id plus weather inputs rounded to `quantum`,
+    so polling with an unchanged reading and weather maps to the same entry.
+    """
+
+    def __init__(self, maxsize=256, ttl=300, quantum=0.5):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.quantum = quantum
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def make_key(self, reading_id, weather_inputs):
+        quantized = tuple(
+            (name, None if value is None else round(float(value) / self.quantum))
+            for name, value in sorted(weather_inputs.items())
+        )
+        return (str(reading_id),) + quantized
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or now - entry[0] >= self.ttl:
+                if entry is not None:
+                    del self._entries[key]
+                    self.evictions += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hitRate": round(self.hits / total, 3) if total else 0.0,
+            }
@@ -0,0 +1,91 @@
+import json
+from datetime import datetime, timezone
+from bson import ObjectId
+from bson.errors import InvalidId
+
+
+def parse_ts(raw):
+    """Epoch milliseconds or ISO 8601 -> naive UTC datetime (how timestamps are stored)."""
+    if raw is None or raw == "":
+        return None
+    if raw.lstrip("-").isdigit():
+        try:
+            return datetime.utcfromtimestamp(int(raw) / 1000.0)
+        except (OverflowError, OSError) as e:
+            raise ValueError(f"timestamp out of range: {raw}") from e
+    dt = datetime.fromisoformat(raw.replace("Z", "+00:00"))
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+def iso_ts(dt):
+    return dt.isoformat() + "Z" if isinstance(dt, datetime) else dt
+
+
+def page_query(args, base=None, default_limit=500, max_limit=5000):
+    """
+    Build (filter, limit, projection) from request args:
+        before / before_id  keyset cursor (exclusive), newest first
+        from / to           inclusive time range
+        limit               page size, capped at max_limit
+        fields              comma-separated projection
+    Raises ValueError on malformed input.
+    """
+    query = dict(base or {})
+
+    ts_range = {}
+    start = parse_ts(args.get("from"))
+    end = parse_ts(args.get("to"))
+    if start:
+        ts_range["$gte"] = start
+    if end:
+        ts_range["$lte"] = end
+
+    before = parse_ts(args.get("before"))
+    before_id = args.get("before_id")
+    if before and before_id:
+        try:
+            oid = ObjectId(before_id)
+        except (InvalidId, TypeError):
+            raise ValueError("before_id is not a valid id")
+        # Readings flushed in one batch share a timestamp; _id breaks the tie
+        query["$or"] = [{"timestamp": {"$lt": before}}, {"timestamp": before, "_id": {"$lt": oid}}]
+    elif before:
+        ts_range["$lt"] = before
+
+    if ts_range:
+        query["timestamp"] = ts_range
+
+    limit = int(args.get("limit", default_limit))
+    if limit < 1:
+        raise ValueError("limit must be positive")
+    limit = min(limit, max_limit)
+
+    projection = None
+    fields = args.get("fields")
+    if fields:
+        projection = {f.strip(): 1 for f in fields.split(",") if f.strip() and not f.strip().startswith("$")}
+        projection["timestamp"] = 1
+
+    return query, limit, projection
+
+
+def stream_json_array(cursor, transform):
+    """Yield a JSON array one document at a time so the page is never held in memory."""
+    yield "["
+    first = True
+    for doc in cursor:
+        yield ("" if first else ",") + json.dumps(transform(doc), default=str)
+        first = False
+    yield "]"
+
+
+async def astream_json_array(cursor, transform):
+    """stream_json_array over an async (motor) cursor."""
+    yield "["
+    first = True
+    async for doc in cursor:
+        yield ("" if first else ",") + json.dumps(transform(doc), default=str)
+        first = False
+    yield "]"
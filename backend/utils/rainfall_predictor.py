@@ -1,34 +1,59 @@
 import joblib
-import pandas as pd
+import numpy as np
 import os
 import sys
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from utils.forest_engine import FlatForest
+
 class RainfallPredictor:
-    def __init__(self, model_path):
+    def __init__(self, model_path, forest_path=None, version=None):
+        self.version = version
+        if forest_path and os.path.exists(forest_path):
+            if os.path.exists(model_path) and os.path.getmtime(model_path) > os.path.getmtime(forest_path):
+                print(f"⚠️ {forest_path} is older than {model_path}, re-run utils/forest_engine.py")
+            else:
+                self.model = FlatForest.load(forest_path)
+                self.feature_cols = self.model.feature_names
+                print(f"✓ Rainfall forest loaded: {forest_path} ({self.model.n_trees} trees)")
+                print(f"  Features: {self.feature_cols}")
+                return
+        
         if not os.path.exists(model_path):
             raise FileNotFoundError(f"Model file not found: {model_path}")
         
         try:
             self.model = joblib.load(model_path)
             self.feature_cols = list(self.model.feature_names_in_)
+            if len(self.feature_cols) != self.model.n_features_in_:
+                raise ValueError(f"feature_names_in_ does not match n_features_in_ ({self.model.n_features_in_})")
+            # Column order is fixed here once; every call passes a plain array in
+            # this order, so sklearn's per-call feature-name check is dropped.
+            del self.model.feature_names_in_
             print(f"✓ Rainfall model loaded: {model_path}")
             print(f"  Features: {self.feature_cols}")
         except Exception as e:
             raise Exception(f"Failed to load model: {e}")
     
+    @classmethod
+    def from_registry(cls, registry, model_path, forest_path=None):
+        """The registry's active version (utils/model_registry.py), else the fixed paths."""
+        active = registry.active() if registry else None
+        if active is None:
+            return cls(model_path, forest_path)
+        version, path = active
+        print(f"✓ Rainfall model version {version}")
+        return cls(os.path.join(path, "model.pkl"), os.path.join(path, "rainfall_forest.npz"), version=version)
+    
+    def warm_up(self):
+        """One prediction so the first request after a (re)load doesn't pay for lazy setup."""
+        self._rain_percent(np.zeros((1, len(self.feature_cols))))
+    
     def predict(self, input_data):
         try:
-            X = pd.DataFrame([input_data], columns=self.feature_cols)
-            
-            if hasattr(self.model, "predict_proba"):
-                proba = self.model.predict_proba(X)
-                percent = proba[0][1] * 100.0
-            else:
-                pred = self.model.predict(X)
-                percent = pred[0] * 100.0
-            
+            X = np.array([[float(input_data[c]) for c in self.feature_cols]])
+            percent = float(self._rain_percent(X)[0])
             rain_label = "YES" if percent >= 50.0 else "NO"
             return round(percent, 2), rain_label
             
@@ -40,6 +65,20 @@ class RainfallPredictor:
             rain_label = "YES" if percent >= 50.0 else "NO"
             return round(percent, 2), rain_label
     
+    def predict_many(self, rows):
+        """
+        Score a batch in one model call.
+        rows: 2-D array with columns in self.feature_cols order, a record/structured
+        array, a mapping of column -> values (dict, DataFrame) or a list of dicts.
+        Returns (percent, labels) arrays.
+        """
+        X = self._as_matrix(rows)
+        if X.shape[0] == 0:
+            return np.empty(0), np.empty(0, dtype="<U3")
+        percent = self._rain_percent(X)
+        labels = np.where(percent >= 50.0, "YES", "NO")
+        return np.round(percent, 2), labels
+    
     def predict_from_sensors(self, temp, humidity, wind_speed, cloud_cover, pressure):
         input_data = {
             'Temperature': float(temp),
@@ -48,4 +87,26 @@ class RainfallPredictor:
             'Cloud_Cover': float(cloud_cover),
             'Pressure': float(pressure)
         }
-        return self.predict(input_data)
\ No newline at end of file
+        return self.predict(input_data)
+    
+    def _rain_percent(self, X):
+        if hasattr(self.model, "predict_proba"):
+            return self.model.predict_proba(X)[:, 1] * 100.0
+        return np.asarray(self.model.predict(X), dtype=np.float64) * 100.0
+    
+    def _as_matrix(self, rows):
+        if isinstance(rows, np.ndarray) and rows.dtype.names:
+            X = np.column_stack([rows[c] for c in self.feature_cols])
+        elif hasattr(rows, "keys"):
+            X = np.column_stack([np.asarray(rows[c], dtype=np.float64) for c in self.feature_cols])
+        elif isinstance(rows, (list, tuple)) and rows and isinstance(rows[0], dict):
+            X = np.array([[r[c] for c in self.feature_cols] for r in rows], dtype=np.float64)
+        else:
+            X = np.asarray(rows, dtype=np.float64)
+            if X.size == 0:
+                X = X.reshape(0, len(self.feature_cols))
+        
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != len(self.feature_cols):
+            raise ValueError(f"Expected shape (n, {len(self.feature_cols)}) in order {self.feature_cols}, got {X.shape}")
+        return X
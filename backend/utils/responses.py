@@ -0,0 +1,229 @@
+"""
+JSON bodies shared by app.py and app_async.py
+Both apps fetch documents their own way (pymongo vs motor) and hand them here,
+so the two always answer with the same shapes.
+"""
+
+import hashlib
+import json
+from datetime import datetime, timedelta
+from utils.queries import iso_ts
+
+PRESSURE = 1013.25
+
+# Alert types whose latest timestamp the dashboard cards show
+SNAPSHOT_ALERT_TYPES = ("vibration", "human")
+
+
+def nice_ts(raw):
+    if raw is None:
+        return ""
+    try:
+        if isinstance(raw, (int, float)):
+            dt = datetime.utcfromtimestamp(raw / 1000.0)
+        elif isinstance(raw, str):
+            dt = datetime.fromisoformat(raw.replace("Z", "+00:00"))
+        else:
+            dt = raw
+        ist_dt = dt + timedelta(hours=5, minutes=30)
+        return ist_dt.strftime("%d %b %Y, %I:%M %p IST")
+    except:
+        return str(raw)
+
+
+def format_doc(doc):
+    doc["_id"] = str(doc["_id"])
+    doc["ts"] = iso_ts(doc.get("timestamp"))
+    doc["timestamp"] = nice_ts(doc.get("timestamp"))
+    return doc
+
+
+def weather_body(location_name, w):
+    return {
+        "locationName": location_name,
+        "temperature": w["temperature"],
+        "humidity": w["humidity"],
+        "cloud": w["cloud"],
+        "rain_prob": w["rain_prob"],
+        "windspeed": w["windspeed"],
+        "wind_direction": w["wind_direction"],
+        "sunshine": w["sunshine"],
+        "time": nice_ts(w.get("fetched_at"))
+    }
+
+
+def reading_error(latest_reading):
+    """(error body, status) if the latest reading can't feed a prediction, else None."""
+    if not latest_reading:
+        return {"error": "No sensor data", "percent": 0, "rainLabel": "NO"}, 400
+    if latest_reading.get("temp") is None or latest_reading.get("humidity") is None:
+        return {"error": "Invalid sensor data", "percent": 0, "rainLabel": "NO"}, 400
+    return None
+
+
+def rainfall_inputs(latest_reading, weather):
+    """(model input, None, None) or (None, error body, status) for /api/rainfall."""
+    error = reading_error(latest_reading)
+    if error:
+        return (None,) + error
+
+    sensor_temp = latest_reading["temp"]
+    sensor_humidity = latest_reading["humidity"]
+    cloud_cover = weather.get("cloud")
+    windspeed = weather.get("windspeed")
+    if cloud_cover is None or windspeed is None:
+        return None, {"error": "Weather API incomplete", "percent": 0, "rainLabel": "NO"}, 500
+
+    return {
+        'Temperature': float(sensor_temp),
+        'Humidity': float(sensor_humidity),
+        'Wind_Speed': float(windspeed),
+        'Cloud_Cover': float(cloud_cover),
+        'Pressure': float(PRESSURE)
+    }, None, None
+
+
+def raw_point(doc, fields):
+    """A raw reading shaped like a rollup bucket point."""
+    return {"t": doc["timestamp"], "count": 1,
+            **{f: None if doc.get(f) is None else {"min": doc[f], "max": doc[f], "mean": doc[f], "last": doc[f]} for f in fields}}
+
+
+def series_body(resolution, node, start, end, points):
+    return {
+        "resolution": resolution,
+        "node": node,
+        "from": iso_ts(start),
+        "to": iso_ts(end),
+        "points": [{**p, "t": iso_ts(p["t"])} for p in points]
+    }
+
+
+def valve_status_body(status, control):
+    if not status:
+        return {"state": "CLOSED", "reason": "BOOT", "timestamp": "", "mode": "AUTO"}
+    control = control or {}
+    return {
+        "state": status.get("state", "CLOSED"),
+        "reason": status.get("reason", "BOOT"),
+        "timestamp": nice_ts(status.get("timestamp")),
+        "mode": control.get("mode", "AUTO")
+    }
+
+
+def valve_control_body(control):
+    if not control:
+        return {"mode": "AUTO", "manualCommand": "NONE"}
+    return {"mode": control.get("mode", "AUTO"), "manualCommand": control.get("manualCommand", "NONE")}
+
+
+def human_detection_body(docs, heartbeat_seconds, detector=None):
+    """
+    `docs` are all human_detection documents by _id. An in-process `detector`
+    (DETECTION_MODE=inline) reports its own state; otherwise it comes from the
+    worker doc, which counts as running only while its heartbeat is fresh.
+    """
+    doc = docs.get("current")
+    cameras = [
+        {
+            "camera": cam.get("camera"),
+            "humanDetected": cam.get("detected", False),
+            "confidence": cam.get("confidence", 0.0),
+            "lastChecked": nice_ts(cam.get("timestamp"))
+        }
+        for key, cam in sorted(docs.items()) if str(key).startswith("camera:")
+    ]
+
+    if detector is not None:
+        running, stats = detector.running, detector.get_stats()
+    else:
+        worker = docs.get("worker") or {}
+        heartbeat = worker.get("heartbeatAt")
+        fresh = heartbeat is not None and datetime.utcnow() - heartbeat < timedelta(seconds=3 * heartbeat_seconds)
+        running, stats = bool(worker.get("running") and fresh), worker.get("stats", {})
+
+    if not doc:
+        return {"humanDetected": False, "lastChecked": "", "confidence": 0.0, "detectorRunning": running,
+                "cameras": cameras, "detectorStats": stats}
+    return {
+        "humanDetected": doc.get("detected", False),
+        "lastChecked": nice_ts(doc.get("timestamp")),
+        "confidence": doc.get("confidence", 0.0),
+        "detectorRunning": running,
+        "cameras": cameras,
+        "detectorStats": stats
+    }
+
+
+def dashboard_stats_body(latest_reading, statistics, valve_status):
+    return {
+        "currentReading": {
+            "temperature": latest_reading.get("temp") if latest_reading else 0,
+            "humidity": latest_reading.get("humidity") if latest_reading else 0,
+            "waterLevel": latest_reading.get("percent") if latest_reading else 0,
+            "valveState": valve_status.get("state") if valve_status else "CLOSED",
+            "timestamp": nice_ts(latest_reading.get("timestamp")) if latest_reading else ""
+        },
+        "statistics": statistics
+    }
+
+
+def dashboard_snapshot_body(readings, weather, rainfall, valve_status, valve_control, detection, statistics, last_alerts):
+    """
+    Everything one dashboard view needs (/api/dashboard). `readings` are raw
+    documents newest first; the latest one feeds the stats card as well.
+    """
+    latest_reading = readings[0] if readings else None
+    return {
+        "readings": [format_doc(dict(doc)) for doc in readings],
+        "weather": weather,
+        "rainfall": rainfall,
+        "valve": valve_status_body(valve_status, valve_control),
+        # detectorStats change with every heartbeat; /api/human-detection/status still carries them
+        "humanDetection": {k: v for k, v in detection.items() if k != "detectorStats"},
+        "stats": dashboard_stats_body(latest_reading, statistics, valve_status),
+        "lastAlerts": {t: nice_ts(doc.get("timestamp")) if doc else "" for t, doc in last_alerts.items()}
+    }
+
+
+def device_sync_body(control, rainfall, detection):
+    """
+    What an ESP32 node acts on (/api/device/sync). `rainfall` is the stored
+    prediction or None. Rain is whole percent and confidence two decimals, so
+    model jitter doesn't wake every parked node.
+    """
+    rainfall = rainfall or {}
+    return {
+        **valve_control_body(control),
+        "rainPercent": round(float(rainfall.get("percent", 0.0))),
+        "rainLabel": rainfall.get("rainLabel", "NO"),
+        "humanDetected": bool(detection.get("humanDetected", False)),
+        "confidence": round(float(detection.get("confidence", 0.0)), 2)
+    }
+
+
+def snapshot_etag(body):
+    """Strong validator for a JSON body; equal content gives the same tag in every process."""
+    return hashlib.sha1(json.dumps(body, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def dashboard_etag(body):
+    """
+    snapshot_etag over a /api/dashboard body without what the detector rewrites
+    on every inference (lastChecked, unrounded confidence): a 304 keeps the
+    client's older check time until something it shows actually changes.
+    """
+    detection = body.get("humanDetection") or {}
+    stable = {
+        **body,
+        "humanDetection": {
+            **{k: v for k, v in detection.items() if k not in ("lastChecked", "cameras")},
+            "confidence": round(float(detection.get("confidence") or 0.0), 2),
+            "cameras": [
+                {"camera": cam.get("camera"), "humanDetected": cam.get("humanDetected"),
+                 "confidence": round(float(cam.get("confidence") or 0.0), 2)}
+                for cam in detection.get("cameras", [])
+            ],
+        },
+    }
+    return snapshot_etag(stable)
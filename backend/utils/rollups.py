@@ -0,0 +1,210 @@
+"""
+Downsampled reading rollups
+Keeps 1-minute / 1-hour / 1-day buckets per node in readings_1m, readings_1h
+and readings_1d, updated as readings are stored:
+
+    {"nodeId": "main", "bucket": <bucket start, UTC>, "count": n, "lastAt": <ts>,
+     "percent": {"min": .., "max": .., "sum": .., "count": .., "last": ..}, ...}
+
+Rebuild from raw readings (e.g. after enabling rollups on an existing database):
+
+    python utils/rollups.py --rebuild
+"""
+
+import argparse
+import os
+import sys
+from datetime import datetime, timedelta
+from pymongo import ASCENDING, UpdateOne
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    from config import Config
+except ImportError:
+    Config = None
+
+FIELDS = ("percent", "distance", "temp", "humidity")
+DEFAULT_NODE = "main"
+
+# (name, bucket seconds), finest first
+TIERS = [("1m", 60), ("1h", 3600), ("1d", 86400)]
+TIER_SECONDS = dict(TIERS)
+
+# The device posts a reading every 2s; used to estimate raw point counts
+RAW_INTERVAL = 2
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def collection_name(tier):
+    return f"readings_{tier}"
+
+
+def bucket_start(ts, seconds):
+    offset = int((ts - EPOCH).total_seconds()) // seconds * seconds
+    return EPOCH + timedelta(seconds=offset)
+
+
+def pick_resolution(start, end, max_points):
+    """Finest resolution that keeps (end - start) within max_points."""
+    span = max((end - start).total_seconds(), 1)
+    if span / RAW_INTERVAL <= max_points:
+        return "raw"
+    for name, seconds in TIERS:
+        if span / seconds <= max_points:
+            return name
+    return TIERS[-1][0]
+
+
+def bucket_point(doc, fields):
+    """Rollup bucket document -> {"t", "count", <field>: {min, max, mean, last} or None}."""
+    point = {"t": doc["bucket"], "count": doc.get("count", 0)}
+    for field in fields:
+        f = doc.get(field)
+        if not f or not f.get("count"):
+            point[field] = None
+            continue
+        point[field] = {
+            "min": f.get("min"),
+            "max": f.get("max"),
+            "mean": round(f["sum"] / f["count"], 3),
+            "last": f.get("last"),
+        }
+    return point
+
+
+class Rollups:
+    """Incremental min/max/mean/last buckets; record() is called with each stored batch."""
+
+    def __init__(self, db, fields=FIELDS):
+        self.db = db
+        self.fields = fields
+
+    def record(self, docs):
+        """Fold a batch into every tier with one bulk upsert per tier."""
+        for name, ops in self.operations(docs):
+            self.db[name].bulk_write(ops, ordered=False)
+
+    def operations(self, docs):
+        """
+        [(collection name, [UpdateOne, ...])] folding `docs` into each tier, for
+        callers that issue the writes themselves (app_async.py with motor).
+        `last` follows the newest timestamp within a batch; batches are assumed
+        to arrive in time order, which holds for server-assigned timestamps.
+        """
+        result = []
+        if not docs:
+            return result
+        for tier, seconds in TIERS:
+            buckets = {}
+            for doc in docs:
+                ts = doc.get("timestamp")
+                if not isinstance(ts, datetime):
+                    continue
+                key = (doc.get("nodeId") or DEFAULT_NODE, bucket_start(ts, seconds))
+                agg = buckets.get(key)
+                if agg is None:
+                    agg = buckets[key] = {"count": 0, "lastAt": ts, "fields": {}}
+                agg["count"] += 1
+                newest = ts >= agg["lastAt"]
+                if newest:
+                    agg["lastAt"] = ts
+                for field in self.fields:
+                    value = doc.get(field)
+                    if isinstance(value, bool) or not isinstance(value, (int, float)):
+                        continue
+                    f = agg["fields"].get(field)
+                    if f is None:
+                        agg["fields"][field] = {"min": value, "max": value, "sum": value, "count": 1, "last": value}
+                        continue
+                    f["min"] = min(f["min"], value)
+                    f["max"] = max(f["max"], value)
+                    f["sum"] += value
+                    f["count"] += 1
+                    if newest:
+                        f["last"] = value
+
+            ops = [self._upsert(node, bucket, agg) for (node, bucket), agg in buckets.items()]
+            if ops:
+                result.append((collection_name(tier), ops))
+        return result
+
+    def _upsert(self, node, bucket, agg):
+        update = {
+            "$inc": {"count": agg["count"]},
+            "$max": {"lastAt": agg["lastAt"]},
+            "$set": {},
+            "$min": {},
+        }
+        for field, f in agg["fields"].items():
+            update["$min"][f"{field}.min"] = f["min"]
+            update["$max"][f"{field}.max"] = f["max"]
+            update["$inc"][f"{field}.sum"] = f["sum"]
+            update["$inc"][f"{field}.count"] = f["count"]
+            update["$set"][f"{field}.last"] = f["last"]
+        return UpdateOne({"nodeId": node, "bucket": bucket}, {k: v for k, v in update.items() if v}, upsert=True)
+
+    def series(self, tier, start, end, node=DEFAULT_NODE, fields=None, limit=None):
+        """Buckets in [start, end] oldest first, as {"t", "count", <field>: {min, max, mean, last}}."""
+        fields = fields or self.fields
+        name, query, projection = self.series_query(tier, start, end, node, fields)
+        cursor = self.db[name].find(query, projection, sort=[("bucket", ASCENDING)], limit=limit or 0)
+        for doc in cursor:
+            yield bucket_point(doc, fields)
+
+    def series_query(self, tier, start, end, node=DEFAULT_NODE, fields=None):
+        """(collection name, filter, projection) behind series(), sorted by bucket ascending."""
+        fields = fields or self.fields
+        projection = {"_id": 0, "bucket": 1, "count": 1, **{f: 1 for f in fields}}
+        query = {"nodeId": node, "bucket": {"$gte": bucket_start(start, TIER_SECONDS[tier]), "$lte": end}}
+        return collection_name(tier), query, projection
+
+    def rebuild(self, readings_col, batch_size=5000, since=None):
+        query = {"timestamp": {"$gte": since}} if since else {}
+        for tier, _ in TIERS:
+            if since:
+                self.db[collection_name(tier)].delete_many({"bucket": {"$gte": bucket_start(since, TIER_SECONDS[tier])}})
+            else:
+                self.db[collection_name(tier)].delete_many({})
+
+        projection = {"_id": 0, "timestamp": 1, "nodeId": 1, **{f: 1 for f in self.fields}}
+        batch = []
+        folded = 0
+        for doc in readings_col.find(query, projection, sort=[("timestamp", ASCENDING)], batch_size=batch_size):
+            batch.append(doc)
+            if len(batch) >= batch_size:
+                self.record(batch)
+                folded += len(batch)
+                batch = []
+                print(f"  folded {folded} readings...")
+        if batch:
+            self.record(batch)
+            folded += len(batch)
+        return folded
+
+
+def main():
+    from utils.db import get_db
+
+    parser = argparse.ArgumentParser(description="Rebuild Smart Dam reading rollups from raw readings")
+    parser.add_argument("--rebuild", action="store_true")
+    parser.add_argument("--days", type=float, help="only rebuild the most recent N days")
+    args = parser.parse_args()
+
+    db = get_db()
+    if not args.rebuild:
+        for tier, _ in TIERS:
+            print(f"  {collection_name(tier)}: {db[collection_name(tier)].estimated_document_count()} buckets")
+        return
+
+    since = None
+    if args.days:
+        # Align to a day so no tier ends up with a half-rebuilt bucket
+        since = bucket_start(datetime.utcnow() - timedelta(days=args.days), TIER_SECONDS["1d"])
+    folded = Rollups(db).rebuild(db["readings"], since=since)
+    print(f"✓ Rebuilt rollups from {folded} readings")
+
+
+if __name__ == "__main__":
+    main()
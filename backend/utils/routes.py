@@ -0,0 +1,173 @@
+"""
+Request handling shared by app.py (Flask) and app_async.py (Quart)
+Everything a route does apart from I/O: parsing and validating arguments,
+building the documents it writes and the bodies it returns. The two apps only
+differ in how they reach MongoDB and the weather API, so each route there is
+parse -> query / write -> respond, with the parse and respond steps from here.
+
+A malformed or refused request raises RouteError; both apps turn it into a
+JSON response with the given status and headers.
+"""
+
+import time
+from datetime import datetime, timedelta
+from utils.queries import page_query, parse_ts
+from utils.responses import nice_ts
+from utils.rollups import DEFAULT_NODE, FIELDS as ROLLUP_FIELDS, TIER_SECONDS, pick_resolution
+
+ADMIN_ONLY = {"success": False, "error": "Admin only"}
+
+
+class RouteError(Exception):
+    def __init__(self, body, status=400, headers=None):
+        super().__init__(body.get("error"))
+        self.body = body
+        self.status = status
+        self.headers = headers or {}
+
+
+def require_admin(role):
+    if (role or "user") != "admin":
+        raise RouteError(ADMIN_ONLY, 403)
+
+
+def retry_later(error, status, retry_after, **body):
+    """RouteError for a request refused for capacity (429 / 503), with Retry-After."""
+    return RouteError({**body, "error": error}, status, {"Retry-After": str(max(1, int(retry_after)))})
+
+
+def page_args(args, base=None, default_limit=500, max_limit=5000):
+    """page_query() with malformed input as a 400."""
+    try:
+        return page_query(args, base, default_limit, max_limit)
+    except ValueError as e:
+        raise RouteError({"error": str(e)})
+
+
+def series_args(args, max_points):
+    """/api/readings/series arguments -> (start, end, resolution, node, fields)."""
+    try:
+        end = parse_ts(args.get("to")) or datetime.utcnow()
+        start = parse_ts(args.get("from")) or end - timedelta(days=1)
+    except ValueError as e:
+        raise RouteError({"error": str(e)})
+    if start >= end:
+        raise RouteError({"error": "from must be before to"})
+
+    resolution = args.get("resolution", "auto")
+    if resolution == "auto":
+        resolution = pick_resolution(start, end, max_points)
+    elif resolution != "raw" and resolution not in TIER_SECONDS:
+        raise RouteError({"error": f"resolution must be auto, raw or one of {', '.join(TIER_SECONDS)}"})
+
+    node = args.get("node", DEFAULT_NODE)
+    fields = [f for f in args.get("fields", "").split(",") if f in ROLLUP_FIELDS] or list(ROLLUP_FIELDS)
+    return start, end, resolution, node, fields
+
+
+def raw_series_find(start, end, node, fields):
+    """(filter, projection) for resolution=raw."""
+    # Raw readings from the single ESP32 carry no nodeId
+    query = {"nodeId": {"$in": [node, None]} if node == DEFAULT_NODE else node, "timestamp": {"$gte": start, "$lte": end}}
+    return query, {"_id": 0, "timestamp": 1, **{f: 1 for f in fields}}
+
+
+def reading_batch(data, max_readings):
+    """POST /api/readings/batch body -> reading documents stamped with the receive time."""
+    docs = data.get("readings") if isinstance(data, dict) else data
+    if not isinstance(docs, list) or not all(isinstance(d, dict) for d in docs):
+        raise RouteError({"success": False, "error": "Expected a JSON array of readings"})
+    if len(docs) > max_readings:
+        raise RouteError({"success": False, "error": f"At most {max_readings} readings per batch"}, 413)
+    now = datetime.utcnow()
+    for d in docs:
+        d["timestamp"] = now
+    return docs
+
+
+def inserted_body(inserted, total):
+    """(body, status) once a batch has been stored; readings store_readings() rejected make it a 422."""
+    if inserted < total:
+        return {"success": False, "inserted": inserted, "error": f"{total - inserted} readings rejected"}, 422
+    return {"success": True, "inserted": inserted}, 201
+
+
+def stamped(data, **fields):
+    """Request body as a document: `fields` plus the receive time."""
+    data = data if isinstance(data, dict) else {}
+    data.update(fields, timestamp=datetime.utcnow())
+    return data
+
+
+def valve_control_update(data):
+    """POST /api/valve/control body -> the valve_control $set (admins only)."""
+    data = data or {}
+    require_admin(data.get("userRole"))
+    return {
+        "mode": data.get("mode", "AUTO"),
+        "manualCommand": data.get("command", "NONE"),
+        "updatedAt": datetime.utcnow(),
+        "updatedBy": data.get("userId", "unknown")
+    }
+
+
+def model_reload_args(data):
+    """POST /api/admin/models/reload body -> version to activate first, or None (admins only)."""
+    data = data or {}
+    require_admin(data.get("userRole"))
+    return data.get("version") or None
+
+
+def reload_error(e):
+    """RouteError for a failed activate / reload: an unknown version is a 404."""
+    if isinstance(e, KeyError):
+        return RouteError({"success": False, "error": str(e.args[0])}, 404)
+    return RouteError({"success": False, "error": str(e)}, 500)
+
+
+def reload_body(reloaded, reloader):
+    return {"success": True, "reloaded": reloaded, "loaded": reloader.current_version(), "seconds": reloader.last_seconds}
+
+
+def sync_wait(args, max_wait):
+    """?wait= of /api/device/sync, clamped to [0, max_wait]."""
+    try:
+        return min(max(float(args.get("wait", 0)), 0.0), max_wait)
+    except ValueError:
+        raise RouteError({"error": "wait must be a number"})
+
+
+def snapshot_limit(args, max_readings):
+    """?readings= of /api/dashboard, clamped to [1, max_readings]."""
+    try:
+        return min(max(int(args.get("readings", 20)), 1), max_readings)
+    except ValueError:
+        raise RouteError({"error": "readings must be an integer"})
+
+
+def prediction_docs(percent, rain_label, model_input):
+    """(rainfall_predictions $set, rainfall_prediction alert, /api/rainfall body) for a fresh prediction."""
+    now = datetime.utcnow()
+    prediction = {"percent": float(percent), "rainLabel": rain_label, "timestamp": now, "input_data": model_input}
+    alert = {"type": "rainfall_prediction", "percent": float(percent), "rainLabel": rain_label, "timestamp": now}
+    return prediction, alert, {"percent": float(percent), "rainLabel": rain_label, "timestamp": nice_ts(now)}
+
+
+def prediction_key(cache, reading, weather):
+    # Same reading + same (quantized) weather -> reuse the last result and skip the writes
+    return cache.make_key(reading["_id"], {"Wind_Speed": weather["windspeed"], "Cloud_Cover": weather["cloud"]})
+
+
+class Every:
+    """due() is True at most once per `interval` seconds (the first call included)."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._last = None
+
+    def due(self):
+        now = time.monotonic()
+        if self._last is not None and now - self._last < self.interval:
+            return False
+        self._last = now
+        return True
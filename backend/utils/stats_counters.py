@@ -0,0 +1,163 @@
+import asyncio
+import threading
+import time
+from datetime import datetime, timedelta
+
+COUNTERS_ID = "dashboard"
+
+
+def _usable_type(alert_type):
+    # Non-empty, and usable as a field name under "alerts."
+    return isinstance(alert_type, str) and bool(alert_type) and "." not in alert_type and not alert_type.startswith("$")
+
+
+def alert_increments(alert_type, n=1):
+    inc = {"totalAlerts": n}
+    if _usable_type(alert_type):
+        inc[f"alerts.{alert_type}"] = n
+    return inc
+
+
+def summarize(doc):
+    """Counters document -> the "statistics" object the dashboard expects."""
+    doc = doc or {}
+    alerts = doc.get("alerts", {})
+    return {
+        "totalReadings": doc.get("totalReadings", 0),
+        "totalAlerts": doc.get("totalAlerts", 0),
+        "vibrationAlerts": alerts.get("vibration", 0),
+        "waterLevelAlerts": alerts.get("waterlevel", 0),
+        "humanDetectionAlerts": alerts.get("human", 0),
+    }
+
+
+def _lease_filter(interval):
+    # Lease on reconciledAt so only one worker recounts per interval
+    cutoff = datetime.utcnow() - timedelta(seconds=interval)
+    return {"_id": COUNTERS_ID, "$or": [{"reconciledAt": {"$lt": cutoff}}, {"reconciledAt": {"$exists": False}}]}
+
+
+class StatsCounters:
+    """
+    Running totals for /api/dashboard/stats kept in one document:
+        {"_id": "dashboard", "totalReadings": n, "totalAlerts": n, "alerts": {<type>: n}}
+    Write paths $inc it; reconcile() recomputes exact counts from the collections.
+    """
+
+    def __init__(self, collection):
+        self.col = collection
+        self._thread = None
+
+    def record_readings(self, n=1):
+        if n:
+            self._inc({"totalReadings": n})
+
+    def record_alert(self, alert_type, n=1):
+        self._inc(alert_increments(alert_type, n))
+
+    def read(self, readings_col=None, alerts_col=None):
+        doc = self.col.find_one({"_id": COUNTERS_ID})
+        if doc is None and readings_col is not None and alerts_col is not None:
+            doc = self.reconcile(readings_col, alerts_col)
+        return summarize(doc)
+
+    def reconcile(self, readings_col, alerts_col):
+        per_type = {
+            row["_id"]: row["count"]
+            for row in alerts_col.aggregate([{"$group": {"_id": "$type", "count": {"$sum": 1}}}])
+            if _usable_type(row["_id"])
+        }
+        doc = {
+            "totalReadings": readings_col.count_documents({}),
+            "totalAlerts": alerts_col.count_documents({}),
+            "alerts": per_type,
+            "reconciledAt": datetime.utcnow(),
+        }
+        self.col.update_one({"_id": COUNTERS_ID}, {"$set": doc}, upsert=True)
+        return doc
+
+    def start_reconciler(self, readings_col, alerts_col, interval=300):
+        if self._thread is not None and self._thread.is_alive():
+            return False
+        self._thread = threading.Thread(
+            target=self._reconcile_loop,
+            args=(readings_col, alerts_col, interval),
+            name="stats-reconcile",
+            daemon=True
+        )
+        self._thread.start()
+        return True
+
+    def _reconcile_loop(self, readings_col, alerts_col, interval):
+        while True:
+            try:
+                claimed = self.col.find_one_and_update(_lease_filter(interval), {"$set": {"reconciledAt": datetime.utcnow()}})
+                if claimed is not None or self.col.find_one({"_id": COUNTERS_ID}) is None:
+                    self.reconcile(readings_col, alerts_col)
+            except Exception as e:
+                print(f"⚠️ Stats reconcile failed: {e}")
+            time.sleep(interval)
+
+    def _inc(self, inc):
+        try:
+            self.col.update_one({"_id": COUNTERS_ID}, {"$inc": inc}, upsert=True)
+        except Exception as e:
+            print(f"⚠️ Stats counter update failed: {e}")
+
+
+class AsyncStatsCounters:
+    """StatsCounters over motor collections for app_async.py; same document, same lease."""
+
+    def __init__(self, collection):
+        self.col = collection
+        self._task = None
+
+    async def record_readings(self, n=1):
+        if n:
+            await self._inc({"totalReadings": n})
+
+    async def record_alert(self, alert_type, n=1):
+        await self._inc(alert_increments(alert_type, n))
+
+    async def read(self, readings_col=None, alerts_col=None):
+        doc = await self.col.find_one({"_id": COUNTERS_ID})
+        if doc is None and readings_col is not None and alerts_col is not None:
+            doc = await self.reconcile(readings_col, alerts_col)
+        return summarize(doc)
+
+    async def reconcile(self, readings_col, alerts_col):
+        rows, total_readings, total_alerts = await asyncio.gather(
+            alerts_col.aggregate([{"$group": {"_id": "$type", "count": {"$sum": 1}}}]).to_list(None),
+            readings_col.count_documents({}),
+            alerts_col.count_documents({}),
+        )
+        doc = {
+            "totalReadings": total_readings,
+            "totalAlerts": total_alerts,
+            "alerts": {row["_id"]: row["count"] for row in rows if _usable_type(row["_id"])},
+            "reconciledAt": datetime.utcnow(),
+        }
+        await self.col.update_one({"_id": COUNTERS_ID}, {"$set": doc}, upsert=True)
+        return doc
+
+    def start_reconciler(self, readings_col, alerts_col, interval=300):
+        if self._task is not None and not self._task.done():
+            return False
+        self._task = asyncio.get_running_loop().create_task(self._reconcile_loop(readings_col, alerts_col, interval))
+        return True
+
+    async def _reconcile_loop(self, readings_col, alerts_col, interval):
+        while True:
+            try:
+                claimed = await self.col.find_one_and_update(_lease_filter(interval), {"$set": {"reconciledAt": datetime.utcnow()}})
+                if claimed is not None or await self.col.find_one({"_id": COUNTERS_ID}) is None:
+                    await self.reconcile(readings_col, alerts_col)
+            except Exception as e:
+                print(f"⚠️ Stats reconcile failed: {e}")
+            await asyncio.sleep(interval)
+
+    async def _inc(self, inc):
+        try:
+            await self.col.update_one({"_id": COUNTERS_ID}, {"$inc": inc}, upsert=True)
+        except Exception as e:
+            print(f"⚠️ Stats counter update failed: {e}")
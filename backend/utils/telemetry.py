@@ -0,0 +1,143 @@
+"""
+Binary telemetry frames (POST /api/readings/frame)
+A fixed little-endian layout for batches of ESP32 readings, versioned so the
+record can grow without breaking deployed devices:
+
+    header   magic "SD" | version u8 | flags u8 | count u16 | node id length u8 | node id (utf-8)
+    records  count x record layout of `version`
+    trailer  CRC-32 u32 of everything before it
+
+Version 1 record, 18 bytes (JSON equivalent ~230 bytes):
+
+    age_ms            u32   milliseconds between the reading and sending the frame
+    temp              i16   0.01 degC
+    humidity          u16   0.01 %
+    distance          u16   0.01 cm
+    percent           u16   0.01 %
+    rain_prediction   u16   0.01 %
+    human_confidence  u16   1/10000
+    bits              u8    1 vibration, 2 valve open, 4 human detected
+    (pad)             u8
+
+0x7FFF (i16) / 0xFFFF (u16) mean "no value" (e.g. a failed DHT read). Decoded
+documents use the same field names as the JSON readings.
+"""
+
+import struct
+import zlib
+from datetime import datetime, timedelta
+
+MAGIC = b"SD"
+HEADER = struct.Struct("<2sBBHB")
+TRAILER = struct.Struct("<I")
+MAX_NODE_ID = 32
+
+VIBRATION, VALVE_OPEN, HUMAN_DETECTED = 1, 2, 4
+
+I16_NONE = 0x7FFF
+U16_NONE = 0xFFFF
+
+
+class FrameError(ValueError):
+    pass
+
+
+def _pack_scaled(value, missing, scale, lo, hi):
+    if value is None:
+        return missing
+    return max(lo, min(hi, int(round(float(value) * scale))))
+
+
+def _decode_v1(record, body, received_at, node_id):
+    # One flat loop with locals only: this runs per reading on the ingest path
+    i16_none, u16_none, delta = I16_NONE, U16_NONE, timedelta
+    docs = []
+    append = docs.append
+    for age_ms, temp, humidity, distance, percent, rain, confidence, bits in record.iter_unpack(body):
+        doc = {
+            "temp": None if temp == i16_none else temp / 100,
+            "humidity": None if humidity == u16_none else humidity / 100,
+            "distance": None if distance == u16_none else distance / 100,
+            "percent": None if percent == u16_none else percent / 100,
+            "rain_prediction": None if rain == u16_none else rain / 100,
+            "vibration": bits & 1 == 1,
+            "valve_state": "OPEN" if bits & 2 else "CLOSED",
+            "human_detected": bits & 4 == 4,
+            "human_confidence": None if confidence == u16_none else confidence / 10000,
+            "timestamp": received_at - delta(milliseconds=age_ms) if age_ms else received_at,
+        }
+        if node_id:
+            doc["nodeId"] = node_id
+        append(doc)
+    return docs
+
+
+def _encode_v1(reading, age_ms):
+    bits = (
+        (VIBRATION if reading.get("vibration") else 0)
+        | (VALVE_OPEN if reading.get("valve_state") == "OPEN" else 0)
+        | (HUMAN_DETECTED if reading.get("human_detected") else 0)
+    )
+    return (
+        max(0, min(0xFFFFFFFF, int(age_ms))),
+        _pack_scaled(reading.get("temp"), I16_NONE, 100, -32768, I16_NONE - 1),
+        _pack_scaled(reading.get("humidity"), U16_NONE, 100, 0, U16_NONE - 1),
+        _pack_scaled(reading.get("distance"), U16_NONE, 100, 0, U16_NONE - 1),
+        _pack_scaled(reading.get("percent"), U16_NONE, 100, 0, U16_NONE - 1),
+        _pack_scaled(reading.get("rain_prediction"), U16_NONE, 100, 0, U16_NONE - 1),
+        _pack_scaled(reading.get("human_confidence"), U16_NONE, 10000, 0, U16_NONE - 1),
+        bits,
+    )
+
+
+# version -> (record layout, decode(layout, records, received_at, node_id) -> docs, encode(reading, age_ms) -> fields)
+LAYOUTS = {
+    1: (struct.Struct("<IhHHHHHBx"), _decode_v1, _encode_v1),
+}
+LATEST_VERSION = max(LAYOUTS)
+
+
+def decode_frame(data, received_at=None, max_records=None):
+    """
+    Validate a frame and return reading documents stamped with
+    received_at - age. Raises FrameError describing the first problem found.
+    """
+    if len(data) < HEADER.size + TRAILER.size:
+        raise FrameError("frame too short")
+    (crc,) = TRAILER.unpack_from(data, len(data) - TRAILER.size)
+    if zlib.crc32(memoryview(data)[:-TRAILER.size]) != crc:
+        raise FrameError("checksum mismatch")
+
+    magic, version, _flags, count, node_len = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise FrameError("not a telemetry frame")
+    if version not in LAYOUTS:
+        raise FrameError(f"unsupported frame version {version}")
+    if max_records is not None and count > max_records:
+        raise FrameError(f"at most {max_records} readings per frame")
+    if node_len > MAX_NODE_ID:
+        raise FrameError("node id too long")
+
+    record, decode, _ = LAYOUTS[version]
+    offset = HEADER.size + node_len
+    if len(data) != offset + count * record.size + TRAILER.size:
+        raise FrameError(f"expected {count} records of {record.size} bytes")
+    try:
+        node_id = bytes(data[HEADER.size:offset]).decode("utf-8") or None
+    except UnicodeDecodeError:
+        raise FrameError("node id is not utf-8")
+
+    return decode(record, memoryview(data)[offset:len(data) - TRAILER.size], received_at or datetime.utcnow(), node_id)
+
+
+def encode_frame(readings, node_id=None, version=LATEST_VERSION, ages_ms=None):
+    """Frame for `readings` (dicts with the JSON field names); used by the device simulator."""
+    record, _, encode = LAYOUTS[version]
+    node = (node_id or "").encode("utf-8")
+    if len(node) > MAX_NODE_ID:
+        raise FrameError("node id too long")
+    ages_ms = ages_ms or [0] * len(readings)
+    parts = [HEADER.pack(MAGIC, version, 0, len(readings), len(node)), node]
+    parts.extend(record.pack(*encode(r, age)) for r, age in zip(readings, ages_ms))
+    frame = b"".join(parts)
+    return frame + TRAILER.pack(zlib.crc32(frame))
@@ -1,125 +1,393 @@
 """
 Train Rainfall Prediction Model
-Based on your dataset columns: Temperature, Humidity, Wind_Speed, Cloud_Cover, Pressure, Rain
+Cross-validated RandomForest search over the weather CSV (Temperature, Humidity,
+Wind_Speed, Cloud_Cover, Pressure, Rain) and, optionally, the readings the dam
+has collected joined with archived weather (utils/weather_history.py).
+
+Usage (from backend/):
+    python utils/train_rainfall_model.py                          # CSV, grid search on all cores
+    python utils/train_rainfall_model.py --mongo --since 2024-06-01
+    python utils/train_rainfall_model.py --n-iter 20 --activate
+
+Each run writes models/registry/<version>/ with model.pkl, rainfall_forest.npz
+and metadata.json (data, search results, holdout metrics, training time and
+inference latency) and adds it to the registry manifest (utils/model_registry.py).
+--activate makes it the served version; running backends hot-reload it.
+--install also copies the model to MODEL_PATH / FOREST_PATH.
+
+Parsed feature matrices are cached as .npy files under models/cache and
+memory-mapped on the next run; a day of Mongo readings is cached once the day
+is over and its weather is archived.
 """
 
+import argparse
+import hashlib
+import json
 import os
-import pandas as pd
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
 import joblib
-from sklearn.model_selection import train_test_split
+import numpy as np
+import pandas as pd
+import sklearn
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.preprocessing import LabelEncoder
-from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
+from sklearn.metrics import accuracy_score, classification_report, confusion_matrix, f1_score, roc_auc_score
+from sklearn.model_selection import GridSearchCV, RandomizedSearchCV, StratifiedKFold, train_test_split
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.forest_engine import FlatForest, export_forest
+from utils.model_registry import ModelRegistry
+from utils.responses import PRESSURE
+from utils.weather_history import RAIN_MM, ensure_history, floor_hour, load_hours
+
+try:
+    from config import Config
+except ImportError:
+    Config = None
 
-# --------------------------------------------------
-# Resolve paths safely
-# --------------------------------------------------
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 CSV_PATH = os.path.join(BASE_DIR, 'weather_forecast_data.csv')
-MODEL_PATH = os.path.join(BASE_DIR, '..', 'models', 'rainfall_model.pkl')
-
-# Load dataset
-print("Loading dataset...")
-df = pd.read_csv(CSV_PATH)
-
-
-print(f"Dataset shape: {df.shape}")
-print(f"\nColumns: {df.columns.tolist()}")
-print(f"\nFirst few rows:")
-print(df.head())
-
-# Check class distribution
-print(f"\nTarget distribution:")
-print(df['Rain'].value_counts())
-
-# Prepare features and target
-X = df[['Temperature', 'Humidity', 'Wind_Speed', 'Cloud_Cover', 'Pressure']]
-y = df['Rain']
-
-# Encode target: 'rain' -> 1, 'no rain' -> 0
-le = LabelEncoder()
-y_encoded = le.fit_transform(y)
-
-print(f"\nFeature columns: {X.columns.tolist()}")
-print(f"Target classes: {le.classes_}")
-
-# Split data
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y_encoded, test_size=0.2, random_state=42, stratify=y_encoded
-)
-
-print(f"\nTraining set: {X_train.shape[0]} samples")
-print(f"Test set: {X_test.shape[0]} samples")
-
-# Train Random Forest model
-print("\nTraining Random Forest Classifier...")
-model = RandomForestClassifier(
-    n_estimators=100,
-    max_depth=10,
-    min_samples_split=5,
-    min_samples_leaf=2,
-    random_state=42,
-    class_weight='balanced'  # Handle imbalanced data
-)
-
-model.fit(X_train, y_train)
-
-# Evaluate
-y_pred = model.predict(X_test)
-accuracy = accuracy_score(y_test, y_pred)
-
-print(f"\n{'='*60}")
-print(f"MODEL EVALUATION")
-print(f"{'='*60}")
-print(f"Accuracy: {accuracy:.2%}")
-print(f"\nClassification Report:")
-print(classification_report(y_test, y_pred, target_names=le.classes_))
-print(f"\nConfusion Matrix:")
-print(confusion_matrix(y_test, y_pred))
-
-# Feature importance
-feature_importance = pd.DataFrame({
-    'feature': X.columns,
-    'importance': model.feature_importances_
-}).sort_values('importance', ascending=False)
-
-print(f"\nFeature Importance:")
-print(feature_importance)
-
-# --------------------------------------------------
-# Save model safely
-# --------------------------------------------------
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-MODEL_DIR = os.path.join(BASE_DIR, '..', 'models')
-MODEL_PATH = os.path.join(MODEL_DIR, 'rainfall_model.pkl')
-
-# Create models directory if not exists
-os.makedirs(MODEL_DIR, exist_ok=True)
-
-joblib.dump(model, MODEL_PATH)
-print(f"\n✓ Model saved to: {MODEL_PATH}")
-
-# Test prediction
-print(f"\n{'='*60}")
-print(f"TEST PREDICTION")
-print(f"{'='*60}")
-
-# Sample test case
-test_sample = pd.DataFrame([{
-    'Temperature': 23.72,
-    'Humidity': 89.59,
-    'Wind_Speed': 1.34,
-    'Cloud_Cover': 50.50,
-    'Pressure': 1032.38
-}])
-
-prediction = model.predict(test_sample)
-probability = model.predict_proba(test_sample)
-
-print(f"Test input: {test_sample.to_dict('records')[0]}")
-print(f"Prediction: {le.classes_[prediction[0]]}")
-print(f"Probability: {probability[0][1]*100:.1f}% chance of rain")
-
-print(f"\n{'='*60}")
-print(f"Model is ready to use!")
-print(f"{'='*60}")
+MODELS_DIR = os.path.join(BASE_DIR, '..', 'models')
+MODEL_PATH = os.path.join(MODELS_DIR, 'rainfall_model.pkl')
+FOREST_PATH = os.path.join(MODELS_DIR, 'rainfall_forest.npz')
+REGISTRY_DIR = os.path.join(MODELS_DIR, 'registry')
+CACHE_DIR = os.path.join(MODELS_DIR, 'cache')
+
+FEATURES = ['Temperature', 'Humidity', 'Wind_Speed', 'Cloud_Cover', 'Pressure']
+TARGET = 'Rain'
+CACHE_FORMAT = 1  # bump when feature extraction changes
+
+PARAM_GRID = {
+    "n_estimators": [100, 200],
+    "max_depth": [8, 10, 14, None],
+    "min_samples_split": [2, 5],
+    "min_samples_leaf": [1, 2, 4],
+}
+SCORING = {"roc_auc": "roc_auc", "accuracy": "accuracy", "f1": "f1"}
+
+
+def _digest(*parts):
+    return hashlib.sha1(json.dumps(parts, default=str).encode()).hexdigest()[:16]
+
+
+class FeatureCache:
+    """(X, y) pairs stored as .npy files and memory-mapped when read back."""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def _paths(self, key):
+        return os.path.join(self.directory, f"{key}.X.npy"), os.path.join(self.directory, f"{key}.y.npy")
+
+    def get(self, key):
+        x_path, y_path = self._paths(key)
+        if not (os.path.exists(x_path) and os.path.exists(y_path)):
+            return None
+        return np.load(x_path, mmap_mode="r"), np.load(y_path, mmap_mode="r")
+
+    def put(self, key, X, y):
+        os.makedirs(self.directory, exist_ok=True)
+        # y is written last and get() needs both, so an interrupted put is a miss
+        for path, array in zip(self._paths(key), (X, y)):
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                np.save(f, array)
+            os.replace(tmp, path)
+        return self.get(key)
+
+
+def csv_matrix(path=CSV_PATH, cache=None):
+    """(X, y) from the training CSV; y is 1 for "rain"."""
+    stat = os.stat(path)
+    key = "csv-" + _digest(os.path.abspath(path), stat.st_size, stat.st_mtime_ns, FEATURES, CACHE_FORMAT)
+    cached = cache.get(key) if cache else None
+    if cached is not None:
+        return cached
+
+    df = pd.read_csv(path)
+    X = df[FEATURES].to_numpy(dtype=np.float64)
+    y = (df[TARGET].str.strip().str.lower() == "rain").to_numpy(dtype=np.int8)
+    return cache.put(key, X, y) if cache else (X, y)
+
+
+def readings_hours(col, start, end, batch_size=5000):
+    """Mean (temp, humidity) per (node, hour) of the readings in [start, end), streamed in batches."""
+    sums = {}
+    cursor = col.find({"timestamp": {"$gte": start, "$lt": end}},
+                      {"_id": 0, "timestamp": 1, "temp": 1, "humidity": 1, "nodeId": 1}, batch_size=batch_size)
+    for doc in cursor:
+        temp, humidity = doc.get("temp"), doc.get("humidity")
+        if temp is None or humidity is None:
+            continue
+        key = (doc.get("nodeId") or "", floor_hour(doc["timestamp"]))
+        s = sums.get(key)
+        if s is None:
+            sums[key] = [temp, humidity, 1]
+        else:
+            s[0] += temp
+            s[1] += humidity
+            s[2] += 1
+    return {key: (t / n, h / n) for key, (t, h, n) in sums.items()}
+
+
+def hourly_rows(hours, weather):
+    """Feature rows for sensor hours that have archived weather, labelled by that hour's precipitation."""
+    X, y = [], []
+    for (_, hour), (temp, humidity) in sorted(hours.items()):
+        w = weather.get(hour)
+        if not w:
+            continue
+        # Pressure is fixed at serving time (utils/responses.py), so train on the same value
+        X.append([temp, humidity, w["windspeed"], w["cloud"], PRESSURE])
+        y.append(w["precipitation"] >= RAIN_MM)
+    return np.array(X, dtype=np.float64).reshape(-1, len(FEATURES)), np.array(y, dtype=np.int8)
+
+
+def mongo_matrix(db, start, end, cache=None, batch_size=5000):
+    """
+    (X, y) from the readings collection: one row per node and hour with the
+    hour's mean sensor temperature and humidity plus archived wind and cloud
+    cover. Queried a day at a time, so memory stays at one day of hours.
+    """
+    weather_col = db['weather_history']
+    now = datetime.utcnow()
+    day = floor_hour(start).replace(hour=0)
+    parts_X, parts_y = [], []
+    while day < end:
+        day_end = day + timedelta(days=1)
+        lo, hi = max(day, start), min(day_end, end)
+        key = "mongo-" + _digest(db.name, lo, hi, RAIN_MM, PRESSURE, FEATURES, CACHE_FORMAT)
+        cached = cache.get(key) if cache else None
+        if cached is None:
+            weather = load_hours(weather_col, lo, hi)
+            X, y = hourly_rows(readings_hours(db['readings'], lo, hi, batch_size=batch_size), weather)
+            # Only a finished day with all of its weather archived can't change any more
+            if cache and hi <= now and len(weather) == int((hi - lo).total_seconds() // 3600):
+                X, y = cache.put(key, X, y)
+        else:
+            X, y = cached
+        parts_X.append(X)
+        parts_y.append(y)
+        day = day_end
+    if not parts_X:
+        return np.empty((0, len(FEATURES))), np.empty(0, dtype=np.int8)
+    return np.concatenate(parts_X), np.concatenate(parts_y)
+
+
+def search(X, y, n_jobs=-1, folds=5, n_iter=0, random_state=42, verbose=1):
+    """
+    Grid (or, with n_iter, randomized) search refit on the best ROC AUC. Candidates x folds
+    are spread over n_jobs processes; each forest stays single-threaded so cores aren't
+    oversubscribed, and that's also the setting it is served with.
+    """
+    estimator = RandomForestClassifier(class_weight="balanced", random_state=random_state, n_jobs=1)
+    cv = StratifiedKFold(n_splits=folds, shuffle=True, random_state=random_state)
+    candidates = int(np.prod([len(v) for v in PARAM_GRID.values()]))
+    if n_iter and n_iter < candidates:
+        s = RandomizedSearchCV(estimator, PARAM_GRID, n_iter=n_iter, scoring=SCORING, refit="roc_auc", cv=cv,
+                               n_jobs=n_jobs, random_state=random_state, verbose=verbose)
+    else:
+        s = GridSearchCV(estimator, PARAM_GRID, scoring=SCORING, refit="roc_auc", cv=cv, n_jobs=n_jobs, verbose=verbose)
+    return s.fit(X, y)
+
+
+def evaluate(model, X, y):
+    proba = model.predict_proba(X)[:, 1]
+    pred = model.predict(X)
+    return {
+        "rows": int(len(y)),
+        "accuracy": float(accuracy_score(y, pred)),
+        "f1": float(f1_score(y, pred)),
+        "roc_auc": float(roc_auc_score(y, proba)),
+        "confusion_matrix": confusion_matrix(y, pred).tolist(),
+    }
+
+
+def inference_latency(model, X, repeats=300, batch=1000):
+    """Single-row latency as /api/rainfall sees it (µs) and batch throughput (rows/sec)."""
+    rows = np.ascontiguousarray(X[:max(repeats, batch)], dtype=np.float64)
+    model.predict_proba(rows[:1])
+    times = []
+    for i in range(repeats):
+        row = rows[i % len(rows)][np.newaxis, :]
+        started = time.perf_counter()
+        model.predict_proba(row)
+        times.append(time.perf_counter() - started)
+    batch_rows = np.resize(rows, (batch, rows.shape[1]))
+    started = time.perf_counter()
+    model.predict_proba(batch_rows)
+    batch_seconds = time.perf_counter() - started
+    return {
+        "single_p50_us": float(np.percentile(times, 50) * 1e6),
+        "single_p99_us": float(np.percentile(times, 99) * 1e6),
+        "batch_rows_per_sec": float(batch / batch_seconds),
+    }
+
+
+def new_version():
+    return datetime.utcnow().strftime("%Y%m%d-%H%M%S")
+
+
+def save_artifact(model, metadata, registry=REGISTRY_DIR):
+    """Write <registry>/<version>/ under a temporary name and rename it into place."""
+    final = os.path.join(registry, metadata["version"])
+    staging = final + ".partial"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    joblib.dump(model, os.path.join(staging, "model.pkl"))
+    export_forest(model, os.path.join(staging, "rainfall_forest.npz"), feature_names=FEATURES)
+    with open(os.path.join(staging, "metadata.json"), "w") as f:
+        json.dump(metadata, f, indent=2, default=str)
+    os.rename(staging, final)
+    return final
+
+
+def install(artifact, model_path=MODEL_PATH, forest_path=FOREST_PATH):
+    """Copy an artifact over the paths RainfallPredictor loads (forest last, so it isn't older than the pickle)."""
+    for name, dest in (("model.pkl", model_path), ("rainfall_forest.npz", forest_path)):
+        tmp = f"{dest}.{os.getpid()}.tmp"
+        shutil.copyfile(os.path.join(artifact, name), tmp)
+        os.replace(tmp, dest)
+
+
+def train(X, y, sources, n_jobs=-1, folds=5, n_iter=0, test_size=0.2, random_state=42, registry=REGISTRY_DIR):
+    """Search, evaluate on a stratified holdout and save a versioned artifact; returns (path, metadata)."""
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=test_size, random_state=random_state, stratify=y)
+    print(f"\nTraining set: {X_train.shape[0]} samples")
+    print(f"Test set: {X_test.shape[0]} samples")
+
+    print(f"\nSearching {'randomized' if n_iter else 'grid'} over {PARAM_GRID} ({folds}-fold CV, n_jobs={n_jobs})...")
+    started = time.perf_counter()
+    result = search(X_train, y_train, n_jobs=n_jobs, folds=folds, n_iter=n_iter, random_state=random_state)
+    training_seconds = time.perf_counter() - started
+    model = result.best_estimator_
+    print(f"✓ Search took {training_seconds:.1f}s, best {result.best_params_} (CV ROC AUC {result.best_score_:.3f})")
+
+    holdout = evaluate(model, X_test, y_test)
+    print(f"\n{'='*60}")
+    print(f"MODEL EVALUATION")
+    print(f"{'='*60}")
+    print(f"Accuracy: {holdout['accuracy']:.2%}  ROC AUC: {holdout['roc_auc']:.3f}  F1: {holdout['f1']:.3f}")
+    print(f"\nClassification Report:")
+    print(classification_report(y_test, model.predict(X_test), target_names=["no rain", "rain"]))
+    print(f"\nFeature Importance:")
+    print(pd.DataFrame({'feature': FEATURES, 'importance': model.feature_importances_}).sort_values('importance', ascending=False))
+
+    latency = {"sklearn": inference_latency(model, X_test)}
+    with tempfile.TemporaryDirectory() as tmp:
+        export_forest(model, os.path.join(tmp, "forest.npz"), feature_names=FEATURES)
+        latency["forest"] = inference_latency(FlatForest.load(os.path.join(tmp, "forest.npz")), X_test)
+    for engine, figures in latency.items():
+        print(f"Inference ({engine}): p50 {figures['single_p50_us']:.0f}µs, p99 {figures['single_p99_us']:.0f}µs per row, "
+              f"{figures['batch_rows_per_sec']:.0f} rows/s batched")
+
+    # Served models are looked up by column name (RainfallPredictor); we trained on plain arrays
+    model.feature_names_in_ = np.array(FEATURES, dtype=object)
+
+    best = result.best_index_
+    metadata = {
+        "version": new_version(),
+        "created_at": datetime.utcnow().isoformat() + "Z",
+        "sklearn": sklearn.__version__,
+        "features": FEATURES,
+        "data": {
+            "sources": sources,
+            "rows": int(len(y)),
+            "rain_fraction": float(np.mean(y)),
+            "train_rows": int(len(y_train)),
+            "test_rows": int(len(y_test)),
+        },
+        "search": {
+            "kind": "randomized" if isinstance(result, RandomizedSearchCV) else "grid",
+            "candidates": len(result.cv_results_["params"]),
+            "folds": folds,
+            "n_jobs": n_jobs,
+            "cpus": joblib.cpu_count(),
+            "best_params": result.best_params_,
+            "cv": {name: float(result.cv_results_[f"mean_test_{name}"][best]) for name in SCORING},
+        },
+        "holdout": holdout,
+        "training_seconds": training_seconds,
+        "refit_seconds": float(result.refit_time_),
+        "inference": latency,
+    }
+    path = save_artifact(model, metadata, registry)
+    print(f"\n✓ Model saved to: {path}")
+    return path, metadata
+
+
+def parse_day(value):
+    return datetime.fromisoformat(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the rainfall RandomForest with a cross-validated search")
+    parser.add_argument("--csv", default=CSV_PATH)
+    parser.add_argument("--no-csv", action="store_true", help="train on Mongo readings only")
+    parser.add_argument("--mongo", action="store_true", help="add hourly rows from the readings collection")
+    parser.add_argument("--since", type=parse_day, help="first reading to use (default: 90 days ago)")
+    parser.add_argument("--until", type=parse_day, help="end of the readings window (default: now)")
+    parser.add_argument("--no-fetch-weather", action="store_true", help="don't fill weather_history from the Open-Meteo archive")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Mongo cursor batch size")
+    parser.add_argument("--n-jobs", type=int, default=-1, help="search processes (-1 = all cores)")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--n-iter", type=int, default=0, help="randomized search with this many candidates (0 = full grid)")
+    parser.add_argument("--test-size", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--registry", default=REGISTRY_DIR)
+    parser.add_argument("--activate", action="store_true", help="make the new version the active one in the registry")
+    parser.add_argument("--install", action="store_true", help=f"also copy the model to {MODEL_PATH} / {FOREST_PATH}")
+    args = parser.parse_args()
+
+    cache = None if args.no_cache else FeatureCache(args.cache_dir)
+    parts, sources = [], {}
+
+    if not args.no_csv:
+        print("Loading dataset...")
+        started = time.perf_counter()
+        X, y = csv_matrix(args.csv, cache)
+        print(f"✓ {args.csv}: {len(y)} rows in {(time.perf_counter() - started) * 1000:.1f}ms")
+        parts.append((X, y))
+        sources["csv"] = {"path": os.path.abspath(args.csv), "rows": int(len(y))}
+
+    if args.mongo:
+        from utils import db as mongo
+        until = args.until or datetime.utcnow()
+        since = args.since or until - timedelta(days=90)
+        db = mongo.get_db()
+        if not args.no_fetch_weather:
+            lat = Config.DAM_LATITUDE if Config else 12.96312116701951
+            lon = Config.DAM_LONGITUDE if Config else 79.94246446052891
+            try:
+                print(f"✓ weather_history: {ensure_history(db['weather_history'], lat, lon, since, until)} hours fetched")
+            except Exception as e:
+                print(f"⚠️ Could not fill weather_history: {e}")
+        started = time.perf_counter()
+        X, y = mongo_matrix(db, since, until, cache, batch_size=args.batch_size)
+        print(f"✓ readings {since:%Y-%m-%d}..{until:%Y-%m-%d}: {len(y)} hourly rows in {time.perf_counter() - started:.1f}s")
+        parts.append((X, y))
+        sources["mongo"] = {"db": db.name, "since": since, "until": until, "rows": int(len(y))}
+
+    if not parts:
+        parser.error("nothing to train on (--no-csv without --mongo)")
+    X = parts[0][0] if len(parts) == 1 else np.concatenate([p[0] for p in parts])
+    y = parts[0][1] if len(parts) == 1 else np.concatenate([p[1] for p in parts])
+    print(f"\nTarget distribution: {int(y.sum())} rain / {int(len(y) - y.sum())} no rain")
+
+    path, _ = train(X, y, sources, n_jobs=args.n_jobs, folds=args.folds, n_iter=args.n_iter,
+                    test_size=args.test_size, random_state=args.seed, registry=args.registry)
+    version = ModelRegistry(args.registry).register(path, activate=args.activate)
+    print(f"✓ Registered {version}{' (active)' if args.activate else ''}")
+    if args.install:
+        install(path)
+        print(f"✓ Installed as {MODEL_PATH} and {FOREST_PATH}")
+
+
+if __name__ == "__main__":
+    main()
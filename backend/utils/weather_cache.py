@@ -0,0 +1,220 @@
+import asyncio
+import threading
+import time
+from datetime import datetime
+import requests
+
+OPEN_METEO_URL = "https://api.open-meteo.com/v1/forecast"
+
+EMPTY_WEATHER = {
+    "temperature": None,
+    "humidity": None,
+    "cloud": None,
+    "rain_prob": None,
+    "sunshine": None,
+    "wind_direction": None,
+    "windspeed": None,
+    "time": None,
+    "fetched_at": None,
+}
+
+
+def open_meteo_params(latitude, longitude):
+    return {
+        "latitude": latitude,
+        "longitude": longitude,
+        "current_weather": "true",
+        "hourly": "precipitation_probability,cloudcover,relativehumidity_2m,sunshine_duration,winddirection_10m",
+        "timezone": "auto",
+    }
+
+
+def fetch_open_meteo(latitude, longitude, url=OPEN_METEO_URL, timeout=5):
+    r = requests.get(url, params=open_meteo_params(latitude, longitude), timeout=timeout)
+    r.raise_for_status()
+    return parse_open_meteo(r.json())
+
+
+async def fetch_open_meteo_async(client, latitude, longitude, url=OPEN_METEO_URL, timeout=5):
+    """fetch_open_meteo over a shared httpx.AsyncClient."""
+    r = await client.get(url, params=open_meteo_params(latitude, longitude), timeout=timeout)
+    r.raise_for_status()
+    return parse_open_meteo(r.json())
+
+
+def parse_open_meteo(data):
+    hourly = data.get("hourly", {})
+    return {
+        "temperature": data["current_weather"].get("temperature"),
+        "humidity": hourly.get("relativehumidity_2m", [None])[0],
+        "cloud": hourly.get("cloudcover", [None])[0],
+        "rain_prob": hourly.get("precipitation_probability", [None])[0],
+        "sunshine": hourly.get("sunshine_duration", [None])[0],
+        "wind_direction": hourly.get("winddirection_10m", [None])[0],
+        "windspeed": data["current_weather"].get("windspeed"),
+        "time": data["current_weather"].get("time"),
+        "fetched_at": datetime.utcnow(),  # what /api/weather reports, so cached weather keeps one timestamp
+    }
+
+
+class WeatherCache:
+    """
+    TTL cache in front of a weather fetcher.
+
+    - fresh (age < ttl): served from memory
+    - stale (age < ttl + stale_ttl): served from memory, one background refresh
+    - cold / expired: callers block on a single in-flight refresh
+    - upstream failure: no new fetch for negative_ttl seconds
+
+    `clock` returns seconds (time.monotonic; tests pass a fake).
+    """
+
+    def __init__(self, fetcher, ttl=300, stale_ttl=1800, negative_ttl=30, wait_timeout=10, clock=time.monotonic):
+        self.fetcher = fetcher
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.negative_ttl = negative_ttl
+        self.wait_timeout = wait_timeout
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        self._value = None
+        self._fetched_at = 0.0
+        self._failed_at = None
+        self._inflight = None
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.errors = 0
+
+    def get(self):
+        now = self.clock()
+        with self._lock:
+            age = now - self._fetched_at if self._value is not None else None
+            usable = age is not None and age < self.ttl + self.stale_ttl
+
+            if age is not None and age < self.ttl:
+                self.hits += 1
+                return self._value
+
+            if self._failed_at is not None and now - self._failed_at < self.negative_ttl:
+                self.negative_hits += 1
+                return self._value if usable else EMPTY_WEATHER
+
+            if usable:
+                self.stale_hits += 1
+                if self._inflight is None:
+                    event = self._inflight = threading.Event()
+                    threading.Thread(target=self._refresh, args=(event,), daemon=True).start()
+                return self._value
+
+            self.misses += 1
+            leader = self._inflight is None
+            if leader:
+                self._inflight = threading.Event()
+            event = self._inflight
+
+        if leader:
+            self._refresh(event)
+        else:
+            event.wait(self.wait_timeout)
+
+        with self._lock:
+            if self._value is not None and self.clock() - self._fetched_at < self.ttl + self.stale_ttl:
+                return self._value
+            return EMPTY_WEATHER
+
+    def _refresh(self, event):
+        try:
+            value = self.fetcher()
+            with self._lock:
+                self._value = value
+                self._fetched_at = self.clock()
+                self._failed_at = None
+                self.refreshes += 1
+        except Exception as e:
+            print(f"⚠️ Weather refresh failed: {e}")
+            with self._lock:
+                self._failed_at = self.clock()
+                self.errors += 1
+        finally:
+            with self._lock:
+                self._inflight = None
+            event.set()
+
+    def invalidate(self):
+        with self._lock:
+            self._value = None
+            self._fetched_at = 0.0
+            self._failed_at = None
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "staleHits": self.stale_hits,
+                "negativeHits": self.negative_hits,
+                "misses": self.misses,
+                "refreshes": self.refreshes,
+                "errors": self.errors,
+                "age": round(self.clock() - self._fetched_at, 1) if self._value is not None else None,
+            }
+
+
+class AsyncWeatherCache(WeatherCache):
+    """
+    WeatherCache for an asyncio app: `fetcher` is a coroutine function and
+    waiters await the in-flight refresh instead of blocking a thread. Runs on
+    one event loop, so the counters need no lock.
+    """
+
+    async def get(self):
+        now = self.clock()
+        age = now - self._fetched_at if self._value is not None else None
+        usable = age is not None and age < self.ttl + self.stale_ttl
+
+        if age is not None and age < self.ttl:
+            self.hits += 1
+            return self._value
+
+        if self._failed_at is not None and now - self._failed_at < self.negative_ttl:
+            self.negative_hits += 1
+            return self._value if usable else EMPTY_WEATHER
+
+        if usable:
+            self.stale_hits += 1
+            if self._inflight is None:
+                self._inflight = asyncio.ensure_future(self._refresh_async())
+            return self._value
+
+        self.misses += 1
+        if self._inflight is None:
+            self._inflight = asyncio.ensure_future(self._refresh_async())
+        try:
+            # shield: a cancelled request must not cancel the refresh other callers wait on
+            await asyncio.wait_for(asyncio.shield(self._inflight), self.wait_timeout)
+        except asyncio.TimeoutError:
+            pass
+
+        if self._value is not None and self.clock() - self._fetched_at < self.ttl + self.stale_ttl:
+            return self._value
+        return EMPTY_WEATHER
+
+    async def _refresh_async(self):
+        try:
+            value = await self.fetcher()
+            with self._lock:
+                self._value = value
+                self._fetched_at = self.clock()
+                self._failed_at = None
+                self.refreshes += 1
+        except Exception as e:
+            print(f"⚠️ Weather refresh failed: {e}")
+            with self._lock:
+                self._failed_at = self.clock()
+                self.errors += 1
+        finally:
+            self._inflight = None
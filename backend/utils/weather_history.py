@@ -0,0 +1,75 @@
+"""
+Hourly archived weather (weather_history collection)
+The live endpoints only ever see the current Open-Meteo forecast; training and
+backfills need what the weather actually was. One document per UTC hour:
+
+    {_id: hour, cloud: %, windspeed: km/h, precipitation: mm}
+
+Gaps are filled from the Open-Meteo archive API a day at a time. The archive
+lags real time by a few days; those hours come back empty and are skipped.
+"""
+
+from datetime import datetime, timedelta
+import requests
+from pymongo import UpdateOne
+
+ARCHIVE_URL = "https://archive-api.open-meteo.com/v1/archive"
+HOURLY = "cloudcover,windspeed_10m,precipitation"
+RAIN_MM = 0.1  # an hour with at least this much precipitation counts as "rain"
+
+
+def floor_hour(ts):
+    return ts.replace(minute=0, second=0, microsecond=0)
+
+
+def fetch_archive(latitude, longitude, start, end, url=ARCHIVE_URL, timeout=30):
+    """Hourly documents for the UTC dates start..end (inclusive); hours without data are left out."""
+    r = requests.get(url, params={
+        "latitude": latitude,
+        "longitude": longitude,
+        "start_date": start.strftime("%Y-%m-%d"),
+        "end_date": end.strftime("%Y-%m-%d"),
+        "hourly": HOURLY,
+        "timezone": "GMT",
+    }, timeout=timeout)
+    r.raise_for_status()
+    hourly = r.json().get("hourly", {})
+    docs = []
+    for t, cloud, wind, rain in zip(hourly.get("time", []), hourly.get("cloudcover", []),
+                                    hourly.get("windspeed_10m", []), hourly.get("precipitation", [])):
+        if cloud is None or wind is None or rain is None:
+            continue
+        docs.append({"_id": datetime.strptime(t, "%Y-%m-%dT%H:%M"), "cloud": cloud, "windspeed": wind, "precipitation": rain})
+    return docs
+
+
+def missing_days(col, start, end):
+    """UTC dates in [start, end) with fewer than 24 stored hours."""
+    day = floor_hour(start).replace(hour=0)
+    days = []
+    while day < end:
+        if col.count_documents({"_id": {"$gte": day, "$lt": day + timedelta(days=1)}}) < 24:
+            days.append(day)
+        day += timedelta(days=1)
+    return days
+
+
+def ensure_history(col, latitude, longitude, start, end, url=ARCHIVE_URL):
+    """Fetch the archive for every incomplete day in [start, end); returns hours written."""
+    days = missing_days(col, start, end)
+    written = 0
+    # Consecutive missing days go in one request
+    while days:
+        first = last = days.pop(0)
+        while days and days[0] == last + timedelta(days=1):
+            last = days.pop(0)
+        docs = fetch_archive(latitude, longitude, first, last, url=url)
+        if docs:
+            col.bulk_write([UpdateOne({"_id": d["_id"]}, {"$set": d}, upsert=True) for d in docs], ordered=False)
+            written += len(docs)
+    return written
+
+
+def load_hours(col, start, end):
+    """{hour: document} for [start, end)."""
+    return {doc["_id"]: doc for doc in col.find({"_id": {"$gte": floor_hour(start), "$lt": end}})}
@@ -0,0 +1,139 @@
+import atexit
+import threading
+import time
+from collections import deque
+
+
+class BufferFull(Exception):
+    pass
+
+
+class WriteBehindBuffer:
+    """
+    Coalesces single documents into bulk writes.
+
+    add() only appends to an in-memory queue; a background thread hands the
+    queue to `writer` (e.g. insert_many(ordered=False)) once `max_batch`
+    documents are pending or `flush_interval` seconds have passed. The queue is
+    bounded by `max_pending`; add() raises BufferFull instead of growing.
+    Whatever is still queued is flushed at interpreter exit.
+
+    A failed batch goes back on the queue only if `retryable(exception)` says
+    the failure is transient (default: always); otherwise it is logged and
+    dropped, so one bad batch cannot block everything queued behind it.
+    """
+
+    def __init__(self, writer, max_batch=500, flush_interval=1.0, max_pending=10000, name="buffer", retryable=None):
+        self.writer = writer
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.name = name
+        self.retryable = retryable
+
+        self._pending = deque()
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._stopping = False
+
+        self.accepted = 0
+        self.rejected = 0
+        self.written = 0
+        self.flushes = 0
+        self.errors = 0
+        self.dropped = 0
+
+    def add(self, doc):
+        self.add_many([doc])
+
+    def add_many(self, docs):
+        with self._cond:
+            if len(self._pending) + len(docs) > self.max_pending:
+                self.rejected += len(docs)
+                raise BufferFull(f"{self.name}: {len(self._pending)} documents pending")
+            self._pending.extend(docs)
+            self.accepted += len(docs)
+            if len(self._pending) >= self.max_batch:
+                self._cond.notify()
+        self._ensure_started()
+
+    def pending(self):
+        with self._cond:
+            return len(self._pending)
+
+    def flush(self):
+        while self._flush_once():
+            pass
+
+    def stop(self):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval + 5)
+        self.flush()
+
+    def stats(self):
+        with self._cond:
+            return {
+                "pending": len(self._pending),
+                "accepted": self.accepted,
+                "rejected": self.rejected,
+                "written": self.written,
+                "flushes": self.flushes,
+                "errors": self.errors,
+                "dropped": self.dropped,
+            }
+
+    def _ensure_started(self):
+        # Started lazily so a buffer created before a fork gets its thread in the child
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._cond:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name=f"{self.name}-flush", daemon=True)
+            self._thread.start()
+        atexit.register(self.stop)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                deadline = time.monotonic() + self.flush_interval
+                while not self._stopping and len(self._pending) < self.max_batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                stopping = self._stopping
+            self.flush()
+            if stopping:
+                return
+
+    def _flush_once(self):
+        with self._flush_lock:
+            with self._cond:
+                if not self._pending:
+                    return False
+                batch = [self._pending.popleft() for _ in range(min(self.max_batch, len(self._pending)))]
+
+            try:
+                written = self.writer(batch)
+                with self._cond:
+                    self.written += written if written is not None else len(batch)
+                    self.flushes += 1
+                return True
+            except Exception as e:
+                retry = self.retryable is None or self.retryable(e)
+                print(f"⚠️ {self.name} flush failed ({len(batch)} docs{'' if retry else ', dropped'}): {e}")
+                with self._cond:
+                    self.errors += 1
+                    if not retry:
+                        self.dropped += len(batch)
+                    # Put the batch back if there is room; retried on the next tick
+                    elif len(self._pending) + len(batch) <= self.max_pending:
+                        self._pending.extendleft(reversed(batch))
+                    else:
+                        self.rejected += len(batch)
+                return False
@@ -0,0 +1,161 @@
+"""
+YOLOv8 person detection on ONNX Runtime (CPU)
+Avoids importing PyTorch/ultralytics in the detector at all. Export once,
+check parity against the PyTorch model, then set DETECTION_BACKEND=onnx:
+
+    python utils/yolo_onnx.py export --imgsz 416            # writes Config.ONNX_MODEL (needs `pip install onnx`)
+    python utils/yolo_onnx.py parity --imgsz 416 [--images dir/]
+
+Only the "is there a person, and how confident" answer is needed, so the raw
+(batch, 4 + classes, anchors) output is reduced directly: an anchor counts as
+a person when class 0 is its top class, and the best such score equals the top
+person box NMS would keep.
+"""
+
+import argparse
+import glob
+import os
+import shutil
+import sys
+import time
+import cv2
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    from config import Config
+except ImportError:
+    Config = None
+
+PERSON = 0
+PAD_VALUE = 114
+PARITY_TOLERANCE = 0.05
+
+
+def letterbox(frame, size):
+    """Resize keeping aspect ratio and pad to size x size, as ultralytics does."""
+    h, w = frame.shape[:2]
+    r = min(size / h, size / w)
+    new_w, new_h = int(round(w * r)), int(round(h * r))
+    if (new_w, new_h) != (w, h):
+        frame = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    top = (size - new_h) // 2
+    left = (size - new_w) // 2
+    return cv2.copyMakeBorder(frame, top, size - new_h - top, left, size - new_w - left,
+                              cv2.BORDER_CONSTANT, value=(PAD_VALUE, PAD_VALUE, PAD_VALUE))
+
+
+def person_confidences(output):
+    """(batch, 4 + classes, anchors) -> best person score per image."""
+    scores = output[:, 4:, :]
+    is_person = scores.argmax(axis=1) == PERSON
+    return np.where(is_person, scores[:, PERSON, :], 0.0).max(axis=1)
+
+
+class OnnxPersonDetector:
+    """Same detect_people() contract as TorchPersonDetector in utils/human_detection.py."""
+
+    def __init__(self, path, imgsz=640, threads=0):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(path, sess_options=options, providers=["CPUExecutionProvider"])
+
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        batch, _, height, _ = model_input.shape
+        # A static export fixes the input size; a dynamic one takes whatever we pass
+        self.imgsz = height if isinstance(height, int) else imgsz
+        self.dynamic_batch = not isinstance(batch, int)
+
+    def preprocess(self, frames):
+        batch = np.stack([letterbox(frame, self.imgsz) for frame in frames])
+        batch = batch[..., ::-1].transpose(0, 3, 1, 2)  # BGR HWC -> RGB CHW
+        return np.ascontiguousarray(batch, dtype=np.float32) / 255.0
+
+    def detect_people(self, frames, min_confidence=0.5):
+        batch = self.preprocess(frames)
+        if self.dynamic_batch:
+            output = self.session.run(None, {self.input_name: batch})[0]
+        else:
+            output = np.concatenate([self.session.run(None, {self.input_name: batch[i:i + 1]})[0] for i in range(len(batch))])
+        return [
+            (True, float(conf)) if conf >= min_confidence else (False, 0.0)
+            for conf in person_confidences(output)
+        ]
+
+
+def export(weights, out_path, imgsz):
+    from utils.human_detection import TorchPersonDetector
+
+    model = TorchPersonDetector(weights, imgsz=imgsz).model
+    exported = model.export(format="onnx", imgsz=imgsz, dynamic=True, simplify=True)
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    if os.path.abspath(exported) != os.path.abspath(out_path):
+        shutil.move(exported, out_path)
+    print(f"✓ Exported {weights} -> {out_path} (imgsz {imgsz}, dynamic batch)")
+
+
+def load_images(images_dir):
+    if images_dir:
+        paths = sorted(p for ext in ("jpg", "jpeg", "png") for p in glob.glob(os.path.join(images_dir, f"*.{ext}")))
+    else:
+        from ultralytics.utils import ASSETS
+        paths = sorted(str(p) for p in ASSETS.glob("*.jpg"))
+    return [(os.path.basename(p), cv2.imread(p)) for p in paths]
+
+
+def parity(weights, onnx_path, imgsz, images_dir=None, min_confidence=0.5, tolerance=PARITY_TOLERANCE):
+    """Detected flag must match on every image and confidences agree within `tolerance`."""
+    from utils.human_detection import TorchPersonDetector
+
+    images = load_images(images_dir)
+    if not images:
+        raise SystemExit("No images found for the parity check")
+
+    reference = TorchPersonDetector(weights, imgsz=imgsz)
+    candidate = OnnxPersonDetector(onnx_path, imgsz=imgsz)
+
+    ok = True
+    print(f"{'image':<28} | {'torch':>12} | {'onnx':>12} | diff")
+    print("-" * 66)
+    for name, frame in images:
+        (t_det, t_conf), = reference.detect_people([frame], min_confidence)
+        (o_det, o_conf), = candidate.detect_people([frame], min_confidence)
+        diff = abs(t_conf - o_conf)
+        match = t_det == o_det and diff <= tolerance
+        ok = ok and match
+        print(f"{name:<28} | {str(t_det):>5} {t_conf:.3f} | {str(o_det):>5} {o_conf:.3f} | {diff:.3f} {'' if match else 'MISMATCH'}")
+
+    print("✓ ONNX model matches PyTorch" if ok else "⚠️ ONNX model does not match PyTorch")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export / verify the ONNX person detector")
+    parser.add_argument("command", choices=["export", "parity"])
+    parser.add_argument("--weights", default=Config.YOLO_MODEL if Config else "yolov8n.pt")
+    parser.add_argument("--out", default=Config.ONNX_MODEL if Config else "models/yolov8n.onnx")
+    parser.add_argument("--imgsz", type=int, default=Config.DETECTION_IMGSZ if Config else 640)
+    parser.add_argument("--images", help="directory of .jpg/.png files (default: ultralytics sample images)")
+    parser.add_argument("--confidence", type=float, default=Config.DETECTION_CONFIDENCE if Config else 0.5)
+    args = parser.parse_args()
+
+    if args.command == "export":
+        started = time.perf_counter()
+        export(args.weights, args.out, args.imgsz)
+        print(f"  took {time.perf_counter() - started:.1f}s")
+        # An export that disagrees with the reference should not be left where the detector will load it
+        if not parity(args.weights, args.out, args.imgsz, args.images, args.confidence):
+            os.remove(args.out)
+            sys.exit(1)
+    elif not parity(args.weights, args.out, args.imgsz, args.images, args.confidence):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -18,6 +18,8 @@
 #define SERVO_PIN 14
 #define VIBRATION_PIN 21
 
+#define SYNC_WAIT_S 25   // long-poll timeout for /api/device/sync
+
 DHT dht(DHTPIN, DHTTYPE);
 Servo valveServo;
 
@@ -31,9 +33,15 @@ String controlMode = "AUTO";
 String manualCommand = "NONE";
 
 unsigned long lastPost = 0;
-unsigned long lastRainFetch = 0;
-unsigned long lastControlFetch = 0;
-unsigned long lastHumanCheckFetch = 0;
+
+// Written by syncTask, copied into the state above by applySync()
+SemaphoreHandle_t syncLock;
+bool syncPending = false;
+float syncRainPercent = 0.0;
+bool syncHumanDetected = false;
+float syncHumanConfidence = 0.0;
+String syncMode = "AUTO";
+String syncCommand = "NONE";
 
 // ---------------- BUZZER ----------------
 void setupBuzzer() { pinMode(BUZZER_PIN, OUTPUT); }
@@ -98,63 +106,68 @@ float calcWaterPercent(float dist) {
   return ((DAM_HEIGHT_CM - dist) / DAM_HEIGHT_CM) * 100.0f;
 }
 
-// ---------------- BACKEND FETCH ----------------
-void fetchRainPrediction() {
-  if (millis() - lastRainFetch < 15000) return;
-  lastRainFetch = millis();
-
-  HTTPClient http;
-  http.begin(String(BACKEND_URL) + "/api/rainfall");
-  if (http.GET() == 200) {
-    DynamicJsonDocument doc(256);
-    deserializeJson(doc, http.getString());
-    lastRainPercent = doc["percent"];
-  }
-  http.end();
-}
-
-void fetchHumanDetection() {
-  if (millis() - lastHumanCheckFetch < 3000) return;
-  lastHumanCheckFetch = millis();
+// ---------------- DEVICE SYNC ----------------
+// One long-poll replaces the control / human / rain polls: the backend holds
+// the request until something changes or SYNC_WAIT_S passes. It blocks, so it
+// runs on its own task and hands results to loop() through the sync* copies.
+void syncTask(void *param) {
+  String version = "";
+  for (;;) {
+    if (WiFi.status() != WL_CONNECTED) {
+      vTaskDelay(pdMS_TO_TICKS(1000));
+      continue;
+    }
 
-  HTTPClient http;
-  http.begin(String(BACKEND_URL) + "/api/human-detection/status");
-  if (http.GET() == 200) {
-    DynamicJsonDocument doc(256);
-    deserializeJson(doc, http.getString());
-
-    bool prev = humanDetected;
-    humanDetected = doc["humanDetected"];
-    humanConfidence = doc["confidence"];
-
-    if (humanDetected && !prev) {
-      Serial.println("*** HUMAN DETECTED ***");
-      beep(150); delay(50); beep(150);
-
-      DynamicJsonDocument alert(256);
-      alert["detected"] = true;
-      alert["confidence"] = humanConfidence;
-      alert["timestamp"] = nowIso();
-      alert["nodeId"] = "main";
-      logAlert("human", alert);
+    HTTPClient http;
+    http.setTimeout((SYNC_WAIT_S + 10) * 1000);
+    http.begin(String(BACKEND_URL) + "/api/device/sync?wait=" + SYNC_WAIT_S + "&version=" + version);
+    bool ok = false;
+    if (http.GET() == 200) {
+      DynamicJsonDocument doc(384);
+      if (!deserializeJson(doc, http.getString())) {
+        version = doc["version"].as<String>();
+        xSemaphoreTake(syncLock, portMAX_DELAY);
+        syncMode = doc["mode"].as<String>();
+        syncCommand = doc["manualCommand"].as<String>();
+        syncRainPercent = doc["rainPercent"];
+        syncHumanDetected = doc["humanDetected"];
+        syncHumanConfidence = doc["confidence"];
+        syncPending = true;
+        xSemaphoreGive(syncLock);
+        ok = true;
+      }
     }
+    http.end();
+    if (!ok) vTaskDelay(pdMS_TO_TICKS(2000));  // back off while the backend is unreachable
   }
-  http.end();
 }
 
-void fetchControl() {
-  if (millis() - lastControlFetch < 2000) return;
-  lastControlFetch = millis();
-
-  HTTPClient http;
-  http.begin(String(BACKEND_URL) + "/api/valve/control");
-  if (http.GET() == 200) {
-    DynamicJsonDocument doc(256);
-    deserializeJson(doc, http.getString());
-    controlMode = doc["mode"].as<String>();
-    manualCommand = doc["manualCommand"].as<String>();
+void applySync() {
+  xSemaphoreTake(syncLock, portMAX_DELAY);
+  if (!syncPending) {
+    xSemaphoreGive(syncLock);
+    return;
+  }
+  syncPending = false;
+  bool prev = humanDetected;
+  controlMode = syncMode;
+  manualCommand = syncCommand;
+  lastRainPercent = syncRainPercent;
+  humanDetected = syncHumanDetected;
+  humanConfidence = syncHumanConfidence;
+  xSemaphoreGive(syncLock);
+
+  if (humanDetected && !prev) {
+    Serial.println("*** HUMAN DETECTED ***");
+    beep(150); delay(50); beep(150);
+
+    DynamicJsonDocument alert(256);
+    alert["detected"] = true;
+    alert["confidence"] = humanConfidence;
+    alert["timestamp"] = nowIso();
+    alert["nodeId"] = "main";
+    logAlert("human", alert);
   }
-  http.end();
 }
 
 // ---------------- SERVO ----------------
@@ -250,6 +263,9 @@ void setup() {
   while (WiFi.status() != WL_CONNECTED) delay(500);
 
   configTime(0, 0, "pool.ntp.org");
+
+  syncLock = xSemaphoreCreateMutex();
+  xTaskCreatePinnedToCore(syncTask, "device-sync", 8192, NULL, 1, NULL, 0);
   beep(100); delay(100); beep(100);
 }
 
@@ -261,9 +277,7 @@ void loop() {
   float pct = calcWaterPercent(dist);
   bool vibration = checkVibration();
 
-  fetchRainPrediction();
-  fetchHumanDetection();
-  fetchControl();
+  applySync();
 
   Serial.printf("[DATA] T:%.1f H:%.1f D:%.1f W:%.1f R:%.1f V:%s H:%s(%.2f) VALVE:%s MODE:%s\n",
               temp, hum, dist, pct, lastRainPercent,
@@ -19,6 +19,7 @@ export interface SensorReading {
   valve_state: string;
   human_detected: boolean;
   timestamp: string;
+  ts: string; // raw ISO timestamp, used as the pagination cursor
 }
 
 export interface WeatherData {
@@ -70,6 +71,17 @@ export interface DashboardStats {
   };
 }
 
+// Everything one dashboard view needs, from /api/dashboard
+export interface DashboardSnapshot {
+  readings: SensorReading[];
+  weather: WeatherData;
+  rainfall: RainfallPrediction;
+  valve: ValveStatus;
+  humanDetection: HumanDetectionStatus;
+  stats: DashboardStats;
+  lastAlerts: { vibration: string; human: string };
+}
+
 export interface AlertLog {
   _id: string;
   type: string;
@@ -79,6 +91,78 @@ export interface AlertLog {
   detected?: boolean;
   nodeId?: string;
   timestamp: string;
+  ts: string;
+}
+
+// Keyset pagination / range filters for readings and alert logs
+export interface PageParams {
+  before?: string;
+  beforeId?: string;
+  from?: string;
+  to?: string;
+  limit?: number;
+  fields?: string[];
+}
+
+// Downsampled series from /api/readings/series
+export type SeriesResolution = 'auto' | 'raw' | '1m' | '1h' | '1d';
+export type SeriesField = 'percent' | 'distance' | 'temp' | 'humidity';
+
+export interface SeriesStats {
+  min: number;
+  max: number;
+  mean: number;
+  last: number;
+}
+
+export interface SeriesPoint {
+  t: string;
+  count: number;
+  percent?: SeriesStats | null;
+  distance?: SeriesStats | null;
+  temp?: SeriesStats | null;
+  humidity?: SeriesStats | null;
+}
+
+export interface ReadingSeries {
+  resolution: Exclude<SeriesResolution, 'auto'>;
+  node: string;
+  from: string;
+  to: string;
+  points: SeriesPoint[];
+}
+
+export interface SeriesParams {
+  from?: string;
+  to?: string;
+  resolution?: SeriesResolution;
+  node?: string;
+  fields?: SeriesField[];
+}
+
+function seriesQuery(params?: SeriesParams): string {
+  if (!params) return '';
+  const query = new URLSearchParams();
+  if (params.from) query.set('from', params.from);
+  if (params.to) query.set('to', params.to);
+  if (params.resolution) query.set('resolution', params.resolution);
+  if (params.node) query.set('node', params.node);
+  if (params.fields?.length) query.set('fields', params.fields.join(','));
+  const qs = query.toString();
+  return qs ? `?${qs}` : '';
+}
+
+function pageQuery(params?: PageParams): string {
+  if (!params) return '';
+  const query = new URLSearchParams();
+  if (params.before) query.set('before', params.before);
+  if (params.beforeId) query.set('before_id', params.beforeId);
+  if (params.from) query.set('from', params.from);
+  if (params.to) query.set('to', params.to);
+  if (params.limit) query.set('limit', String(params.limit));
+  if (params.fields?.length) query.set('fields', params.fields.join(','));
+  const qs = query.toString();
+  return qs ? `?${qs}` : '';
 }
 
 async function fetchApi<T>(endpoint: string, options?: RequestInit): Promise<T> {
@@ -98,6 +182,90 @@ async function fetchApi<T>(endpoint: string, options?: RequestInit): Promise<T>
   return response.json();
 }
 
+// Last snapshot and its ETag; a 304 hands back the same object so React skips re-rendering
+let snapshotCache: { key: string; etag: string; data: DashboardSnapshot } | null = null;
+
+async function getDashboardSnapshot(readings = 20): Promise<DashboardSnapshot> {
+  const endpoint = `/api/dashboard?readings=${readings}`;
+  const cached = snapshotCache?.key === endpoint ? snapshotCache : null;
+  const response = await fetch(`${getApiBaseUrl()}${endpoint}`, {
+    cache: 'no-store',
+    headers: cached ? { 'If-None-Match': cached.etag } : undefined,
+  });
+
+  if (response.status === 304 && cached) {
+    return cached.data;
+  }
+  if (!response.ok) {
+    throw new Error(`API Error: ${response.status}`);
+  }
+
+  const data: DashboardSnapshot = await response.json();
+  const etag = response.headers.get('ETag');
+  snapshotCache = etag ? { key: endpoint, etag, data } : null;
+  return data;
+}
+
+// Server-Sent Events from /api/stream
+export interface StreamHandlers {
+  onReading?: (data: { reading: SensorReading; statistics: DashboardStats['statistics'] }) => void;
+  onAlert?: (data: { alert: AlertLog; statistics: DashboardStats['statistics'] }) => void;
+  onRainfall?: (data: RainfallPrediction) => void;
+  onValve?: (data: ValveStatus) => void;
+  onHuman?: (data: HumanDetectionStatus) => void;
+  onStatus?: (connected: boolean) => void;
+}
+
+// A refused stream (503 while the server is at its connection limit) closes the
+// EventSource for good, so it is reopened after this long
+const STREAM_REOPEN_MS = 30000;
+
+function subscribeStream(handlers: StreamHandlers): () => void {
+  if (typeof EventSource === 'undefined') {
+    handlers.onStatus?.(false);
+    return () => {};
+  }
+
+  let source: EventSource;
+  let reopen: ReturnType<typeof setTimeout> | undefined;
+  let closed = false;
+
+  const open = () => {
+    source = new EventSource(`${getApiBaseUrl()}/api/stream`);
+    const listen = <T,>(event: string, handler?: (data: T) => void) => {
+      if (!handler) return;
+      source.addEventListener(event, (e) => {
+        try {
+          handler(JSON.parse((e as MessageEvent).data) as T);
+        } catch (err) {
+          console.error(`Bad ${event} event:`, err);
+        }
+      });
+    };
+
+    listen('reading', handlers.onReading);
+    listen('alert', handlers.onAlert);
+    listen('rainfall', handlers.onRainfall);
+    listen('valve', handlers.onValve);
+    listen('human', handlers.onHuman);
+    source.onopen = () => handlers.onStatus?.(true);
+    // EventSource reconnects on its own unless the server refused it; callers fall back to polling meanwhile
+    source.onerror = () => {
+      handlers.onStatus?.(false);
+      if (source.readyState === EventSource.CLOSED && !closed) {
+        reopen = setTimeout(open, STREAM_REOPEN_MS);
+      }
+    };
+  };
+
+  open();
+  return () => {
+    closed = true;
+    clearTimeout(reopen);
+    source.close();
+  };
+}
+
 export const api = {
   // Health check
   health: () => fetchApi<{ status: string; service: string }>('/'),
@@ -112,7 +280,13 @@ export const api = {
   getRainfall: () => fetchApi<RainfallPrediction>('/api/rainfall'),
 
   // Sensor readings
-  getReadings: () => fetchApi<SensorReading[]>('/api/readings'),
+  getReadings: (params?: PageParams) => fetchApi<SensorReading[]>(`/api/readings${pageQuery(params)}`),
+
+  // Long-range chart data (min/max/mean/last per bucket)
+  getReadingSeries: (params?: SeriesParams) => fetchApi<ReadingSeries>(`/api/readings/series${seriesQuery(params)}`),
+
+  // Whole dashboard in one request (ETag-revalidated)
+  getDashboard: getDashboardSnapshot,
 
   // Dashboard stats
   getDashboardStats: () => fetchApi<DashboardStats>('/api/dashboard/stats'),
@@ -131,7 +305,11 @@ export const api = {
   getHumanDetectionStatus: () => fetchApi<HumanDetectionStatus>('/api/human-detection/status'),
 
   // Alert logs
-  getAlertLogs: (type: string) => fetchApi<AlertLog[]>(`/api/alerts/${type}/logs`),
+  getAlertLogs: (type: string, params?: PageParams) =>
+    fetchApi<AlertLog[]>(`/api/alerts/${type}/logs${pageQuery(params)}`),
+
+  // Live updates
+  subscribe: subscribeStream,
 };
 
 export default api;
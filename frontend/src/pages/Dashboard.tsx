@@ -15,8 +15,7 @@ import api, {
   type RainfallPrediction, 
   type ValveStatus, 
   type HumanDetectionStatus,
-  type DashboardStats,
-  type AlertLog
+  type DashboardStats
 } from '@/lib/api';
 import { RefreshCw } from 'lucide-react';
 
@@ -33,35 +32,21 @@ const Dashboard = () => {
   const [isLoading, setIsLoading] = useState(true);
   const [lastUpdate, setLastUpdate] = useState<string>('');
   const [error, setError] = useState<string | null>(null);
+  const [isLive, setIsLive] = useState(false);
 
   const fetchData = useCallback(async () => {
     try {
       setError(null);
-      const [readingsData, weatherData, rainfallData, valveData, humanData, statsData, vibrationLogs, humanLogs] = await Promise.allSettled([
-        api.getReadings(),
-        api.getWeather(),
-        api.getRainfall(),
-        api.getValveStatus(),
-        api.getHumanDetectionStatus(),
-        api.getDashboardStats(),
-        api.getAlertLogs('vibration'),
-        api.getAlertLogs('human'),
-      ]);
-
-      if (readingsData.status === 'fulfilled') setReadings(readingsData.value);
-      if (weatherData.status === 'fulfilled') setWeather(weatherData.value);
-      if (rainfallData.status === 'fulfilled') setRainfall(rainfallData.value);
-      if (valveData.status === 'fulfilled') setValveStatus(valveData.value);
-      if (humanData.status === 'fulfilled') setHumanDetection(humanData.value);
-      if (statsData.status === 'fulfilled') setStats(statsData.value);
-      
-      // Get latest alert timestamps
-      if (vibrationLogs.status === 'fulfilled' && vibrationLogs.value.length > 0) {
-        setVibrationLastAlert(vibrationLogs.value[0].timestamp);
-      }
-      if (humanLogs.status === 'fulfilled' && humanLogs.value.length > 0) {
-        setHumanLastAlert(humanLogs.value[0].timestamp);
-      }
+      const snapshot = await api.getDashboard(20);
+
+      setReadings(snapshot.readings);
+      setWeather(snapshot.weather);
+      setRainfall(snapshot.rainfall);
+      setValveStatus(snapshot.valve);
+      setHumanDetection(snapshot.humanDetection);
+      setStats(snapshot.stats);
+      if (snapshot.lastAlerts.vibration) setVibrationLastAlert(snapshot.lastAlerts.vibration);
+      if (snapshot.lastAlerts.human) setHumanLastAlert(snapshot.lastAlerts.human);
 
       setLastUpdate(new Date().toLocaleTimeString());
     } catch (err) {
@@ -74,10 +59,47 @@ const Dashboard = () => {
 
   useEffect(() => {
     fetchData();
-    const interval = setInterval(fetchData, 5000); // Refresh every 5 seconds
-    return () => clearInterval(interval);
   }, [fetchData]);
 
+  // Push updates over SSE; polling is only a fallback while the stream is down
+  useEffect(() => {
+    return api.subscribe({
+      onReading: ({ reading, statistics }) => {
+        setReadings(prev => [reading, ...prev].slice(0, 20));
+        setStats(prev => prev && {
+          ...prev,
+          statistics,
+          currentReading: {
+            ...prev.currentReading,
+            temperature: reading.temp,
+            humidity: reading.humidity,
+            waterLevel: reading.percent,
+            timestamp: reading.timestamp,
+          },
+        });
+        setLastUpdate(new Date().toLocaleTimeString());
+      },
+      onAlert: ({ alert, statistics }) => {
+        if (alert.type === 'vibration') setVibrationLastAlert(alert.timestamp);
+        if (alert.type === 'human') setHumanLastAlert(alert.timestamp);
+        setStats(prev => prev && { ...prev, statistics });
+      },
+      onRainfall: setRainfall,
+      onValve: (valve) => {
+        setValveStatus(valve);
+        setStats(prev => prev && { ...prev, currentReading: { ...prev.currentReading, valveState: valve.state } });
+      },
+      onHuman: setHumanDetection,
+      onStatus: setIsLive,
+    });
+  }, []);
+
+  useEffect(() => {
+    // Weather is never pushed, so keep a slow refresh while live
+    const interval = setInterval(fetchData, isLive ? 60000 : 5000);
+    return () => clearInterval(interval);
+  }, [fetchData, isLive]);
+
   const handleModeChange = async (mode: 'AUTO' | 'MANUAL') => {
     try {
       await api.setValveControl(mode, 'NONE', 'admin');
@@ -121,7 +143,7 @@ const Dashboard = () => {
             )}
             <div className="flex items-center gap-2 text-sm text-muted-foreground">
               <RefreshCw className={`w-4 h-4 ${isLoading ? 'animate-spin' : ''}`} />
-              <span>Last update: {lastUpdate || 'Loading...'}</span>
+              <span>{isLive ? 'Live' : 'Last update'}: {lastUpdate || 'Loading...'}</span>
             </div>
           </div>
         </div>
@@ -1,4 +1,4 @@
-import { useEffect, useState, useCallback } from 'react';
+import { useEffect, useState, useCallback, useRef } from 'react';
 import { Header } from '@/components/Header';
 import { Navigation } from '@/components/Navigation';
 import { LogTable } from '@/components/LogTable';
@@ -8,6 +8,41 @@ import { Navigate } from 'react-router-dom';
 import api, { type AlertLog, type SensorReading } from '@/lib/api';
 import { RefreshCw, Droplets, Activity, UserX, Thermometer } from 'lucide-react';
 import { Tabs, TabsContent, TabsList, TabsTrigger } from '@/components/ui/tabs';
+import { Button } from '@/components/ui/button';
+
+type LogKey = 'readings' | 'waterlevel' | 'vibration' | 'human';
+
+const PAGE_SIZE: Record<LogKey, number> = {
+  readings: 500,
+  waterlevel: 200,
+  vibration: 200,
+  human: 200,
+};
+
+// Prepend rows we have not seen yet (the `from` filter is inclusive)
+function mergeNewer<T extends { _id: string }>(current: T[], incoming: T[]): T[] {
+  const seen = new Set(current.map((item) => item._id));
+  const fresh = incoming.filter((item) => !seen.has(item._id));
+  return fresh.length ? [...fresh, ...current] : current;
+}
+
+function fetchPage(key: LogKey, params: Parameters<typeof api.getReadings>[0]) {
+  return key === 'readings' ? api.getReadings(params) : api.getAlertLogs(key, params);
+}
+
+// Everything since `since`, newest first: a full page means more may be waiting behind it,
+// so keep following the keyset cursor (before/before_id) within the same range until a short page
+async function fetchNewer(key: LogKey, since: string) {
+  const limit = PAGE_SIZE[key];
+  let page = (await fetchPage(key, { from: since, limit })) as (AlertLog | SensorReading)[];
+  const rows = [...page];
+  while (page.length >= limit) {
+    const last = page[page.length - 1];
+    page = (await fetchPage(key, { from: since, before: last.ts, beforeId: last._id, limit })) as (AlertLog | SensorReading)[];
+    rows.push(...page);
+  }
+  return rows;
+}
 
 const Logs = () => {
   const { isAdmin } = useAuth();
@@ -16,30 +51,90 @@ const Logs = () => {
   const [humanLogs, setHumanLogs] = useState<AlertLog[]>([]);
   const [readings, setReadings] = useState<SensorReading[]>([]);
   const [isLoading, setIsLoading] = useState(true);
+  const [isRefreshing, setIsRefreshing] = useState(false);
   const [lastUpdate, setLastUpdate] = useState<string>('');
+  const [hasMore, setHasMore] = useState<Partial<Record<LogKey, boolean>>>({});
+  const [loadingMore, setLoadingMore] = useState<LogKey | null>(null);
+  const newest = useRef<Partial<Record<LogKey, string>>>({});
+
+  const lists: Record<LogKey, (AlertLog | SensorReading)[]> = {
+    readings,
+    waterlevel: waterLogs,
+    vibration: vibrationLogs,
+    human: humanLogs,
+  };
+
+  const applyRows = useCallback((key: LogKey, rows: (AlertLog | SensorReading)[], position: 'newer' | 'older') => {
+    const merge = <T extends { _id: string }>(prev: T[]): T[] => {
+      const incoming = rows as unknown as T[];
+      return position === 'newer' ? mergeNewer(prev, incoming) : [...prev, ...incoming];
+    };
+    if (key === 'readings') setReadings(merge);
+    else if (key === 'waterlevel') setWaterLogs(merge);
+    else if (key === 'vibration') setVibrationLogs(merge);
+    else setHumanLogs(merge);
+  }, []);
 
+  // First call loads one page per tab; later calls only ask for rows newer than what we hold
   const fetchData = useCallback(async () => {
+    const keys: LogKey[] = ['waterlevel', 'vibration', 'human', 'readings'];
     try {
-      setIsLoading(true);
-      const [waterData, vibrationData, humanData, readingsData] = await Promise.allSettled([
-        api.getAlertLogs('waterlevel'),
-        api.getAlertLogs('vibration'),
-        api.getAlertLogs('human'),
-        api.getReadings(),
-      ]);
-
-      if (waterData.status === 'fulfilled') setWaterLogs(waterData.value);
-      if (vibrationData.status === 'fulfilled') setVibrationLogs(vibrationData.value);
-      if (humanData.status === 'fulfilled') setHumanLogs(humanData.value);
-      if (readingsData.status === 'fulfilled') setReadings(readingsData.value);
+      setIsRefreshing(true);
+      const results = await Promise.allSettled(
+        keys.map((key) => {
+          const since = newest.current[key];
+          return since ? fetchNewer(key, since) : fetchPage(key, { limit: PAGE_SIZE[key] });
+        })
+      );
+
+      results.forEach((result, i) => {
+        const key = keys[i];
+        if (result.status !== 'fulfilled') return;
+        const rows = result.value as (AlertLog | SensorReading)[];
+        if (!newest.current[key]) {
+          setHasMore((prev) => ({ ...prev, [key]: rows.length >= PAGE_SIZE[key] }));
+        }
+        if (rows.length > 0) newest.current[key] = rows[0].ts;
+        applyRows(key, rows, 'newer');
+      });
 
       setLastUpdate(new Date().toLocaleTimeString());
     } catch (err) {
       console.error('Fetch error:', err);
     } finally {
       setIsLoading(false);
+      setIsRefreshing(false);
     }
-  }, []);
+  }, [applyRows]);
+
+  const loadOlder = async (key: LogKey) => {
+    const rows = lists[key];
+    const oldest = rows[rows.length - 1];
+    if (!oldest) return;
+    try {
+      setLoadingMore(key);
+      const older = (await fetchPage(key, {
+        before: oldest.ts,
+        beforeId: oldest._id,
+        limit: PAGE_SIZE[key],
+      })) as (AlertLog | SensorReading)[];
+      applyRows(key, older, 'older');
+      setHasMore((prev) => ({ ...prev, [key]: older.length >= PAGE_SIZE[key] }));
+    } catch (err) {
+      console.error('Load older error:', err);
+    } finally {
+      setLoadingMore(null);
+    }
+  };
+
+  const loadOlderButton = (key: LogKey) =>
+    hasMore[key] && !isLoading ? (
+      <div className="flex justify-center mt-4">
+        <Button variant="outline" size="sm" onClick={() => loadOlder(key)} disabled={loadingMore === key}>
+          {loadingMore === key ? 'Loading...' : 'Load older'}
+        </Button>
+      </div>
+    ) : null;
 
   useEffect(() => {
     fetchData();
@@ -64,7 +159,7 @@ const Logs = () => {
             <p className="text-sm text-muted-foreground">Historical data & alerts (newest first)</p>
           </div>
           <div className="flex items-center gap-2 text-sm text-muted-foreground">
-            <RefreshCw className={`w-4 h-4 ${isLoading ? 'animate-spin' : ''}`} />
+            <RefreshCw className={`w-4 h-4 ${isLoading || isRefreshing ? 'animate-spin' : ''}`} />
             <span>Last update: {lastUpdate || 'Loading...'}</span>
           </div>
         </div>
@@ -104,18 +199,22 @@ const Logs = () => {
 
           <TabsContent value="readings" className="mt-0">
             <ReadingsTable readings={readings} isLoading={isLoading} />
+            {loadOlderButton('readings')}
           </TabsContent>
 
           <TabsContent value="water" className="mt-0">
             <LogTable logs={waterLogs} type="waterlevel" isLoading={isLoading} />
+            {loadOlderButton('waterlevel')}
           </TabsContent>
 
           <TabsContent value="vibration" className="mt-0">
             <LogTable logs={vibrationLogs} type="vibration" isLoading={isLoading} />
+            {loadOlderButton('vibration')}
           </TabsContent>
 
           <TabsContent value="human" className="mt-0">
             <LogTable logs={humanLogs} type="human" isLoading={isLoading} />
+            {loadOlderButton('human')}
           </TabsContent>
         </Tabs>
       </main>